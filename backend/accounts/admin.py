@@ -3,7 +3,7 @@ Admin configuration for accounts app
 """
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import User, ProviderIDWhitelist, ConsentLog
+from .models import User, ProviderIDWhitelist, ConsentLog, RevokedToken
 
 
 @admin.register(User)
@@ -47,3 +47,13 @@ class ConsentLogAdmin(admin.ModelAdmin):
     search_fields = ['user__email', 'user__username', 'ip_address']
     ordering = ['-consent_at']
     readonly_fields = ['user', 'policy_version', 'consent_at', 'ip_address', 'user_agent']
+
+
+@admin.register(RevokedToken)
+class RevokedTokenAdmin(admin.ModelAdmin):
+    """Admin for revoked tokens (accounts.revocation)"""
+    list_display = ['jti', 'token_type', 'user', 'revoked_at', 'expires_at']
+    list_filter = ['token_type', 'revoked_at']
+    search_fields = ['jti', 'user__email']
+    ordering = ['-revoked_at']
+    readonly_fields = ['jti', 'token_type', 'user', 'revoked_at', 'expires_at']
@@ -1,40 +1,94 @@
 """
 Custom authentication classes for JWT cookie-based authentication
 """
+import copy
+import logging
+from django.conf import settings
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
 from rest_framework import exceptions
+from core.caching import TTLCache
+from .revocation import store as revocation_store
+from .tokens import ROLE_CLAIM, TokenClaimsUser, claims_current
+
+logger = logging.getLogger('safehome.auth')
+
+# Users resolved from access tokens, keyed by (user id, token iat).
+# Invalidated by accounts.signals when a user is saved or deleted.
+user_cache = TTLCache(max_size=settings.AUTH_USER_CACHE_SIZE, ttl=settings.AUTH_USER_CACHE_TTL)
+
+
+def invalidate_user(user_id):
+    """Drop cached entries of a user (all tokens)"""
+    user_id = str(user_id)
+    user_cache.delete_where(lambda key: key[0] == user_id)
 
 
 class JWTCookieAuthentication(JWTAuthentication):
     """
     Custom JWT authentication that reads token from HttpOnly cookie
+
+    Tokens with role claims (accounts.tokens) authenticate as a
+    TokenClaimsUser, which loads the User only when a view needs more than
+    the id and role. Otherwise the user is cached for AUTH_USER_CACHE_TTL
+    seconds per token, so repeated requests need no user query either way.
+    Revoked tokens (accounts.revocation) are refused.
     """
 
     def authenticate(self, request):
         # First try to get token from cookie
-        print(f"DEBUG AUTH: request.COOKIES.keys() = {list(request.COOKIES.keys())}")
+        debug = logger.isEnabledFor(logging.DEBUG)
         access_token = request.COOKIES.get('access_token')
-        print(f"DEBUG AUTH: access_token = {access_token[:50] if access_token else None}...")
+        if debug:
+            logger.debug(f"Cookies: {list(request.COOKIES.keys())}, access_token present: {bool(access_token)}")
 
         if not access_token:
-            print("DEBUG AUTH: No access_token found in cookies, returning None")
             return None  # No token, let other authenticators handle it
 
         # Validate the token
-        print(f"DEBUG AUTH: Validating token...")
         try:
             validated_token = self.get_validated_token(access_token)
-            print(f"DEBUG AUTH: Token validated successfully")
         except (InvalidToken, TokenError) as e:
+            if debug:
+                logger.debug(f"Token rejected: {e}")
             raise exceptions.AuthenticationFailed('Invalid token') from e
 
+        if revocation_store.is_revoked(validated_token.get(api_settings.JTI_CLAIM)):
+            raise exceptions.AuthenticationFailed('Token has been revoked')
+
+        if ROLE_CLAIM in validated_token:
+            if not claims_current(validated_token):
+                raise exceptions.AuthenticationFailed('Token claims are outdated')
+            if debug:
+                logger.debug(f"Authenticated user id={validated_token.get(api_settings.USER_ID_CLAIM)} from token claims")
+            return (TokenClaimsUser(validated_token, lambda: self.load_user(validated_token)), validated_token)
+
         # Get user from validated token
-        print(f"DEBUG AUTH: Getting user from token...")
         try:
-            user = self.get_user(validated_token)
-            print(f"DEBUG AUTH: Got user: {user.email} (id={user.id})")
+            user = self.get_cached_user(validated_token)
         except Exception:
             raise exceptions.AuthenticationFailed('Invalid token')
+        if debug:
+            logger.debug(f"Authenticated user id={user.id}")
 
         return (user, validated_token)
+
+    def load_user(self, validated_token):
+        """Resolve a TokenClaimsUser, turning lookup errors into 401s"""
+        try:
+            return self.get_cached_user(validated_token)
+        except exceptions.AuthenticationFailed:
+            raise
+        except Exception:
+            raise exceptions.AuthenticationFailed('Invalid token')
+
+    def get_cached_user(self, validated_token):
+        """get_user() through the per-process user cache"""
+        key = (str(validated_token.get(api_settings.USER_ID_CLAIM)), validated_token.get('iat'))
+        user = user_cache.get(key)
+        if user is None:
+            user = self.get_user(validated_token)
+            user_cache.set(key, user)
+        # Views may modify request.user; never hand out the cached instance
+        return copy.copy(user)
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from accounts.revocation import sweep_expired
+
+
+class Command(BaseCommand):
+    """Delete revoked token entries whose tokens have expired"""
+    help = 'Delete expired entries from the token revocation table in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows deleted per statement')
+        parser.add_argument('--pause', type=float, default=0.0, help='Seconds to sleep between batches')
+
+    def handle(self, *args, **options):
+        deleted = sweep_expired(batch_size=options['batch_size'], pause=options['pause'])
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} expired revoked token(s)'))
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-18 04:13
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_provideridwhitelist'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RevokedToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('jti', models.CharField(help_text='The jti claim of the revoked token', max_length=255, unique=True, verbose_name='Token ID')),
+                ('token_type', models.CharField(help_text='access or refresh', max_length=16, verbose_name='Token Type')),
+                ('revoked_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Revoked At')),
+                ('expires_at', models.DateTimeField(db_index=True, help_text='Entries are swept once the token would have expired anyway', verbose_name='Expires At')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='revoked_tokens', to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'verbose_name': 'Revoked Token',
+                'verbose_name_plural': 'Revoked Tokens',
+                'ordering': ['-revoked_at'],
+            },
+        ),
+    ]
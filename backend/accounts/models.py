@@ -161,3 +161,49 @@ class ConsentLog(models.Model):
 
     def __str__(self):
         return f"{self.user.email} - {self.policy_version} ({self.consent_at})"
+
+
+class RevokedToken(models.Model):
+    """A JWT revoked before its expiry (logout, refresh token rotation), by jti"""
+
+    jti = models.CharField(
+        max_length=255,
+        unique=True,
+        verbose_name='Token ID',
+        help_text='The jti claim of the revoked token'
+    )
+
+    token_type = models.CharField(
+        max_length=16,
+        verbose_name='Token Type',
+        help_text='access or refresh'
+    )
+
+    user = models.ForeignKey(
+        'User',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='revoked_tokens',
+        verbose_name='User'
+    )
+
+    revoked_at = models.DateTimeField(
+        auto_now_add=True,
+        db_index=True,
+        verbose_name='Revoked At'
+    )
+
+    expires_at = models.DateTimeField(
+        db_index=True,
+        verbose_name='Expires At',
+        help_text='Entries are swept once the token would have expired anyway'
+    )
+
+    class Meta:
+        verbose_name = 'Revoked Token'
+        verbose_name_plural = 'Revoked Tokens'
+        ordering = ['-revoked_at']
+
+    def __str__(self):
+        return f"{self.token_type} {self.jti}"
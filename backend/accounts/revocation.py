@@ -0,0 +1,193 @@
+"""
+Revocation store for JWTs, keyed by the token's jti
+
+Revoked tokens are rows of accounts.RevokedToken, shared by all workers.
+Every process keeps a Bloom filter of the revoked jtis, so the common case
+(a token that was never revoked) is answered from memory; only a filter
+hit is confirmed with a database query.
+
+The filter is loaded on first use. A background thread then adds rows
+revoked by other processes every REVOCATION_REFRESH_INTERVAL seconds and
+rebuilds it from the table every REVOCATION_REBUILD_INTERVAL seconds,
+dropping swept entries. A token revoked by another worker can therefore
+still authenticate for up to REVOCATION_REFRESH_INTERVAL seconds;
+revocations in this process apply immediately. Refresh token reuse is
+always checked against the table (the unique jti makes revoke() an atomic
+claim).
+
+`python manage.py sweep_revoked_tokens` deletes expired entries in batches.
+"""
+import os
+import math
+import time
+import hashlib
+import logging
+import threading
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from .models import RevokedToken
+
+logger = logging.getLogger('safehome.auth')
+
+# Rows revoked this long before the last refresh are fetched again, so rows
+# committed late (or by a host with a slightly slow clock) are not missed
+_REFRESH_OVERLAP = timedelta(seconds=30)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings"""
+
+    def __init__(self, capacity, error_rate=0.001):
+        self.capacity = max(1, capacity)
+        self.bits = max(8, int(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.bits / self.capacity * math.log(2)))
+        self.count = 0
+        self._array = bytearray((self.bits + 7) // 8)
+
+    def _positions(self, item):
+        """Bit positions of an item (double hashing over one blake2b digest)"""
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        bits = self.bits
+        return ((h1 + i * h2) % bits for i in range(self.hashes))
+
+    def add(self, item):
+        array = self._array
+        for position in self._positions(item):
+            array[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        array = self._array
+        for position in self._positions(item):
+            if not array[position >> 3] & (1 << (position & 7)):
+                return False  # Most lookups stop at the first or second bit
+        return True
+
+
+class RevocationStore:
+    """Per-process view of the revoked token table"""
+
+    def __init__(self):
+        self._filter = None
+        self._refreshed_since = None  # revoked_at watermark of the last refresh
+        self._rebuilt_at = 0.0
+        self._pid = None
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    # Filter maintenance
+
+    def ensure_loaded(self):
+        """Load the filter on first use (and again in forked workers), then keep it fresh"""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._rebuild()
+            self._generation += 1
+            threading.Thread(target=self._run, args=(self._generation,),
+                             name='token-revocation-refresh', daemon=True).start()
+            self._pid = os.getpid()
+
+    def _run(self, generation):
+        """Background refresh loop, so requests never wait for it"""
+        while True:
+            time.sleep(settings.REVOCATION_REFRESH_INTERVAL)
+            if generation != self._generation:
+                return
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception('Refreshing the token revocation filter failed')
+            finally:
+                close_old_connections()
+
+    def refresh(self):
+        """Add rows revoked since the last refresh; rebuild when due"""
+        with self._lock:
+            if (self._filter.count > self._filter.capacity
+                    or time.monotonic() - self._rebuilt_at >= settings.REVOCATION_REBUILD_INTERVAL):
+                self._rebuild()
+                return
+            started = timezone.now()
+            for jti in RevokedToken.objects.filter(
+                revoked_at__gte=self._refreshed_since - _REFRESH_OVERLAP
+            ).values_list('jti', flat=True):
+                self._filter.add(jti)
+            self._refreshed_since = started
+
+    def _rebuild(self):
+        started = timezone.now()
+        active = RevokedToken.objects.filter(expires_at__gt=started)
+        capacity = settings.REVOCATION_FILTER_CAPACITY
+        # Leave room to grow when the table has outgrown the configured size
+        capacity = max(capacity, active.count() * 2)
+        bloom = BloomFilter(capacity, settings.REVOCATION_FILTER_ERROR_RATE)
+        for jti in active.values_list('jti', flat=True).iterator(chunk_size=2000):
+            bloom.add(jti)
+        self._filter = bloom
+        self._refreshed_since = started
+        self._rebuilt_at = time.monotonic()
+
+    def reset(self):
+        """Forget the filter; the next check reloads it"""
+        with self._lock:
+            self._pid = None
+            self._generation += 1
+
+    # Queries
+
+    def is_revoked(self, jti) -> bool:
+        """True when a token with this jti has been revoked"""
+        if not jti:
+            return False
+        self.ensure_loaded()
+        if jti not in self._filter:
+            return False
+        return RevokedToken.objects.filter(jti=jti).exists()
+
+    def revoke(self, token) -> bool:
+        """
+        Revoke a validated token until it expires. Returns False when it was
+        already revoked, so callers can treat revocation as a one-time claim.
+        """
+        jti = token[api_settings.JTI_CLAIM]
+        try:
+            with transaction.atomic():
+                RevokedToken.objects.create(
+                    jti=jti,
+                    token_type=token.get(api_settings.TOKEN_TYPE_CLAIM, ''),
+                    user_id=token.get(api_settings.USER_ID_CLAIM),
+                    expires_at=datetime.fromtimestamp(token['exp'], tz=dt_timezone.utc),
+                )
+        except IntegrityError:
+            return False
+        self.ensure_loaded()
+        with self._lock:
+            self._filter.add(jti)
+        return True
+
+
+store = RevocationStore()
+
+
+def sweep_expired(batch_size=1000, pause=0.0):
+    """Delete expired entries in batches of `batch_size`; returns the number deleted"""
+    deleted = 0
+    now = timezone.now()
+    while True:
+        batch = list(RevokedToken.objects.filter(expires_at__lte=now)
+                     .order_by('expires_at').values_list('pk', flat=True)[:batch_size])
+        if not batch:
+            return deleted
+        deleted += RevokedToken.objects.filter(pk__in=batch).delete()[0]
+        if len(batch) < batch_size:
+            return deleted
+        if pause:
+            time.sleep(pause)
@@ -4,7 +4,12 @@ Serializers for the accounts app
 from rest_framework import serializers
 from django.db import transaction
 from django.utils import timezone
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from core.password_pool import hash_password
 from .models import ConsentLog, User, ProviderIDWhitelist
+from .revocation import store as revocation_store
 
 
 class RegisterSerializer(serializers.ModelSerializer):
@@ -129,12 +134,15 @@ class RegisterSerializer(serializers.ModelSerializer):
                 ip_address = x_forwarded_for.split(',')[0].strip()
             user_agent = request.META.get('HTTP_USER_AGENT')
 
+        # Hash on the bounded pool, before the transaction is opened
+        password = hash_password(validated_data['password'])
+
         with transaction.atomic():
-            # Create user
-            user = User.objects.create_user(
-                email=validated_data['email'],
-                username=validated_data['username'],
-                password=validated_data['password'],
+            # Create user (as User.objects.create_user, with the hash computed above)
+            user = User(
+                email=User.objects.normalize_email(validated_data['email']),
+                username=User.normalize_username(validated_data['username']),
+                password=password,
                 first_name=validated_data.get('first_name', ''),
                 last_name=validated_data.get('last_name', ''),
                 role=validated_data.get('role', 'customer'),
@@ -142,6 +150,7 @@ class RegisterSerializer(serializers.ModelSerializer):
                 vaccinated=validated_data.get('vaccinated', False),
                 provider_id=validated_data.get('provider_id')
             )
+            user.save()
 
             # Create consent log
             ConsentLog.objects.create(
@@ -197,3 +206,16 @@ class UserSerializer(serializers.ModelSerializer):
             'last_login'
         ]
         read_only_fields = ['id', 'email', 'username', 'provider_id', 'date_joined', 'last_login']
+
+
+class RevocableTokenRefreshSerializer(TokenRefreshSerializer):
+    """TokenRefreshSerializer that refuses revoked refresh tokens and revokes rotated ones"""
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        if revocation_store.is_revoked(refresh[api_settings.JTI_CLAIM]):
+            raise InvalidToken('Token is revoked')
+        if (api_settings.ROTATE_REFRESH_TOKENS and api_settings.BLACKLIST_AFTER_ROTATION
+                and not revocation_store.revoke(refresh)):
+            raise InvalidToken('Token is revoked')
+        return super().validate(attrs)
@@ -0,0 +1,36 @@
+"""
+Signal handlers for the accounts app
+"""
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+from .authentication import invalidate_user
+from .models import User
+from .tokens import bump_auth_epoch
+
+# Fields whose change invalidates the role claims of issued tokens
+AUTH_CLAIM_FIELDS = ('role', 'provider_id', 'is_active')
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """Profile updates and admin changes must not be served from the auth cache"""
+    invalidate_user(instance.pk)
+
+
+@receiver(post_init, sender=User)
+def remember_auth_fields(sender, instance, **kwargs):
+    """Keep the loaded values of AUTH_CLAIM_FIELDS to detect changes on save"""
+    deferred = instance.get_deferred_fields()
+    instance._loaded_auth_fields = None if deferred & set(AUTH_CLAIM_FIELDS) else tuple(
+        getattr(instance, field) for field in AUTH_CLAIM_FIELDS
+    )
+
+
+@receiver(post_save, sender=User)
+def reissue_tokens_on_auth_change(sender, instance, created, **kwargs):
+    """Reject tokens whose role claims no longer match the user"""
+    current = tuple(getattr(instance, field) for field in AUTH_CLAIM_FIELDS)
+    if not created and getattr(instance, '_loaded_auth_fields', None) != current:
+        bump_auth_epoch(instance.pk)
+    instance._loaded_auth_fields = current
@@ -0,0 +1,105 @@
+"""
+JWT tokens carrying the user's role as signed claims
+
+ClaimsRefreshToken.for_user() adds the role (and whether the user has a
+provider ID) to the refresh token; access tokens derived from it copy the
+claims. JWTCookieAuthentication then sets request.user to a TokenClaimsUser,
+which answers id/role checks from the token and only loads the User row when
+anything else is accessed, so role-only endpoints run no user query.
+
+Changing a user's role, provider ID or active flag bumps their auth epoch
+in the Django cache: access tokens issued before it are rejected, and
+RefreshTokenView re-reads the user when reissuing them.
+"""
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.functional import SimpleLazyObject
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+ROLE_CLAIM = 'role'
+PROVIDER_CLAIM = 'has_provider_id'
+
+
+def set_role_claims(token, user):
+    """Write the user's current role claims into a token"""
+    token[ROLE_CLAIM] = user.role
+    token[PROVIDER_CLAIM] = bool(user.provider_id)
+    return token
+
+
+class ClaimsRefreshToken(RefreshToken):
+    """Refresh token whose access tokens carry role claims"""
+
+    @classmethod
+    def for_user(cls, user):
+        return set_role_claims(super().for_user(user), user)
+
+
+# Auth epochs
+
+def _epoch_key(user_id):
+    return f'auth:epoch:{user_id}'
+
+
+def bump_auth_epoch(user_id):
+    """Invalidate role claims of every token issued to the user until now"""
+    cache.set(_epoch_key(user_id), int(time.time()),
+              timeout=settings.SIMPLE_JWT['REFRESH_TOKEN_LIFETIME'].total_seconds())
+
+
+def claims_current(token) -> bool:
+    """False when the token's claims predate the user's last auth change"""
+    epoch = cache.get(_epoch_key(token.get(api_settings.USER_ID_CLAIM)))
+    return epoch is None or token.get('iat', 0) >= epoch
+
+
+# Token user
+
+class TokenClaimsUser(SimpleLazyObject):
+    """
+    request.user for tokens with role claims
+
+    id, pk, role and the role helpers come from the token; any other
+    attribute loads the User (through the auth user cache) on first use.
+    """
+
+    def __init__(self, token, load_user):
+        super().__init__(load_user)
+        self.__dict__['token'] = token
+
+    def __bool__(self):
+        return True
+
+    is_authenticated = True
+    is_anonymous = False
+
+    @property
+    def id(self):
+        return self.token[api_settings.USER_ID_CLAIM]
+
+    pk = id
+
+    @property
+    def role(self):
+        return self.token[ROLE_CLAIM]
+
+    @property
+    def has_provider_id(self):
+        return self.token.get(PROVIDER_CLAIM, False)
+
+    def is_customer(self):
+        return self.role == 'customer'
+
+    def is_provider(self):
+        return self.role == 'provider'
+
+    def is_admin(self):
+        return self.role == 'admin'
+
+    def can_create_services(self):
+        return self.role in ['provider', 'admin']
+
+    def can_book_services(self):
+        return self.role == 'customer'
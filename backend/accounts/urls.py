@@ -3,6 +3,7 @@ from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView,
 )
+from .serializers import RevocableTokenRefreshSerializer
 from .views import (
     RegisterView, UserProfileView, LoginView, LogoutView, RefreshTokenView,
     CustomerDashboardView, ProviderDashboardView
@@ -11,7 +12,8 @@ from .views import (
 urlpatterns = [
     # JWT Authentication endpoints (legacy, still available)
     path('token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
-    path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('token/refresh/', TokenRefreshView.as_view(serializer_class=RevocableTokenRefreshSerializer),
+         name='token_refresh'),
 
     # Cookie-based authentication endpoints
     path('login/', LoginView.as_view(), name='login'),
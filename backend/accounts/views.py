@@ -5,38 +5,62 @@ from rest_framework import status, generics
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated, BasePermission
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
 from django.contrib.auth import get_user_model
+from django.db.models import Func, IntegerField, OuterRef, Subquery
 from django.conf import settings
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
 from core import success_response, error_response
-from core.parsers import EncryptedJSONParser
+from core.password_pool import verify_password
+from core.ratelimit import IPRateThrottle
+from core.singleflight import forget, single_flight
+from .revocation import store as revocation_store
 from .serializers import RegisterSerializer, UserSerializer, LoginSerializer
+from .tokens import ClaimsRefreshToken, ROLE_CLAIM, claims_current, set_role_claims
+
+
+def _count(queryset):
+    """COUNT(*) of a queryset as a subquery expression"""
+    return Subquery(
+        queryset.order_by().annotate(count=Func('pk', function='COUNT')).values('count'),
+        output_field=IntegerField(),
+    )
+
+
+def _authenticated(request):
+    """
+    Whether the request has an authenticated user, without loading it:
+    role checks on a TokenClaimsUser are answered from the token
+    """
+    user = request.user
+    return user is not None and user.is_authenticated
 
 
 class IsCustomer(BasePermission):
     """Permission class for customer-only access"""
     def has_permission(self, request, view):
-        return request.user and request.user.is_authenticated and request.user.role == 'customer'
+        return _authenticated(request) and request.user.role == 'customer'
 
 
 class IsProvider(BasePermission):
     """Permission class for provider-only access"""
     def has_permission(self, request, view):
-        return request.user and request.user.is_authenticated and request.user.role == 'provider'
+        return _authenticated(request) and request.user.role == 'provider'
 
 
 class IsAdmin(BasePermission):
     """Permission class for admin-only access"""
     def has_permission(self, request, view):
-        return request.user and request.user.is_authenticated and request.user.role == 'admin'
+        return _authenticated(request) and request.user.role == 'admin'
 
 
 class CanCreateServices(BasePermission):
     """Permission class for users who can create/manage services (providers and admins)"""
     def has_permission(self, request, view):
-        return request.user and request.user.is_authenticated and request.user.can_create_services()
+        return _authenticated(request) and request.user.can_create_services()
 
 
 @method_decorator(csrf_exempt, name='dispatch')
@@ -59,8 +83,10 @@ class RegisterView(generics.CreateAPIView):
     }
     """
     serializer_class = RegisterSerializer
+    authentication_classes = []  # A stale access cookie must not block registering
     permission_classes = [AllowAny]
-    parser_classes = [EncryptedJSONParser]
+    throttle_classes = [IPRateThrottle]
+    throttle_scope = 'register'
 
     def create(self, request, *args, **kwargs):
         """Create user and return success response with auto-login"""
@@ -82,7 +108,7 @@ class RegisterView(generics.CreateAPIView):
         user = serializer.save()
 
         # Auto-login: Generate JWT tokens for the new user
-        refresh = RefreshToken.for_user(user)
+        refresh = ClaimsRefreshToken.for_user(user)
 
         # Return user data (without sensitive information)
         user_data = UserSerializer(user).data
@@ -130,7 +156,6 @@ class UserProfileView(generics.RetrieveUpdateAPIView):
     serializer_class = UserSerializer
     authentication_classes = [JWTCookieAuthentication]
     permission_classes = [IsAuthenticated]
-    parser_classes = [EncryptedJSONParser]
     
     def get_object(self):
         """Get the current authenticated user"""
@@ -170,9 +195,11 @@ class LoginView(generics.GenericAPIView):
         "password": "password123"
     }
     """
+    authentication_classes = []  # A stale access cookie must not block logging in
     permission_classes = [AllowAny]
     serializer_class = LoginSerializer
-    parser_classes = [EncryptedJSONParser]
+    throttle_classes = [IPRateThrottle]
+    throttle_scope = 'login'
     
     def post(self, request):
         """Authenticate user and set JWT cookies"""
@@ -199,8 +226,8 @@ class LoginView(generics.GenericAPIView):
                 status_code=status.HTTP_401_UNAUTHORIZED
             )
 
-        # Check password
-        if not user.check_password(password):
+        # Check password (on the bounded hashing pool)
+        if not verify_password(user, password):
             return error_response(
                 message='Invalid credentials',
                 status_code=status.HTTP_401_UNAUTHORIZED
@@ -214,7 +241,7 @@ class LoginView(generics.GenericAPIView):
             )
 
         # Generate tokens
-        refresh = RefreshToken.for_user(user)
+        refresh = ClaimsRefreshToken.for_user(user)
 
         # Create response
         response = success_response(
@@ -269,19 +296,18 @@ class CustomerDashboardView(APIView):
         """Get customer dashboard data"""
         user = request.user
 
-        # Get user's bookings count
-        bookings_count = user.bookings.count()
-
-        # Get available services count
+        # Get user's bookings count and available services count in one query
+        from bookings.models import Booking
         from services.models import Service
-        services_count = Service.objects.filter(is_active=True).count()
+        User = get_user_model()
+        stats = User.objects.filter(pk=user.pk).values(
+            total_bookings=_count(Booking.objects.filter(user=OuterRef('pk'))),
+            available_services=_count(Service.objects.filter(is_active=True)),
+        ).get()
 
         dashboard_data = {
             'user': UserSerializer(user).data,
-            'stats': {
-                'total_bookings': bookings_count,
-                'available_services': services_count,
-            },
+            'stats': stats,
             'recent_bookings': [],  # Could add recent bookings logic here
         }
 
@@ -333,12 +359,29 @@ class ProviderDashboardView(APIView):
 @method_decorator(csrf_exempt, name='dispatch')
 class LogoutView(APIView):
     """
-    Logout user by clearing JWT cookies.
+    Logout user by revoking and clearing the JWT cookies.
 
     POST /api/auth/logout
     """
+    # Works from the cookies alone, also when the access token has expired
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
     def post(self, request):
-        """Clear JWT cookies"""
+        """Revoke the tokens so copies of the cookies stop working, then clear them"""
+        for cookie, token_class in (('access_token', AccessToken), ('refresh_token', ClaimsRefreshToken)):
+            raw_token = request.COOKIES.get(cookie)
+            if not raw_token:
+                continue
+            try:
+                token = token_class(raw_token)
+            except TokenError:
+                continue  # Expired or invalid tokens need no revocation
+            revocation_store.revoke(token)
+            if cookie == 'refresh_token':
+                # Stop handing out tokens already issued for this one
+                forget(refresh_flight_key(token))
+
         response = success_response(
             message='Logout successful',
             status_code=status.HTTP_200_OK
@@ -351,6 +394,11 @@ class LogoutView(APIView):
         return response
 
 
+def refresh_flight_key(refresh):
+    """single_flight() key shared by refreshes presenting the same refresh token"""
+    return f'token-refresh:{refresh[api_settings.JTI_CLAIM]}'
+
+
 @method_decorator(csrf_exempt, name='dispatch')
 class RefreshTokenView(APIView):
     """
@@ -358,6 +406,10 @@ class RefreshTokenView(APIView):
 
     POST /api/auth/refresh
     """
+    # Authenticated by the refresh cookie, not the (expired) access token
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
     def post(self, request):
         """Refresh access token using refresh token"""
         refresh_token = request.COOKIES.get('refresh_token')
@@ -369,9 +421,15 @@ class RefreshTokenView(APIView):
             )
 
         try:
-            # Create new tokens from refresh token
-            refresh = RefreshToken(refresh_token)
-            access_token = str(refresh.access_token)
+            # Concurrent refreshes with the same token (several API calls
+            # finding the access token expired at once) share one issuance
+            refresh = ClaimsRefreshToken(refresh_token)
+            access_token, new_refresh_token = single_flight(
+                refresh_flight_key(refresh),
+                lambda: self.issue(refresh),
+                ttl=settings.TOKEN_REFRESH_SHARE_SECONDS,
+            )
+            self.check_not_revoked(access_token, new_refresh_token or refresh_token)
 
             # Create response
             response = success_response(
@@ -390,6 +448,17 @@ class RefreshTokenView(APIView):
                 path='/',  # Available for all paths
             )
 
+            if new_refresh_token:
+                response.set_cookie(
+                    'refresh_token',
+                    new_refresh_token,
+                    max_age=settings.SIMPLE_JWT['REFRESH_TOKEN_LIFETIME'].total_seconds(),
+                    httponly=True,
+                    secure=False,  # Must be False for localhost HTTP
+                    samesite='Lax',  # Lax allows cookies in same-site contexts
+                    path='/',  # Available for all paths
+                )
+
             return response
 
         except Exception:
@@ -397,3 +466,40 @@ class RefreshTokenView(APIView):
                 message='Invalid refresh token',
                 status_code=status.HTTP_401_UNAUTHORIZED
             )
+
+    def check_not_revoked(self, access_token, refresh_token):
+        """
+        Reject a (possibly shared) result whose tokens were revoked since
+        it was issued, e.g. by a logout in another worker
+        """
+        for token in (AccessToken(access_token), ClaimsRefreshToken(refresh_token)):
+            if revocation_store.is_revoked(token[api_settings.JTI_CLAIM]):
+                raise TokenError('Token is revoked')
+
+    def issue(self, refresh):
+        """Return (access token, rotated refresh token or None) for a valid refresh token"""
+        if revocation_store.is_revoked(refresh[api_settings.JTI_CLAIM]):
+            raise TokenError('Token is revoked')
+        access = refresh.access_token
+
+        # Role claims changed since the refresh token was issued (or
+        # it predates role claims): read them from the user again
+        user = None
+        if ROLE_CLAIM not in refresh or not claims_current(refresh):
+            user = get_user_model().objects.get(pk=refresh[api_settings.USER_ID_CLAIM], is_active=True)
+            set_role_claims(access, user)
+            access.set_iat()  # iat is copied from the refresh token
+
+        # Rotate: the presented refresh token is claimed once (the
+        # revocation table's unique jti makes reuse fail) and replaced
+        new_refresh_token = None
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION and not revocation_store.revoke(refresh):
+                raise TokenError('Token is revoked')
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            if user is not None:
+                set_role_claims(refresh, user)
+            new_refresh_token = str(refresh)
+        return str(access), new_refresh_token
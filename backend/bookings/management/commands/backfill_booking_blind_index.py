@@ -0,0 +1,96 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+from bookings.models import Booking, normalize_address, normalize_phone
+from core.batching import keyset_chunks, ProgressMeter
+from core.crypto import dec_bytes_many, blind_index
+
+
+class Command(BaseCommand):
+    """
+    Compute Booking.address_bidx / phone_bidx from the encrypted fields
+
+    Needed once for rows created before blind indexes existed, and again
+    after BLIND_INDEX_KEY (or FERNET_KEY, when no BLIND_INDEX_KEY is set)
+    changes. Works in keyset-ordered chunks like rotate_booking_keys, and
+    like it only writes a row whose ciphertext has not changed since it was
+    read, so a concurrent set_address()/set_phone() keeps its own index.
+    """
+
+    help = 'Backfill blind indexes for booking addresses and phone numbers'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Number of rows read and written per chunk (default: 500)',
+        )
+        parser.add_argument(
+            '--rows-per-second', type=float, default=0,
+            help='Maximum rows scanned per second, 0 for no limit (default: 0)',
+        )
+        parser.add_argument(
+            '--start-after', default=None,
+            help='Resume after this booking ID (printed by a previous run)',
+        )
+        parser.add_argument(
+            '--missing-only', action='store_true',
+            help='Only visit rows that have no index yet',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_pk = options['start_after']
+
+        if batch_size < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        queryset = Booking.objects.all()
+        if options['missing_only']:
+            queryset = queryset.filter(Q(address_bidx='') | Q(phone_bidx=''))
+
+        progress = ProgressMeter(options['rows_per_second'])
+        updated = skipped = 0
+
+        self.stdout.write('Backfilling booking blind indexes...')
+        try:
+            chunks = keyset_chunks(
+                queryset, ['address_enc', 'phone_enc', 'address_bidx', 'phone_bidx'],
+                batch_size=batch_size, start_after=last_pk,
+            )
+            for rows in chunks:
+                blobs = []
+                for _, address_enc, phone_enc, _, _ in rows:
+                    blobs.extend((address_enc, phone_enc))
+                try:
+                    plaintexts = dec_bytes_many(blobs)
+                except ValueError as e:
+                    raise CommandError(str(e))
+
+                with transaction.atomic():
+                    for i, (pk, address_enc, phone_enc, address_bidx, phone_bidx) in enumerate(rows):
+                        new_address_bidx = blind_index(normalize_address(plaintexts[2 * i]))
+                        new_phone_bidx = blind_index(normalize_phone(plaintexts[2 * i + 1]))
+                        if (new_address_bidx, new_phone_bidx) != (address_bidx, phone_bidx):
+                            written = Booking.objects.filter(
+                                pk=pk, address_enc=address_enc, phone_enc=phone_enc,
+                            ).update(
+                                address_bidx=new_address_bidx,
+                                phone_bidx=new_phone_bidx,
+                            )
+                            updated += written
+                            skipped += 1 - written
+
+                last_pk = rows[-1][0]
+                progress.add(len(rows))
+                self.stdout.write(
+                    f"  scanned {progress.rows}, updated {updated}, skipped {skipped}, "
+                    f"{progress.rate:.0f} rows/s, resume with --start-after {last_pk}"
+                )
+                progress.throttle()
+        except KeyboardInterrupt:
+            raise CommandError(f"Interrupted; resume with --start-after {last_pk}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Done: scanned {progress.rows} rows, updated {updated}, skipped {skipped} "
+            f"changed concurrently, in {progress.elapsed:.1f}s ({progress.rate:.0f} rows/s)"
+        ))
@@ -0,0 +1,131 @@
+import os
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from bookings.models import Booking, normalize_address, normalize_phone
+from core.batching import keyset_chunks, ProgressMeter
+from core.crypto import enc_bytes, dec_bytes, blob_key_version, blind_index, keyring
+
+
+class Command(BaseCommand):
+    """
+    Re-encrypt Booking address/phone with the current key, in small chunks
+
+    Rows still in the legacy text format are converted to the binary format
+    on the way. The blind indexes (address_bidx/phone_bidx) are recomputed in
+    the same update: without BLIND_INDEX_KEY they are keyed with FERNET_KEY,
+    so rotating it would otherwise break with_phone()/with_address().
+
+    Rows are visited in primary key order (keyset iteration), so the command
+    can be stopped at any time and resumed with --start-after. Each chunk is
+    written in its own short transaction, and a row is only overwritten if
+    its ciphertext has not changed since it was read.
+    """
+
+    help = 'Re-encrypt booking addresses and phone numbers with the current FERNET_KEY'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Number of rows read and written per chunk (default: 500)',
+        )
+        parser.add_argument(
+            '--rows-per-second', type=float, default=0,
+            help='Maximum rows scanned per second, 0 for no limit (default: 0)',
+        )
+        parser.add_argument(
+            '--start-after', default=None,
+            help='Resume after this booking ID (printed by a previous run)',
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Count the rows that need re-encryption without writing',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        dry_run = options['dry_run']
+        last_pk = options['start_after']
+
+        if batch_size < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        try:
+            target_version = keyring.current_version
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if not os.environ.get('BLIND_INDEX_KEY'):
+            self.stderr.write(self.style.WARNING(
+                "BLIND_INDEX_KEY is not set, so blind indexes follow FERNET_KEY. "
+                "Phone/address lookups miss bookings until this command has "
+                "re-indexed them; set BLIND_INDEX_KEY to keep indexes stable."
+            ))
+
+        self.stdout.write(
+            f"Re-encrypting bookings with key version {target_version}"
+            f"{' (dry run)' if dry_run else ''}..."
+        )
+
+        progress = ProgressMeter(options['rows_per_second'])
+        rotated = skipped = 0
+
+        try:
+            chunks = keyset_chunks(
+                Booking.objects.all(),
+                ['address_enc', 'phone_enc', 'address_bidx', 'phone_bidx'],
+                batch_size=batch_size, start_after=last_pk,
+            )
+            for rows in chunks:
+                updates = []
+                for pk, address_enc, phone_enc, address_bidx, phone_bidx in rows:
+                    values = {}
+                    self._rotate(values, 'address', address_enc, address_bidx,
+                                 normalize_address, target_version)
+                    self._rotate(values, 'phone', phone_enc, phone_bidx,
+                                 normalize_phone, target_version)
+                    if values:
+                        updates.append((pk, address_enc, phone_enc, values))
+
+                if updates and not dry_run:
+                    written = self._write_chunk(updates)
+                    rotated += written
+                    skipped += len(updates) - written
+                else:
+                    rotated += len(updates)
+
+                last_pk = rows[-1][0]
+                progress.add(len(rows))
+                self.stdout.write(
+                    f"  scanned {progress.rows}, re-encrypted {rotated}, "
+                    f"skipped {skipped}, {progress.rate:.0f} rows/s, "
+                    f"resume with --start-after {last_pk}"
+                )
+                progress.throttle()
+        except KeyboardInterrupt:
+            raise CommandError(f"Interrupted; resume with --start-after {last_pk}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Done: scanned {progress.rows} rows, re-encrypted {rotated}, skipped {skipped} "
+            f"changed concurrently, in {progress.elapsed:.1f}s ({progress.rate:.0f} rows/s)"
+        ))
+
+    def _rotate(self, values, field, value, bidx, normalize, target_version):
+        """Add the re-encrypted value and recomputed index for one field to values, if changed"""
+        if not value:
+            return
+        plaintext = dec_bytes(value)
+        if blob_key_version(value) != target_version:
+            values[f'{field}_enc'] = enc_bytes(plaintext)
+        new_bidx = blind_index(normalize(plaintext))
+        if new_bidx != bidx:
+            values[f'{field}_bidx'] = new_bidx
+
+    def _write_chunk(self, updates):
+        """Write one chunk in a short transaction, skipping rows changed since read"""
+        written = 0
+        with transaction.atomic():
+            for pk, address_enc, phone_enc, values in updates:
+                written += Booking.objects.filter(
+                    pk=pk, address_enc=address_enc, phone_enc=phone_enc,
+                ).update(**values)
+        return written
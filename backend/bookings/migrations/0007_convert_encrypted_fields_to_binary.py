@@ -0,0 +1,70 @@
+# Converts Booking.address_enc / phone_enc from base64 Fernet text to the
+# compact binary AES-GCM format written by core.crypto.enc_bytes.
+
+from django.db import migrations, transaction
+
+BATCH_SIZE = 500
+
+
+def _convert(apps, convert_value):
+    """Rewrite every encrypted value in batches, one short transaction each"""
+    Booking = apps.get_model('bookings', 'Booking')
+
+    last_pk = None
+    while True:
+        queryset = Booking.objects.order_by('pk')
+        if last_pk is not None:
+            queryset = queryset.filter(pk__gt=last_pk)
+        rows = list(queryset.values_list('pk', 'address_enc', 'phone_enc')[:BATCH_SIZE])
+        if not rows:
+            break
+
+        with transaction.atomic():
+            for pk, address_enc, phone_enc in rows:
+                values = {}
+                new_address = convert_value(address_enc)
+                if new_address is not None:
+                    values['address_enc'] = new_address
+                new_phone = convert_value(phone_enc)
+                if new_phone is not None:
+                    values['phone_enc'] = new_phone
+                if values:
+                    Booking.objects.filter(pk=pk).update(**values)
+
+        last_pk = rows[-1][0]
+
+
+def text_to_binary(apps, schema_editor):
+    from core.crypto import enc_bytes, dec_bytes, blob_key_version
+
+    def convert_value(value):
+        if not value or blob_key_version(value) is not None:
+            return None
+        return enc_bytes(dec_bytes(value))
+
+    _convert(apps, convert_value)
+
+
+def binary_to_text(apps, schema_editor):
+    from core.crypto import enc, dec_bytes, blob_key_version
+
+    def convert_value(value):
+        if not value or blob_key_version(value) is None:
+            return None
+        return enc(dec_bytes(value)).encode('utf-8')
+
+    _convert(apps, convert_value)
+
+
+class Migration(migrations.Migration):
+
+    # Each batch commits on its own instead of one transaction for the table
+    atomic = False
+
+    dependencies = [
+        ('bookings', '0006_booking_provider_quote'),
+    ]
+
+    operations = [
+        migrations.RunPython(text_to_binary, binary_to_text),
+    ]
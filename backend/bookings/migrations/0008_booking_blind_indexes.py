@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0007_convert_encrypted_fields_to_binary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='address_bidx',
+            field=models.CharField(blank=True, default='', editable=False, help_text='Keyed hash of the normalized address for lookups', max_length=64, verbose_name='Address Blind Index'),
+        ),
+        migrations.AddField(
+            model_name='booking',
+            name='phone_bidx',
+            field=models.CharField(blank=True, default='', editable=False, help_text='Keyed hash of the normalized phone number for lookups', max_length=64, verbose_name='Phone Blind Index'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['address_bidx'], name='bookings_bo_address_10e492_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['phone_bidx'], name='bookings_bo_phone_b_ee34e7_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-18 04:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0008_booking_blind_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='bookings_bo_user_id_2aa7a9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['provider', '-created_at', '-id'], name='bookings_bo_provide_d0a9dd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['status', 'provider', '-created_at', '-id'], name='bookings_bo_status_612ef9_idx'),
+        ),
+    ]
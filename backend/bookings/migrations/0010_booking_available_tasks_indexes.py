@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-18 04:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0009_booking_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['status', 'provider', 'city', '-created_at', '-id'], name='bookings_bo_status_4b2416_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['status', 'provider', 'service_type', '-created_at', '-id'], name='bookings_bo_status_7f8c93_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['status', 'provider', 'country', 'state', '-created_at', '-id'], name='bookings_bo_status_9ee496_idx'),
+        ),
+    ]
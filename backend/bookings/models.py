@@ -1,10 +1,84 @@
 """
 Booking models for SafeHome
 """
+import re
 from django.db import models
 from django.conf import settings
 from core.models import UUIDModel
-from core.crypto import enc, dec
+from core.crypto import blind_index
+from core.fields import EncryptedAttribute
+
+
+def normalize_phone(phone: str) -> str:
+    """Reduce a phone number to its digits, keeping a leading '+'"""
+    phone = phone.strip()
+    digits = re.sub(r'\D', '', phone)
+    return f"+{digits}" if phone.startswith('+') and digits else digits
+
+
+def normalize_address(address: str) -> str:
+    """Lower-case an address and collapse punctuation and whitespace"""
+    return ' '.join(re.sub(r'[^\w]+', ' ', address.casefold()).split())
+
+
+# Columns that are large or only needed to render a booking in full. The
+# default manager defers them; use with_pii() when they will be read.
+DEFERRED_FIELDS = ('address_enc', 'phone_enc', 'notes')
+
+
+class BookingQuerySet(models.QuerySet):
+    """QuerySet with lookups on encrypted fields through their blind indexes"""
+
+    def with_pii(self):
+        """Load the encrypted and free-text columns deferred by default"""
+        return self.defer(None)
+
+    def with_notes(self):
+        """Load the notes but keep the encrypted address and phone deferred"""
+        return self.defer(None).defer('address_enc', 'phone_enc')
+
+    def with_phone(self, phone: str):
+        """Bookings whose phone number matches after normalization"""
+        return self.filter(phone_bidx=blind_index(normalize_phone(phone)))
+
+    def with_address(self, address: str):
+        """Bookings whose address matches after normalization"""
+        return self.filter(address_bidx=blind_index(normalize_address(address)))
+
+
+class BookingManager(models.Manager.from_queryset(BookingQuerySet)):
+    """
+    Default Booking manager that leaves the heavy columns out of SELECTs
+
+    Status transitions, ownership checks and aggregates never read the
+    encrypted blobs or notes, so they are deferred. Saving an instance
+    loaded this way only writes the columns that were loaded.
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().defer(*DEFERRED_FIELDS)
+
+
+def load_deferred_fields(bookings):
+    """
+    Load the deferred heavy columns of many bookings with a single query
+
+    Bookings that already have the columns loaded are left untouched.
+    """
+    pending = {}
+    for booking in bookings:
+        deferred = booking.get_deferred_fields().intersection(DEFERRED_FIELDS)
+        if deferred and booking.pk is not None:
+            pending[booking.pk] = (booking, deferred)
+    if not pending:
+        return
+
+    rows = Booking._base_manager.filter(pk__in=list(pending)).values_list('pk', *DEFERRED_FIELDS)
+    for pk, *values in rows:
+        booking, deferred = pending[pk]
+        for name, value in zip(DEFERRED_FIELDS, values):
+            if name in deferred:
+                setattr(booking, name, value)
 
 
 class Booking(UUIDModel):
@@ -80,6 +154,25 @@ class Booking(UUIDModel):
         help_text='Encrypted user phone number for privacy protection'
     )
 
+    # Blind indexes (keyed hashes) for equality lookups on the encrypted fields
+    address_bidx = models.CharField(
+        max_length=64,
+        blank=True,
+        default='',
+        editable=False,
+        verbose_name='Address Blind Index',
+        help_text='Keyed hash of the normalized address for lookups'
+    )
+
+    phone_bidx = models.CharField(
+        max_length=64,
+        blank=True,
+        default='',
+        editable=False,
+        verbose_name='Phone Blind Index',
+        help_text='Keyed hash of the normalized phone number for lookups'
+    )
+
     # Geographic information (not encrypted for filtering/searching)
     city = models.CharField(
         max_length=100,
@@ -150,6 +243,8 @@ class Booking(UUIDModel):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = BookingManager()
+
     class Meta:
         verbose_name = 'Booking'
         verbose_name_plural = 'Bookings'
@@ -160,34 +255,39 @@ class Booking(UUIDModel):
             models.Index(fields=['city']),
             models.Index(fields=['status']),
             models.Index(fields=['start_time']),
+            models.Index(fields=['address_bidx']),
+            models.Index(fields=['phone_bidx']),
+            # Keyset pagination (core.pagination) of the booking lists:
+            # customer's bookings, provider's received orders, available tasks
+            models.Index(fields=['user', '-created_at', '-id']),
+            models.Index(fields=['provider', '-created_at', '-id']),
+            models.Index(fields=['status', 'provider', '-created_at', '-id']),
+            # Available tasks feed filtered by city, service type or region
+            models.Index(fields=['status', 'provider', 'city', '-created_at', '-id']),
+            models.Index(fields=['status', 'provider', 'service_type', '-created_at', '-id']),
+            models.Index(fields=['status', 'provider', 'country', 'state', '-created_at', '-id']),
         ]
 
     def __str__(self):
         return f"Booking {self.id} - {self.user.email} - {self.get_service_type_display()}"
 
+    # Plaintext views of the encrypted fields, decrypted lazily and memoized
+    address = EncryptedAttribute('address_enc', index_field='address_bidx', normalize=normalize_address)
+    phone = EncryptedAttribute('phone_enc', index_field='phone_bidx', normalize=normalize_phone)
+
     # Encryption/Decryption methods
     def set_address(self, address: str):
         """Encrypt and set the address"""
-        self.address_enc = enc(address).encode('utf-8')
+        self.address = address
 
     def get_address(self) -> str:
         """Decrypt and return the address"""
-        if self.address_enc:
-            encrypted_str = self.address_enc.decode('utf-8')
-            return dec(encrypted_str)
-        return ""
+        return self.address
 
     def set_phone(self, phone: str):
         """Encrypt and set the phone number"""
-        self.phone_enc = enc(phone).encode('utf-8')
+        self.phone = phone
 
     def get_phone(self) -> str:
         """Decrypt and return the phone number"""
-        if self.phone_enc:
-            encrypted_str = self.phone_enc.decode('utf-8')
-            return dec(encrypted_str)
-        return ""
-
-    # Property methods for easier access
-    address = property(get_address, set_address)
-    phone = property(get_phone, set_phone)
+        return self.phone
@@ -3,9 +3,12 @@ Booking serializers for SafeHome
 """
 import random
 from rest_framework import serializers
+from django.conf import settings
+from django.db import models
 from django.utils import timezone
-from .models import Booking
+from .models import Booking, load_deferred_fields
 from core.crypto import enc
+from core.fields import prefetch_decrypted
 
 
 class BookingCreateSerializer(serializers.ModelSerializer):
@@ -68,6 +71,20 @@ class BookingCreateSerializer(serializers.ModelSerializer):
         return booking
 
 
+class BookingDetailListSerializer(serializers.ListSerializer):
+    """
+    List serializer that decrypts every address and phone on the page in one pass
+    """
+
+    def to_representation(self, data):
+        """Decrypt all encrypted fields up front, then serialize each row"""
+        iterable = data.all() if isinstance(data, models.manager.BaseManager) else data
+        bookings = list(iterable)
+        load_deferred_fields(bookings)
+        prefetch_decrypted(bookings, ['address', 'phone'], workers=settings.CRYPTO_DECRYPT_WORKERS)
+        return [self.child.to_representation(booking) for booking in bookings]
+
+
 class BookingDetailSerializer(serializers.ModelSerializer):
     """
     Serializer for booking details with decrypted address and phone
@@ -88,14 +105,20 @@ class BookingDetailSerializer(serializers.ModelSerializer):
             'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'confirmation_code', 'created_at', 'updated_at']
+        list_serializer_class = BookingDetailListSerializer
+
+    def to_representation(self, instance):
+        """Load deferred columns in one query rather than one per field"""
+        load_deferred_fields([instance])
+        return super().to_representation(instance)
 
     def get_address(self, obj) -> str:
         """Decrypt and return address"""
-        return obj.get_address()
+        return obj.address
 
     def get_phone(self, obj) -> str:
         """Decrypt and return phone"""
-        return obj.get_phone()
+        return obj.phone
     
     def get_user(self, obj):
         """Return user information"""
@@ -129,6 +152,40 @@ class BookingDetailSerializer(serializers.ModelSerializer):
         return None
 
 
+class BookingStatusSerializer(BookingDetailSerializer):
+    """
+    Booking details without the deferred columns (address, phone, notes)
+
+    Used to answer status transitions, which load the booking through the
+    deferring default manager and must not fetch the encrypted columns
+    just to echo them back.
+    """
+    address = None
+    phone = None
+
+    class Meta(BookingDetailSerializer.Meta):
+        fields = [
+            field for field in BookingDetailSerializer.Meta.fields
+            if field not in ('address', 'phone', 'notes')
+        ]
+        list_serializer_class = serializers.ListSerializer
+
+    def to_representation(self, instance):
+        return serializers.ModelSerializer.to_representation(self, instance)
+
+
+class AvailableTaskSerializer(BookingStatusSerializer):
+    """
+    A pending booking as shown to providers in the available tasks feed
+
+    The customer's address and phone are only shared once a provider has
+    accepted the booking; the notes describe the job and are included.
+    """
+
+    class Meta(BookingStatusSerializer.Meta):
+        fields = BookingStatusSerializer.Meta.fields + ['notes']
+
+
 class BookingListSerializer(serializers.ModelSerializer):
     """
     Serializer for listing bookings (without sensitive data)
@@ -142,3 +199,42 @@ class BookingListSerializer(serializers.ModelSerializer):
             'start_time', 'duration_hours', 'status', 'created_at'
         ]
         read_only_fields = ['id', 'created_at']
+
+
+class AvailableTasksFilterSerializer(serializers.Serializer):
+    """
+    Query parameters of the available tasks feed
+
+    Each given filter narrows the pending, unassigned bookings; the
+    composite indexes in Booking.Meta cover city, service_type and
+    country/state together with the feed's newest-first ordering.
+    """
+    city = serializers.CharField(required=False, max_length=100)
+    state = serializers.CharField(required=False, max_length=100)
+    country = serializers.CharField(required=False, max_length=100)
+    service_type = serializers.ChoiceField(choices=Booking.SERVICE_TYPES, required=False)
+    budget_min = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+    budget_max = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+    start_after = serializers.DateTimeField(required=False)
+    start_before = serializers.DateTimeField(required=False)
+
+    LOOKUPS = {
+        'city': 'city',
+        'state': 'state',
+        'country': 'country',
+        'service_type': 'service_type',
+        'budget_min': 'budget__gte',
+        'budget_max': 'budget__lte',
+        'start_after': 'start_time__gte',
+        'start_before': 'start_time__lt',
+    }
+
+    def validate(self, attrs):
+        for low, high in (('budget_min', 'budget_max'), ('start_after', 'start_before')):
+            if low in attrs and high in attrs and attrs[low] > attrs[high]:
+                raise serializers.ValidationError({high: f'Must not be before {low}.'})
+        return attrs
+
+    def filter_queryset(self, queryset):
+        """Apply the validated filters to a Booking queryset"""
+        return queryset.filter(**{self.LOOKUPS[name]: value for name, value in self.validated_data.items()})
@@ -0,0 +1,95 @@
+"""
+Signal handlers for the bookings app
+
+Booking and payment changes are published to the event stream
+(core.events, served by BookingEventStreamView) after the transaction
+commits:
+  - task.created / task.removed to all providers, when a booking enters or
+    leaves the available tasks feed (pending without a provider)
+  - booking.status_changed to the booking's customer and provider
+  - payment.status_changed to the booking's customer
+"""
+from django.db.models.signals import post_init, post_save
+from django.dispatch import receiver
+from core import events
+from payments.models import Payment
+from .models import Booking
+
+PROVIDERS = 'role:provider'
+
+
+def user_audience(user_id):
+    return f'user:{user_id}'
+
+
+def _is_open_task(status, provider_id):
+    return status == 'pending' and provider_id is None
+
+
+def task_data(booking):
+    """What providers see of a new task (no customer details)"""
+    return {
+        'id': str(booking.pk),
+        'service_type': booking.service_type,
+        'city': booking.city,
+        'state': booking.state,
+        'country': booking.country,
+        'budget': str(booking.budget) if booking.budget is not None else None,
+        'start_time': booking.start_time.isoformat(),
+        'duration_hours': booking.duration_hours,
+        'created_at': booking.created_at.isoformat(),
+    }
+
+
+@receiver(post_init, sender=Booking)
+def remember_booking_state(sender, instance, **kwargs):
+    """Keep the loaded status and provider to detect changes on save"""
+    if instance.get_deferred_fields() & {'status', 'provider_id'}:
+        instance._loaded_state = None
+    else:
+        instance._loaded_state = (instance.status, instance.provider_id)
+
+
+@receiver(post_save, sender=Booking)
+def publish_booking_changes(sender, instance, created, **kwargs):
+    current = (instance.status, instance.provider_id)
+    previous = None if created else instance._loaded_state
+    instance._loaded_state = current
+    if previous == current:
+        return
+
+    if created:
+        if _is_open_task(*current):
+            events.publish('task.created', task_data(instance), [PROVIDERS])
+        return
+
+    if previous is not None and _is_open_task(*previous) and not _is_open_task(*current):
+        events.publish('task.removed', {'id': str(instance.pk)}, [PROVIDERS])
+
+    audience = [user_audience(instance.user_id)]
+    if instance.provider_id is not None:
+        audience.append(user_audience(instance.provider_id))
+    events.publish('booking.status_changed', {
+        'id': str(instance.pk),
+        'status': instance.status,
+        'previous_status': previous[0] if previous else None,
+        'provider_id': instance.provider_id,
+    }, audience)
+
+
+@receiver(post_init, sender=Payment)
+def remember_payment_status(sender, instance, **kwargs):
+    instance._loaded_status = None if 'status' in instance.get_deferred_fields() else instance.status
+
+
+@receiver(post_save, sender=Payment)
+def publish_payment_changes(sender, instance, created, **kwargs):
+    if not created and instance.status == instance._loaded_status:
+        return
+    instance._loaded_status = instance.status
+    customer_id = Booking.objects.filter(pk=instance.booking_id).values_list('user_id', flat=True).first()
+    if customer_id is not None:
+        events.publish('payment.status_changed', {
+            'booking_id': str(instance.booking_id),
+            'status': instance.status,
+        }, [user_audience(customer_id)])
@@ -10,7 +10,8 @@ from .views import (
     AvailableTasksListView,
     AcceptBookingView,
     StartJobView,
-    CompleteJobView
+    CompleteJobView,
+    BookingEventStreamView
 )
 
 urlpatterns = [
@@ -35,6 +36,9 @@ urlpatterns = [
     # Provider completes a job
     path('<uuid:pk>/complete/', CompleteJobView.as_view(), name='complete-job'),
 
+    # Server-Sent Events stream of booking and task updates
+    path('events/', BookingEventStreamView.as_view(), name='booking-events'),
+
     # Booking statistics
     path('stats/', user_booking_stats, name='booking-stats'),
 
@@ -5,13 +5,22 @@ from rest_framework import generics, status, permissions
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes, authentication_classes
 from django.shortcuts import get_object_or_404
+from django.db import connection
+from django.http import StreamingHttpResponse
 from django.db.models import Q, Count
 from accounts.authentication import JWTCookieAuthentication
 from accounts.views import IsProvider
-from core.parsers import EncryptedJSONParser
+from core import events
+from core.pagination import KeysetPagination
+from core.ratelimit import UserRateThrottle
+from core.renderers import CodecJSONRenderer, EventStreamRenderer
 from core import success_response
 from .models import Booking
-from .serializers import BookingCreateSerializer, BookingDetailSerializer, BookingListSerializer
+from .signals import PROVIDERS, user_audience
+from .serializers import (
+    AvailableTaskSerializer, AvailableTasksFilterSerializer, BookingCreateSerializer, BookingDetailSerializer,
+    BookingListSerializer, BookingStatusSerializer,
+)
 
 
 class BookingCreateView(generics.CreateAPIView):
@@ -21,7 +30,8 @@ class BookingCreateView(generics.CreateAPIView):
     serializer_class = BookingCreateSerializer
     authentication_classes = [JWTCookieAuthentication]
     permission_classes = [permissions.IsAuthenticated]
-    parser_classes = [EncryptedJSONParser]
+    throttle_classes = [UserRateThrottle]
+    throttle_scope = 'booking_create'
 
     def get_serializer_context(self):
         """Add request to serializer context for user access"""
@@ -49,17 +59,19 @@ class BookingListView(generics.ListAPIView):
     serializer_class = BookingDetailSerializer
     authentication_classes = [JWTCookieAuthentication]
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         """Return only bookings for the authenticated user"""
-        return Booking.objects.filter(user=self.request.user).select_related('provider').order_by('-created_at')
+        return Booking.objects.with_pii().filter(user=self.request.user).select_related('user', 'provider', 'payment')
     
     def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
+        page = self.paginate_queryset(self.get_queryset())
+        serializer = self.get_serializer(page, many=True)
         return success_response(
             data=serializer.data,
-            message='Bookings retrieved successfully'
+            message='Bookings retrieved successfully',
+            pagination=self.paginator.get_pagination_data()
         )
 
 
@@ -74,7 +86,9 @@ class BookingDetailView(generics.RetrieveAPIView):
     def get_object(self):
         """Get booking if it belongs to the authenticated user"""
         booking_id = self.kwargs['pk']
-        booking = get_object_or_404(Booking, id=booking_id)
+        booking = get_object_or_404(
+            Booking.objects.with_pii().select_related('user', 'provider', 'payment'), id=booking_id
+        )
 
         # Check if booking belongs to the authenticated user or provider
         if booking.user != self.request.user and booking.provider != self.request.user:
@@ -103,7 +117,7 @@ class BookingUpdateView(generics.UpdateAPIView):
     def get_object(self):
         """Get booking if it belongs to the authenticated user"""
         booking_id = self.kwargs['pk']
-        booking = get_object_or_404(Booking, id=booking_id)
+        booking = get_object_or_404(Booking.objects.with_pii(), id=booking_id)
 
         # Check if booking belongs to the authenticated user
         if booking.user != self.request.user:
@@ -140,14 +154,16 @@ class CancelBookingView(generics.UpdateAPIView):
     """
     Cancel a booking (customer only)
     """
-    serializer_class = BookingDetailSerializer
+    serializer_class = BookingStatusSerializer
     authentication_classes = [JWTCookieAuthentication]
     permission_classes = [permissions.IsAuthenticated]
 
     def get_object(self):
         """Get booking if it belongs to the authenticated user"""
         booking_id = self.kwargs['pk']
-        booking = get_object_or_404(Booking, id=booking_id)
+        booking = get_object_or_404(
+            Booking.objects.select_related('user', 'provider', 'payment'), id=booking_id
+        )
 
         # Check if booking belongs to the authenticated user
         if booking.user != self.request.user:
@@ -203,20 +219,22 @@ class ProviderBookingListView(generics.ListAPIView):
     serializer_class = BookingDetailSerializer
     authentication_classes = [JWTCookieAuthentication]
     permission_classes = [permissions.IsAuthenticated, IsProvider]
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         """Return bookings accepted by the current provider"""
-        return Booking.objects.filter(
-            provider=self.request.user
-        ).select_related('user', 'provider').order_by('-created_at')
+        return Booking.objects.with_pii().filter(
+            provider_id=self.request.user.id
+        ).select_related('user', 'provider', 'payment')
     
     def list(self, request, *args, **kwargs):
         """Override list to return unified response format"""
-        queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
+        page = self.paginate_queryset(self.get_queryset())
+        serializer = self.get_serializer(page, many=True)
         return success_response(
             data=serializer.data,
-            message='Received orders retrieved successfully'
+            message='Received orders retrieved successfully',
+            pagination=self.paginator.get_pagination_data()
         )
 
 
@@ -225,24 +243,34 @@ class AvailableTasksListView(generics.ListAPIView):
     List available tasks (bookings without a provider assigned)
     Providers can view and accept these tasks
     """
-    serializer_class = BookingDetailSerializer
+    serializer_class = AvailableTaskSerializer
     authentication_classes = [JWTCookieAuthentication]
     permission_classes = [permissions.IsAuthenticated, IsProvider]
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
-        """Return bookings that don't have a provider yet"""
-        return Booking.objects.filter(
+        """
+        Return bookings that don't have a provider yet, narrowed by the
+        query parameters of AvailableTasksFilterSerializer
+        (?city=Adelaide&service_type=cleaning&budget_min=50&start_after=...)
+        """
+        # Empty parameters (?city=) mean no filter
+        params = {key: value for key, value in self.request.query_params.items() if value}
+        filters = AvailableTasksFilterSerializer(data=params)
+        filters.is_valid(raise_exception=True)
+        return filters.filter_queryset(Booking.objects.with_notes().filter(
             provider__isnull=True,
             status='pending'
-        ).select_related('user').order_by('-created_at')
+        )).select_related('user', 'payment')
     
     def list(self, request, *args, **kwargs):
         """Override list to return unified response format"""
-        queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
+        page = self.paginate_queryset(self.get_queryset())
+        serializer = self.get_serializer(page, many=True)
         return success_response(
             data=serializer.data,
-            message='Available tasks retrieved successfully'
+            message='Available tasks retrieved successfully',
+            pagination=self.paginator.get_pagination_data()
         )
 
 
@@ -251,15 +279,16 @@ class AcceptBookingView(generics.UpdateAPIView):
     Accept a booking (assign provider to booking)
     Provider can accept an available task and optionally provide a quote
     """
-    serializer_class = BookingDetailSerializer
+    serializer_class = BookingStatusSerializer
     authentication_classes = [JWTCookieAuthentication]
     permission_classes = [permissions.IsAuthenticated, IsProvider]
-    parser_classes = [EncryptedJSONParser]
 
     def get_object(self):
         """Get booking if it's available (no provider assigned)"""
         booking_id = self.kwargs['pk']
-        booking = get_object_or_404(Booking, id=booking_id)
+        booking = get_object_or_404(
+            Booking.objects.select_related('user', 'provider', 'payment'), id=booking_id
+        )
 
         # Check if booking is available
         if booking.provider is not None:
@@ -299,15 +328,16 @@ class StartJobView(generics.UpdateAPIView):
     Start a job (change status from confirmed to in_progress)
     Provider only - requires confirmation code
     """
-    serializer_class = BookingDetailSerializer
+    serializer_class = BookingStatusSerializer
     authentication_classes = [JWTCookieAuthentication]
     permission_classes = [permissions.IsAuthenticated, IsProvider]
-    parser_classes = [EncryptedJSONParser]
 
     def get_object(self):
         """Get booking if it belongs to the provider and is confirmed"""
         booking_id = self.kwargs['pk']
-        booking = get_object_or_404(Booking, id=booking_id)
+        booking = get_object_or_404(
+            Booking.objects.select_related('user', 'provider', 'payment'), id=booking_id
+        )
 
         # Check if booking belongs to this provider
         if booking.provider != self.request.user:
@@ -351,14 +381,16 @@ class CompleteJobView(generics.UpdateAPIView):
     Complete a job (change status from in_progress to completed)
     Provider only
     """
-    serializer_class = BookingDetailSerializer
+    serializer_class = BookingStatusSerializer
     authentication_classes = [JWTCookieAuthentication]
     permission_classes = [permissions.IsAuthenticated, IsProvider]
 
     def get_object(self):
         """Get booking if it belongs to the provider and is in progress"""
         booking_id = self.kwargs['pk']
-        booking = get_object_or_404(Booking, id=booking_id)
+        booking = get_object_or_404(
+            Booking.objects.select_related('user', 'provider', 'payment'), id=booking_id
+        )
 
         # Check if booking belongs to this provider
         if booking.provider != self.request.user:
@@ -382,4 +414,35 @@ class CompleteJobView(generics.UpdateAPIView):
         return success_response(
             data=serializer.data,
             message='Job completed successfully'
-        )
\ No newline at end of file
+        )
+
+
+class BookingEventStreamView(generics.GenericAPIView):
+    """
+    Server-Sent Events stream of the current user's booking updates
+    (booking.status_changed, payment.status_changed) and, for providers,
+    tasks entering and leaving the available feed (task.created,
+    task.removed). Reconnecting clients send Last-Event-ID to resume; a
+    `reset` event means updates were missed and lists should be refetched.
+    """
+    authentication_classes = [JWTCookieAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+    renderer_classes = [CodecJSONRenderer, EventStreamRenderer]
+
+    def get(self, request, *args, **kwargs):
+        audience = [user_audience(request.user.id)]
+        if request.user.is_provider():
+            audience.append(PROVIDERS)
+        try:
+            last_event_id = int(request.headers.get('Last-Event-ID', ''))
+        except ValueError:
+            last_event_id = None
+
+        # The stream may stay open for minutes; don't hold a DB connection
+        connection.close()
+        response = StreamingHttpResponse(
+            events.stream(audience, last_event_id), content_type='text/event-stream'
+        )
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'  # Disable nginx buffering
+        return response
@@ -0,0 +1,46 @@
+"""
+Admin configuration for core app
+"""
+import json
+from django.contrib import admin
+from django.utils.html import format_html
+from .models import ProfilingConfig, SlowRequest
+from .profiling import reset_sampling_config
+
+
+@admin.register(ProfilingConfig)
+class ProfilingConfigAdmin(admin.ModelAdmin):
+    """Admin for request profiling sampling"""
+    list_display = ['__str__', 'sample_rate', 'route', 'updated_at']
+    readonly_fields = ['updated_at']
+
+    def has_add_permission(self, request):
+        return not ProfilingConfig.objects.exists()
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        reset_sampling_config()
+
+
+@admin.register(SlowRequest)
+class SlowRequestAdmin(admin.ModelAdmin):
+    """Read-only view of requests captured by core.slow_requests"""
+    list_display = ['created_at', 'method', 'path', 'route', 'status', 'duration_ms', 'db_ms', 'query_count']
+    list_filter = ['route', 'method', 'status']
+    search_fields = ['request_id', 'path', 'route']
+    ordering = ['-created_at']
+    readonly_fields = ['created_at', 'request_id', 'method', 'path', 'route', 'status',
+                       'duration_ms', 'db_ms', 'query_count', 'queries_display']
+    exclude = ['queries']
+
+    def queries_display(self, obj):
+        """Statements, slowest first, with their origin and EXPLAIN output"""
+        queries = sorted(obj.queries or [], key=lambda query: query.get('duration_ms', 0), reverse=True)
+        return format_html('<pre style="white-space: pre-wrap">{}</pre>', json.dumps(queries, indent=2))
+    queries_display.short_description = 'Queries'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,64 @@
+"""
+Helpers for long-running batch jobs over large tables
+"""
+import time
+
+
+def keyset_chunks(queryset, fields, batch_size=500, start_after=None):
+    """
+    Yield rows of a queryset in primary key order, one chunk at a time
+
+    Each chunk is a fresh query filtered on the last primary key seen
+    (keyset iteration), so no cursor or transaction stays open between
+    chunks and deep chunks cost the same as the first one.
+
+    Args:
+        queryset: The queryset to walk
+        fields: Field names to fetch after the primary key
+        batch_size: Maximum number of rows per chunk
+        start_after: Primary key to resume after, or None to start at the beginning
+
+    Yields:
+        Lists of (pk, *fields) tuples
+    """
+    last_pk = start_after
+    while True:
+        chunk = queryset.order_by('pk')
+        if last_pk is not None:
+            chunk = chunk.filter(pk__gt=last_pk)
+        rows = list(chunk.values_list('pk', *fields)[:batch_size])
+        if not rows:
+            return
+        yield rows
+        last_pk = rows[-1][0]
+
+
+class ProgressMeter:
+    """Track rows processed by a batch job and keep it under a rate limit"""
+
+    def __init__(self, rows_per_second=0):
+        self.rows_per_second = rows_per_second
+        self.rows = 0
+        self.started = time.monotonic()
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the job started"""
+        return time.monotonic() - self.started
+
+    @property
+    def rate(self) -> float:
+        """Average rows per second so far"""
+        elapsed = self.elapsed
+        return self.rows / elapsed if elapsed else 0.0
+
+    def add(self, rows: int):
+        """Record processed rows"""
+        self.rows += rows
+
+    def throttle(self):
+        """Sleep until the average rate is back under the limit"""
+        if self.rows_per_second > 0:
+            delay = self.rows / self.rows_per_second - self.elapsed
+            if delay > 0:
+                time.sleep(delay)
@@ -0,0 +1,62 @@
+"""
+Small in-process caches for SafeHome
+
+TTLCache keeps at most `max_size` entries for `ttl` seconds each and evicts
+the least recently used entry when full. It is per process: entries cached
+by one worker are not seen (or invalidated) by another, so keep the TTL
+short for anything that can change.
+"""
+import time
+import threading
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Size-bounded LRU cache whose entries expire after `ttl` seconds"""
+
+    def __init__(self, max_size=1024, ttl=30.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            expires, value = entry
+            if expires <= now:
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        if self.ttl <= 0 or self.max_size <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def delete_where(self, predicate):
+        """Remove every entry whose key matches `predicate`"""
+        with self._lock:
+            for key in [key for key in self._data if predicate(key)]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
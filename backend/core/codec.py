@@ -0,0 +1,109 @@
+"""
+JSON codecs shared by the request parsers and response renderers
+
+Two implementations are provided: a stdlib one that is always available and
+an orjson one used when the package is installed. Both produce the same
+output for the types our models and serializers emit:
+
+    Decimal   -> string ("180.00"), like DRF's COERCE_DECIMAL_TO_STRING
+    UUID      -> canonical string
+    datetime  -> ISO 8601, UTC written as "Z" (same as DRF's JSONEncoder)
+
+Select one with the JSON_CODEC setting ("auto", "stdlib" or "orjson").
+"""
+import json
+import uuid
+import decimal
+import datetime
+from django.conf import settings
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+_drf_encoder = JSONEncoder()
+
+
+def _default(obj):
+    """Encode the non-JSON types handled by both codecs"""
+    if isinstance(obj, decimal.Decimal):
+        return str(obj)
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    if isinstance(obj, datetime.datetime):
+        representation = obj.isoformat()
+        if representation.endswith('+00:00'):
+            representation = representation[:-6] + 'Z'
+        return representation
+    # Lazy strings, querysets, dates, timedeltas, ...
+    return _drf_encoder.default(obj)
+
+
+def _reject_constant(value):
+    raise ValueError(f'Out of range float values are not JSON compliant: {value!r}')
+
+
+class _StdlibEncoder(JSONEncoder):
+    def default(self, obj):
+        return _default(obj)
+
+
+class StdlibCodec:
+    """JSON codec built on the standard library json module"""
+    name = 'stdlib'
+
+    def __init__(self):
+        self._encoder = _StdlibEncoder(ensure_ascii=False, allow_nan=False, separators=(',', ':'))
+
+    def dumps(self, obj) -> bytes:
+        return self._encoder.encode(obj).encode('utf-8')
+
+    def loads(self, data):
+        return json.loads(data, parse_constant=_reject_constant)
+
+
+class OrjsonCodec:
+    """JSON codec built on orjson, which encodes straight to bytes"""
+    name = 'orjson'
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError("orjson is not installed")
+        # Datetimes go through _default so the output matches StdlibCodec
+        self._options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+    def dumps(self, obj) -> bytes:
+        return orjson.dumps(obj, default=_default, option=self._options)
+
+    def loads(self, data):
+        return orjson.loads(data)
+
+
+_codecs = {}
+
+
+def get_codec(name=None):
+    """
+    Return the JSON codec named by `name` or by the JSON_CODEC setting
+
+    "auto" picks orjson when it is installed and the stdlib codec otherwise.
+    """
+    name = name or getattr(settings, 'JSON_CODEC', 'auto')
+    if name == 'auto':
+        name = 'orjson' if orjson is not None else 'stdlib'
+
+    codec = _codecs.get(name)
+    if codec is None:
+        if name == 'orjson':
+            codec = OrjsonCodec()
+        elif name == 'stdlib':
+            codec = StdlibCodec()
+        else:
+            raise ValueError(f"Unknown JSON codec: {name}")
+        _codecs[name] = codec
+    return codec
+
+
+__all__ = ['StdlibCodec', 'OrjsonCodec', 'get_codec']
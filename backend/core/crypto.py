@@ -1,21 +1,47 @@
 """
-Encryption utility using Fernet symmetric encryption
+Encryption utility using Fernet and AES-GCM symmetric encryption
 """
 import os
+import hmac
 import base64
+import hashlib
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from .timing import timed
 
 
-def _derive_key(key_string: str) -> bytes:
+# Salt used by key version 1 and by the frontend transport encryption
+LEGACY_SALT = b"safehome_salt_2024"
+
+# Version assumed for ciphertexts written before versions were tagged
+LEGACY_KEY_VERSION = 1
+
+# First byte of a binary at-rest ciphertext. Text ciphertexts from enc()
+# always start with a printable character, so the two never collide.
+BLOB_FORMAT = 0x01
+
+# Binary layout: format (1) | key version (1) | nonce (12) | ciphertext | tag (16)
+_BLOB_HEADER_SIZE = 2
+_BLOB_NONCE_SIZE = 12
+
+
+def _salt_for_version(version: int) -> bytes:
+    """Return the PBKDF2 salt for a key version"""
+    if version == LEGACY_KEY_VERSION:
+        return LEGACY_SALT
+    return f"safehome_salt_v{version}".encode()
+
+
+def _derive_raw_key(key_string: str, salt: bytes = LEGACY_SALT) -> bytes:
     """
-    Derive a 32-byte key from the provided key string using PBKDF2
+    Derive the raw 32-byte key from the provided key string using PBKDF2
     """
-    # Use a fixed salt for consistent key derivation
-    salt = b"safehome_salt_2024"
-
     kdf = PBKDF2HMAC(
         algorithm=hashes.SHA256(),
         length=32,
@@ -23,24 +49,214 @@ def _derive_key(key_string: str) -> bytes:
         iterations=100000,
     )
 
-    key = base64.urlsafe_b64encode(kdf.derive(key_string.encode()))
-    return key
+    return kdf.derive(key_string.encode())
+
+
+def _derive_key(key_string: str, salt: bytes = LEGACY_SALT) -> bytes:
+    """
+    Derive a 32-byte key from the provided key string using PBKDF2
+    """
+    return base64.urlsafe_b64encode(_derive_raw_key(key_string, salt))
+
+
+def _derive_subkey(raw_key: bytes, purpose: bytes) -> bytes:
+    """
+    Derive a purpose-specific subkey from a PBKDF2 key with HKDF
+
+    Separate subkeys keep storage encryption and blind indexes independent
+    of the Fernet key and of the key shared with the frontend.
+    """
+    hkdf = HKDF(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=None,
+        info=purpose,
+    )
+    return hkdf.derive(raw_key)
+
+
+def _parse_previous_keys(value: str) -> dict:
+    """
+    Parse FERNET_PREVIOUS_KEYS ("2:key-two,1:key-one") into {version: key}
+    """
+    previous = {}
+    for entry in filter(None, (part.strip() for part in value.split(','))):
+        version, sep, key_string = entry.partition(':')
+        if not sep or not version.strip().isdigit() or not key_string:
+            raise ValueError(
+                "FERNET_PREVIOUS_KEYS entries must look like '<version>:<key>'"
+            )
+        previous[int(version)] = key_string
+    return previous
+
+
+# Ciphers derived from one keyring configuration
+_DerivedKeys = namedtuple(
+    '_DerivedKeys', ['source', 'version', 'fernets', 'aeads', 'aesgcm', 'index_key']
+)
+
+
+class KeyRing:
+    """
+    Process-wide cache of the ciphers derived from the configured keys.
+
+    The keyring is configured from the environment:
+
+    - FERNET_KEY: the current key, used for all new ciphertexts
+    - FERNET_KEY_VERSION: the version number of FERNET_KEY (default 1)
+    - FERNET_PREVIOUS_KEYS: retired keys that can still decrypt, as
+      comma-separated "<version>:<key>" pairs
+    - BLIND_INDEX_KEY: secret for blind indexes (default: FERNET_KEY). Set
+      it so that rotating FERNET_KEY does not change existing indexes
+
+    PBKDF2 runs 100,000 iterations on purpose, so each key is derived once
+    per process instead of once per call. The environment variables are
+    re-read on every lookup (cheap dict accesses); when they change, the
+    ciphers are rebuilt, reusing any key that was already derived.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._keys = None
+        self._derived = {}
+
+    def _get_keys(self) -> _DerivedKeys:
+        fernet_key = os.environ.get('FERNET_KEY')
+        if not fernet_key:
+            raise ValueError("FERNET_KEY environment variable is required")
+
+        source = (
+            fernet_key,
+            os.environ.get('FERNET_KEY_VERSION', ''),
+            os.environ.get('FERNET_PREVIOUS_KEYS', ''),
+            os.environ.get('BLIND_INDEX_KEY', ''),
+        )
+
+        # Fast path: the whole tuple is swapped atomically, no lock needed
+        keys = self._keys
+        if keys is not None and keys.source == source:
+            return keys
+
+        with self._lock:
+            # Another thread may have derived the keys while we waited
+            keys = self._keys
+            if keys is None or keys.source != source:
+                keys = self._build(source)
+                self._keys = keys
+            return keys
+
+    def _raw_key(self, key_string: str, salt: bytes) -> bytes:
+        """Derive a key, reusing earlier derivations of the same input"""
+        raw_key = self._derived.get((key_string, salt))
+        if raw_key is None:
+            raw_key = _derive_raw_key(key_string, salt)
+            self._derived[(key_string, salt)] = raw_key
+        return raw_key
+
+    def _build(self, source) -> _DerivedKeys:
+        fernet_key, version_string, previous_string, index_string = source
+
+        version = int(version_string) if version_string else LEGACY_KEY_VERSION
+        key_strings = _parse_previous_keys(previous_string)
+        key_strings[version] = fernet_key
+
+        if not 0 < version < 256:
+            raise ValueError("FERNET_KEY_VERSION must be between 1 and 255")
+
+        fernets = {}
+        aeads = {}
+        for key_version, key_string in key_strings.items():
+            raw_key = self._raw_key(key_string, _salt_for_version(key_version))
+            fernets[key_version] = Fernet(base64.urlsafe_b64encode(raw_key))
+            aeads[key_version] = AESGCM(_derive_subkey(raw_key, b"safehome-at-rest"))
+
+        # The frontend derives its AES-GCM key from the current key and
+        # the legacy salt, independent of the key version
+        aesgcm = AESGCM(self._raw_key(fernet_key, LEGACY_SALT))
+
+        index_key = _derive_subkey(
+            self._raw_key(index_string or fernet_key, LEGACY_SALT),
+            b"safehome-blind-index",
+        )
+
+        return _DerivedKeys(
+            source=source,
+            version=version,
+            fernets=fernets,
+            aeads=aeads,
+            aesgcm=aesgcm,
+            index_key=index_key,
+        )
+
+    @property
+    def current_version(self) -> int:
+        """Return the version of the key used for new ciphertexts"""
+        return self._get_keys().version
+
+    def fernet(self, version: int = None) -> Fernet:
+        """Return the Fernet instance for a key version (default: current)"""
+        keys = self._get_keys()
+        if version is None:
+            version = keys.version
+        try:
+            return keys.fernets[version]
+        except KeyError:
+            raise ValueError(f"Unknown key version: {version}")
+
+    def aesgcm(self) -> AESGCM:
+        """Return the AES-GCM cipher shared with the frontend"""
+        return self._get_keys().aesgcm
+
+    def invalidate(self):
+        """Drop the cached keys so the next call derives them again"""
+        with self._lock:
+            self._keys = None
+            self._derived = {}
+
+
+keyring = KeyRing()
 
 
 def _get_fernet() -> Fernet:
     """
-    Get or create a Fernet instance using the FERNET_KEY environment variable
+    Get the cached Fernet instance for the current key
     """
-    fernet_key = os.environ.get('FERNET_KEY')
-    if not fernet_key:
-        raise ValueError("FERNET_KEY environment variable is required")
+    return keyring.fernet()
 
-    # Derive a proper 32-byte key from the provided key string
-    key_bytes = _derive_key(fernet_key)
 
-    return Fernet(key_bytes)
+def _split_version(encrypted_data: str):
+    """
+    Split an "v<version>:<token>" string into (version, token)
+
+    Untagged strings were written before key versions existed and belong
+    to LEGACY_KEY_VERSION. The base64 alphabet has no ':' so the tag can
+    never be confused with token data.
+    """
+    if encrypted_data.startswith('v'):
+        tag, sep, token = encrypted_data.partition(':')
+        if sep and tag[1:].isdigit():
+            return int(tag[1:]), token
+    return None, encrypted_data
 
 
+def key_version(encrypted_data: str) -> int:
+    """
+    Return the key version an enc() string was encrypted with
+
+    Args:
+        encrypted_data: String returned by enc()
+
+    Returns:
+        The key version number
+    """
+    if not isinstance(encrypted_data, str):
+        raise TypeError("Encrypted data must be a string")
+
+    version, _ = _split_version(encrypted_data)
+    return LEGACY_KEY_VERSION if version is None else version
+
+
+@timed('crypto')
 def enc(data: str) -> str:
     """
     Encrypt a string using Fernet symmetric encryption
@@ -49,7 +265,8 @@ def enc(data: str) -> str:
         data: The string data to encrypt
 
     Returns:
-        Base64 encoded encrypted string
+        Base64 encoded encrypted string, prefixed with the key version
+        ("v<version>:<token>")
 
     Raises:
         ValueError: If FERNET_KEY is not set
@@ -57,18 +274,21 @@ def enc(data: str) -> str:
     if not isinstance(data, str):
         raise TypeError("Data must be a string")
 
-    fernet = _get_fernet()
-    encrypted_bytes = fernet.encrypt(data.encode('utf-8'))
+    keys = keyring._get_keys()
+    encrypted_bytes = keys.fernets[keys.version].encrypt(data.encode('utf-8'))
     # Return as base64 string for easy storage/transmission
-    return base64.urlsafe_b64encode(encrypted_bytes).decode('utf-8')
+    token = base64.urlsafe_b64encode(encrypted_bytes).decode('utf-8')
+    return f"v{keys.version}:{token}"
 
 
+@timed('crypto')
 def dec(encrypted_data: str) -> str:
     """
     Decrypt a string using Fernet symmetric encryption
 
     Args:
-        encrypted_data: Base64 encoded encrypted string
+        encrypted_data: String returned by enc(), with or without the
+            key version prefix
 
     Returns:
         The original decrypted string
@@ -80,16 +300,230 @@ def dec(encrypted_data: str) -> str:
         raise TypeError("Encrypted data must be a string")
 
     try:
-        # Decode from base64
-        encrypted_bytes = base64.urlsafe_b64decode(encrypted_data.encode('utf-8'))
+        return _decrypt_token(keyring._get_keys(), encrypted_data)
+    except Exception as e:
+        raise ValueError(f"Decryption failed: {str(e)}")
 
-        fernet = _get_fernet()
-        decrypted_bytes = fernet.decrypt(encrypted_bytes)
-        return decrypted_bytes.decode('utf-8')
+
+def _decrypt_token(keys: _DerivedKeys, encrypted_data: str) -> str:
+    """Decrypt one enc() string with an already resolved keyring"""
+    version, token = _split_version(encrypted_data)
+    if version is None:
+        # Legacy strings belong to version 1, or to the only key when
+        # no version 1 key is configured
+        version = LEGACY_KEY_VERSION if LEGACY_KEY_VERSION in keys.fernets else keys.version
+
+    fernet = keys.fernets.get(version)
+    if fernet is None:
+        raise ValueError(f"Unknown key version: {version}")
+
+    encrypted_bytes = base64.urlsafe_b64decode(token.encode('utf-8'))
+    return fernet.decrypt(encrypted_bytes).decode('utf-8')
+
+
+# Shared pools for dec_many, one per requested size
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def _get_executor(workers: int) -> ThreadPoolExecutor:
+    """Return the process-wide thread pool with the given number of workers"""
+    executor = _executors.get(workers)
+    if executor is None:
+        with _executors_lock:
+            executor = _executors.get(workers)
+            if executor is None:
+                executor = ThreadPoolExecutor(
+                    max_workers=workers,
+                    thread_name_prefix='safehome-crypto',
+                )
+                _executors[workers] = executor
+    return executor
+
+
+def _map_batch(decrypt, values: list, workers: int = None) -> list:
+    """
+    Apply decrypt to every value, optionally on the shared thread pool
+
+    With workers >= 2 the batch is split into one chunk per worker;
+    cryptography releases the GIL inside OpenSSL, so large batches
+    decrypt in parallel.
+    """
+    def decrypt_chunk(chunk):
+        try:
+            return [decrypt(value) if value else "" for value in chunk]
+        except Exception as e:
+            raise ValueError(f"Decryption failed: {str(e)}")
+
+    # Below two items per worker the pool overhead outweighs the gain
+    if not workers or workers < 2 or len(values) < workers * 2:
+        return decrypt_chunk(values)
+
+    chunk_size = -(-len(values) // workers)
+    chunks = [values[i:i + chunk_size] for i in range(0, len(values), chunk_size)]
+
+    results = []
+    for decrypted in _get_executor(workers).map(decrypt_chunk, chunks):
+        results.extend(decrypted)
+    return results
+
+
+@timed('crypto')
+def dec_many(encrypted_values, workers: int = None) -> list:
+    """
+    Decrypt many strings encrypted with enc() in one pass
+
+    The keyring is resolved once for the whole batch, and the batch can be
+    spread over a shared thread pool.
+
+    Args:
+        encrypted_values: Iterable of base64 encoded encrypted strings.
+            Empty values (None or "") decrypt to ""
+        workers: Size of the thread pool to use, or None to decrypt
+            sequentially in the calling thread
+
+    Returns:
+        List of decrypted strings in the same order as the input
+
+    Raises:
+        ValueError: If FERNET_KEY is not set or any decryption fails
+    """
+    values = list(encrypted_values)
+    for value in values:
+        if value and not isinstance(value, str):
+            raise TypeError("Encrypted data must be a string")
+
+    keys = keyring._get_keys()
+    return _map_batch(lambda value: _decrypt_token(keys, value), values, workers)
+
+
+@timed('crypto')
+def enc_bytes(data: str) -> bytes:
+    """
+    Encrypt a string into the compact binary at-rest format
+
+    The result is raw bytes meant for a BinaryField: a format byte, the key
+    version, a 12-byte nonce and the AES-GCM ciphertext with its tag. The
+    two header bytes are authenticated as associated data.
+
+    Args:
+        data: The string data to encrypt
+
+    Returns:
+        The encrypted bytes
+
+    Raises:
+        ValueError: If FERNET_KEY is not set
+    """
+    if not isinstance(data, str):
+        raise TypeError("Data must be a string")
+
+    keys = keyring._get_keys()
+    header = bytes((BLOB_FORMAT, keys.version))
+    nonce = os.urandom(_BLOB_NONCE_SIZE)
+    return header + nonce + keys.aeads[keys.version].encrypt(nonce, data.encode('utf-8'), header)
+
+
+@timed('crypto')
+def dec_bytes(blob) -> str:
+    """
+    Decrypt a value stored by enc_bytes(), or a legacy enc() value
+
+    Rows written before the binary format hold the UTF-8 bytes of an enc()
+    string; those are still decrypted transparently.
+
+    Args:
+        blob: bytes, bytearray or memoryview read from a BinaryField
+
+    Returns:
+        The original decrypted string
+
+    Raises:
+        ValueError: If FERNET_KEY is not set or decryption fails
+    """
+    if not isinstance(blob, (bytes, bytearray, memoryview)):
+        raise TypeError("Encrypted data must be bytes")
+
+    try:
+        return _decrypt_blob(keyring._get_keys(), bytes(blob))
     except Exception as e:
         raise ValueError(f"Decryption failed: {str(e)}")
 
 
+def _decrypt_blob(keys: _DerivedKeys, blob: bytes) -> str:
+    """Decrypt one binary or legacy text value with an already resolved keyring"""
+    if not blob or blob[0] != BLOB_FORMAT:
+        return _decrypt_token(keys, blob.decode('utf-8'))
+
+    version = blob[1]
+    aead = keys.aeads.get(version)
+    if aead is None:
+        raise ValueError(f"Unknown key version: {version}")
+
+    nonce_end = _BLOB_HEADER_SIZE + _BLOB_NONCE_SIZE
+    header, nonce = blob[:_BLOB_HEADER_SIZE], blob[_BLOB_HEADER_SIZE:nonce_end]
+    return aead.decrypt(nonce, blob[nonce_end:], header).decode('utf-8')
+
+
+@timed('crypto')
+def dec_bytes_many(blobs, workers: int = None) -> list:
+    """
+    Decrypt many values stored by enc_bytes() (or legacy enc()) in one pass
+
+    Args:
+        blobs: Iterable of bytes/memoryview values. Empty values decrypt to ""
+        workers: Size of the thread pool to use, or None to decrypt
+            sequentially in the calling thread
+
+    Returns:
+        List of decrypted strings in the same order as the input
+
+    Raises:
+        ValueError: If FERNET_KEY is not set or any decryption fails
+    """
+    values = [bytes(blob) if blob else None for blob in blobs]
+    keys = keyring._get_keys()
+    return _map_batch(lambda blob: _decrypt_blob(keys, blob), values, workers)
+
+
+@timed('crypto')
+def blind_index(value: str) -> str:
+    """
+    Return a keyed hash of a value for equality lookups on encrypted data
+
+    The same input always maps to the same index, so callers should
+    normalize values before hashing. Without the key the index reveals
+    nothing about the value beyond equality with other indexes.
+
+    Args:
+        value: The (normalized) plaintext
+
+    Returns:
+        64-character hex HMAC-SHA256 digest, or "" for an empty value
+    """
+    if not isinstance(value, str):
+        raise TypeError("Data must be a string")
+    if not value:
+        return ""
+
+    index_key = keyring._get_keys().index_key
+    return hmac.new(index_key, value.encode('utf-8'), hashlib.sha256).hexdigest()
+
+
+def blob_key_version(blob):
+    """
+    Return the key version of an enc_bytes() value
+
+    Returns:
+        The key version, or None if the value is in the legacy text format
+    """
+    blob = bytes(blob)
+    if blob and blob[0] == BLOB_FORMAT:
+        return blob[1]
+    return None
+
+
+@timed('crypto')
 def dec_aes_gcm(encrypted_data: str) -> str:
     """
     Decrypts data encrypted with AES-GCM from the frontend.
@@ -98,9 +532,7 @@ def dec_aes_gcm(encrypted_data: str) -> str:
     if not isinstance(encrypted_data, str):
         raise TypeError("Encrypted data must be a string")
 
-    fernet_key = os.environ.get('FERNET_KEY')
-    if not fernet_key:
-        raise ValueError("FERNET_KEY environment variable is required")
+    aesgcm = keyring.aesgcm()
 
     try:
         iv_hex, ciphertext_hex, tag_hex = encrypted_data.split(':')
@@ -109,23 +541,49 @@ def dec_aes_gcm(encrypted_data: str) -> str:
         ciphertext = bytes.fromhex(ciphertext_hex)
         tag = bytes.fromhex(tag_hex)
 
-        # Derive the raw 32-byte key for AES-GCM (not base64 encoded)
-        salt = b"safehome_salt_2024"
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=salt,
-            iterations=100000,
-        )
-        key_bytes = kdf.derive(fernet_key.encode())
-        
-        aesgcm = AESGCM(key_bytes)
-        
         decrypted_bytes = aesgcm.decrypt(iv, ciphertext + tag, None)
         return decrypted_bytes.decode('utf-8')
     except Exception as e:
         raise ValueError(f"AES-GCM decryption failed: {str(e)}")
 
 
+# Binary transport format: nonce || ciphertext || tag, with a 12-byte nonce
+TRANSPORT_NONCE_SIZE = 12
+_TRANSPORT_TAG_SIZE = 16
+
+
+@timed('crypto')
+def enc_aes_gcm_bytes(data) -> bytes:
+    """
+    Encrypts bytes for the frontend in the binary transport format.
+    Returns "nonce || ciphertext || tag" with a fresh 12-byte nonce.
+    """
+    nonce = os.urandom(TRANSPORT_NONCE_SIZE)
+    return nonce + keyring.aesgcm().encrypt(nonce, data, None)
+
+
+@timed('crypto')
+def dec_aes_gcm_bytes(data) -> bytes:
+    """
+    Decrypts a binary AES-GCM body from the frontend.
+    The layout is "nonce || ciphertext || tag" with a 12-byte nonce; the
+    plaintext is returned as bytes so it can go straight into a JSON decode.
+    """
+    if not isinstance(data, (bytes, bytearray, memoryview)):
+        raise TypeError("Encrypted data must be bytes")
+    if len(data) < TRANSPORT_NONCE_SIZE + _TRANSPORT_TAG_SIZE:
+        raise ValueError("AES-GCM decryption failed: body too short")
+
+    view = memoryview(data)
+    try:
+        return keyring.aesgcm().decrypt(view[:TRANSPORT_NONCE_SIZE], view[TRANSPORT_NONCE_SIZE:], None)
+    except Exception as e:
+        raise ValueError(f"AES-GCM decryption failed: {str(e)}")
+
+
 # Export the functions
-__all__ = ['enc', 'dec', 'dec_aes_gcm']
+__all__ = [
+    'enc', 'dec', 'dec_many',
+    'enc_bytes', 'dec_bytes', 'dec_bytes_many', 'blob_key_version', 'blind_index',
+    'dec_aes_gcm', 'enc_aes_gcm_bytes', 'dec_aes_gcm_bytes', 'key_version', 'keyring',
+]
@@ -0,0 +1,256 @@
+"""
+In-process publish/subscribe for Server-Sent Events
+
+publish(type, data, audience) delivers an event to the per-process
+EventBroker, which keeps the last EVENTS_BUFFER_SIZE events and wakes the
+streams waiting on it. Each event has an increasing id, sent as the SSE
+`id:` field, so a reconnecting client resumes with Last-Event-ID. The
+audience is a list of strings ('user:<id>', 'role:provider'); a stream
+only receives events addressed to one of its own.
+
+Backends (EVENTS_BACKEND):
+  - 'local': publish delivers straight to this process's broker. Streams
+    only see events published by the same worker.
+  - 'cache': events are appended to a log in the Django cache (an atomic
+    incr() allocates the id) and every worker polls the log every
+    EVENTS_POLL_INTERVAL seconds into its broker. With a shared cache
+    (Redis/Memcached) this fans events out to all workers, and ids are the
+    same everywhere.
+
+Publishing happens on transaction commit, so streams never announce rows
+that were rolled back.
+"""
+import os
+import json
+import time
+import logging
+import threading
+from collections import deque
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from . import metrics
+
+logger = logging.getLogger('safehome')
+
+events_published = metrics.registry.counter(
+    'safehome_events_published_total', 'Server-sent events published', ['type'],
+)
+stream_connections = metrics.registry.gauge(
+    'safehome_event_streams', 'Open server-sent event streams',
+)
+
+
+class Event:
+    """One published event"""
+
+    __slots__ = ('id', 'type', 'data', 'audience')
+
+    def __init__(self, id, type, data, audience):
+        self.id = id
+        self.type = type
+        self.data = data
+        self.audience = frozenset(audience)
+
+    def to_dict(self):
+        return {'id': self.id, 'type': self.type, 'data': self.data, 'audience': sorted(self.audience)}
+
+    def to_sse(self) -> str:
+        """The event in text/event-stream format"""
+        return f"id: {self.id}\nevent: {self.type}\ndata: {json.dumps(self.data, default=str)}\n\n"
+
+
+class EventBroker:
+    """Recent events of this process, and the streams waiting for more"""
+
+    def __init__(self, buffer_size=None):
+        self._events = deque(maxlen=buffer_size or settings.EVENTS_BUFFER_SIZE)
+        self._condition = threading.Condition(threading.RLock())
+        self.last_id = 0
+
+    def deliver(self, event):
+        with self._condition:
+            if event.id <= self.last_id:
+                return  # Already delivered
+            self._events.append(event)
+            self.last_id = event.id
+            self._condition.notify_all()
+
+    def append(self, event_type, data, audience):
+        """Create and deliver an event with the next local id"""
+        with self._condition:
+            event = Event(self.last_id + 1, event_type, data, audience)
+            self.deliver(event)
+        return event
+
+    def skip_to(self, event_id):
+        """Continue numbering after `event_id` (ids from the shared log)"""
+        with self._condition:
+            self.last_id = max(self.last_id, event_id)
+
+    def wait(self, after_id, timeout):
+        """
+        Events newer than `after_id`, waiting up to `timeout` seconds for one.
+        Returns None when events after `after_id` are no longer buffered (or
+        `after_id` is unknown here), meaning the client must resynchronize.
+        """
+        with self._condition:
+            if self._missed(after_id):
+                return None
+            if after_id == self.last_id:
+                self._condition.wait(timeout)
+                if self._missed(after_id):
+                    return None
+            return [event for event in self._events if event.id > after_id]
+
+    def _missed(self, after_id):
+        """Whether some events after `after_id` cannot be returned from the buffer"""
+        if after_id >= self.last_id:
+            return after_id > self.last_id
+        # Ids up to last_id were published; the buffer must reach back to
+        # after_id + 1 and forward to last_id (skip_to() buffers nothing)
+        return (
+            not self._events
+            or after_id < self._events[0].id - 1
+            or self._events[-1].id < self.last_id
+        )
+
+
+class LocalBackend:
+    """Events stay in this process"""
+
+    def __init__(self, broker):
+        self.broker = broker
+
+    def publish(self, event_type, data, audience):
+        return self.broker.append(event_type, data, audience)
+
+    def start(self):
+        pass
+
+
+class CacheBackend:
+    """Events pass through a log in the Django cache, polled by every worker"""
+
+    SEQUENCE_KEY = 'events:seq'
+
+    def __init__(self, broker):
+        self.broker = broker
+        self._pid = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(event_id):
+        return f'events:{event_id}'
+
+    def publish(self, event_type, data, audience):
+        cache.add(self.SEQUENCE_KEY, 0, None)
+        event_id = cache.incr(self.SEQUENCE_KEY)
+        event = Event(event_id, event_type, data, audience)
+        cache.set(self._key(event_id), event.to_dict(), settings.EVENTS_CACHE_TTL)
+        self.start()
+        return event
+
+    def start(self):
+        """Start this process's poller (again after a fork)"""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            seen = cache.get(self.SEQUENCE_KEY) or 0
+            self.broker.skip_to(seen)
+            threading.Thread(target=self._poll, args=(seen,), name='event-poller', daemon=True).start()
+            self._pid = os.getpid()
+
+    def _poll(self, seen):
+        waiting_since = None
+        while True:
+            time.sleep(settings.EVENTS_POLL_INTERVAL)
+            try:
+                latest = cache.get(self.SEQUENCE_KEY) or 0
+                if latest <= seen:
+                    continue
+                entries = cache.get_many([self._key(n) for n in range(seen + 1, latest + 1)])
+                for event_id in range(seen + 1, latest + 1):
+                    entry = entries.get(self._key(event_id))
+                    if entry is None:
+                        # Id allocated but not written yet; skip it if it never is
+                        waiting_since = waiting_since or time.monotonic()
+                        if time.monotonic() - waiting_since < settings.EVENTS_POLL_INTERVAL * 20:
+                            break
+                    else:
+                        self.broker.deliver(Event(**entry))
+                    seen, waiting_since = event_id, None
+            except Exception:
+                logger.exception('Polling the event log failed')
+
+
+broker = EventBroker()
+_backends = {}
+
+
+def get_backend():
+    name = settings.EVENTS_BACKEND
+    backend = _backends.get(name)
+    if backend is None:
+        if name == 'local':
+            backend = LocalBackend(broker)
+        elif name == 'cache':
+            backend = CacheBackend(broker)
+        else:
+            raise ValueError(f"Unknown events backend {name!r}")
+        backend = _backends.setdefault(name, backend)
+    return backend
+
+
+def publish(event_type, data, audience):
+    """Publish an event once the current transaction commits"""
+    def send():
+        try:
+            get_backend().publish(event_type, data, audience)
+            events_published.inc(type=event_type)
+        except Exception:
+            logger.exception(f'Publishing {event_type} event failed')
+    transaction.on_commit(send)
+
+
+def stream(audience, last_event_id=None):
+    """
+    text/event-stream chunks for a client subscribed to `audience`, starting
+    after `last_event_id` (or with events published from now on). Sends a
+    comment every EVENTS_HEARTBEAT_SECONDS and ends after
+    EVENTS_STREAM_MAX_SECONDS; browsers reconnect with Last-Event-ID.
+    """
+    get_backend().start()
+    audience = frozenset(audience)
+    after_id = broker.last_id if last_event_id is None else last_event_id
+    deadline = time.monotonic() + settings.EVENTS_STREAM_MAX_SECONDS
+
+    def chunks():
+        nonlocal after_id
+        stream_connections.inc()
+        try:
+            yield f"retry: {settings.EVENTS_RETRY_MS}\n\n"
+            heartbeat = settings.EVENTS_HEARTBEAT_SECONDS
+            last_sent = time.monotonic()
+            while time.monotonic() < deadline:
+                events = broker.wait(after_id, heartbeat)
+                if events is None:
+                    # Missed events: the client refetches its lists
+                    after_id = broker.last_id
+                    yield f"id: {after_id}\nevent: reset\ndata: {{}}\n\n"
+                    last_sent = time.monotonic()
+                    continue
+                for event in events:
+                    after_id = event.id
+                    if event.audience & audience:
+                        yield event.to_sse()
+                        last_sent = time.monotonic()
+                if time.monotonic() - last_sent >= heartbeat:
+                    # Keeps proxies from closing an idle connection
+                    yield ": heartbeat\n\n"
+                    last_sent = time.monotonic()
+        finally:
+            stream_connections.dec()
+    return chunks()
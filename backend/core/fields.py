@@ -0,0 +1,95 @@
+"""
+Model helpers for fields stored encrypted with core.crypto
+"""
+from .crypto import enc_bytes, dec_bytes, dec_bytes_many, blind_index
+
+
+class EncryptedAttribute(property):
+    """
+    Plaintext view of a BinaryField holding an enc_bytes() ciphertext
+
+    Reading the attribute decrypts the ciphertext on first access and
+    memoizes the plaintext on the instance, so repeated reads cost nothing
+    and code that never reads the attribute does no crypto work at all.
+    Assigning encrypts the value, updates the optional blind index field and
+    replaces the memoized plaintext.
+
+    The memo remembers which ciphertext object it was computed from, so it
+    is dropped automatically when the raw field changes (refresh_from_db,
+    direct assignment, re-encryption).
+
+    Subclassing property puts the name in Model._meta._property_names, so
+    the model constructor accepts it as a keyword (Booking(address=...)).
+
+    Usage:
+        address = EncryptedAttribute('address_enc', index_field='address_bidx',
+                                     normalize=normalize_address)
+    """
+
+    def __init__(self, field_name, index_field=None, normalize=None):
+        super().__init__()
+        self.field_name = field_name
+        self.index_field = index_field
+        self.normalize = normalize or (lambda value: value)
+        self.cache_name = None
+
+    def __set_name__(self, owner, name):
+        self.cache_name = f'_{name}_plaintext'
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+
+        # getattr (not __dict__) so deferred columns are loaded on demand
+        blob = getattr(instance, self.field_name)
+        cached = instance.__dict__.get(self.cache_name)
+        if cached is not None and cached[0] is blob:
+            return cached[1]
+
+        plaintext = dec_bytes(blob) if blob else ""
+        instance.__dict__[self.cache_name] = (blob, plaintext)
+        return plaintext
+
+    def __set__(self, instance, value):
+        blob = enc_bytes(value)
+        setattr(instance, self.field_name, blob)
+        if self.index_field:
+            setattr(instance, self.index_field, blind_index(self.normalize(value)))
+        instance.__dict__[self.cache_name] = (blob, value)
+
+    def is_cached(self, instance) -> bool:
+        """Return True if reading the attribute would not decrypt"""
+        cached = instance.__dict__.get(self.cache_name)
+        return cached is not None and cached[0] is instance.__dict__.get(self.field_name)
+
+    def prime(self, instance, plaintext):
+        """Memoize a plaintext decrypted elsewhere (e.g. in a batch)"""
+        instance.__dict__[self.cache_name] = (getattr(instance, self.field_name), plaintext)
+
+
+def prefetch_decrypted(instances, names, workers=None):
+    """
+    Decrypt encrypted attributes of many instances in one batch
+
+    Every ciphertext not already memoized is decrypted with a single
+    dec_bytes_many() call and memoized on its instance, so that later
+    attribute reads are free.
+
+    Args:
+        instances: Model instances of the same class
+        names: Names of EncryptedAttribute descriptors on that class
+        workers: Thread pool size passed to dec_bytes_many
+    """
+    pending = []
+    for instance in instances:
+        for name in names:
+            attribute = getattr(type(instance), name)
+            if not attribute.is_cached(instance):
+                pending.append((attribute, instance))
+
+    if not pending:
+        return
+
+    blobs = [getattr(instance, attribute.field_name) for attribute, instance in pending]
+    for (attribute, instance), plaintext in zip(pending, dec_bytes_many(blobs, workers=workers)):
+        attribute.prime(instance, plaintext)
@@ -0,0 +1,182 @@
+"""
+Non-blocking logging handlers for SafeHome
+
+Request threads must never wait on the log disk. QueuedRotatingFileHandler
+only formats the message and puts the record on a bounded in-memory queue;
+a background thread writes records to a size-rotated file in batches with
+one flush per batch. When the queue is full the record is dropped and
+counted, and the writer reports the number of dropped records in the file.
+
+Python 3.11's dictConfig cannot wire up QueueHandler/QueueListener, so the
+queue, listener and file handler are combined in one handler class that can
+be configured with a plain 'class' entry in LOGGING.
+"""
+import os
+import copy
+import time
+import queue
+import logging
+import threading
+from logging.handlers import RotatingFileHandler
+
+_STOP = object()
+
+
+class QueuedRotatingFileHandler(logging.Handler):
+    """
+    Rotating file handler whose writes happen on a background thread
+
+    Args:
+        filename: Log file path
+        max_bytes / backup_count: Size-based rotation, as RotatingFileHandler
+        queue_size: Maximum number of records waiting to be written
+        batch_size: Maximum number of records written per flush
+        flush_interval: Seconds the writer waits for more records
+    """
+
+    def __init__(self, filename, max_bytes=10 * 1024 * 1024, backup_count=5,
+                 queue_size=10000, batch_size=256, flush_interval=0.5,
+                 encoding='utf-8', level=logging.NOTSET):
+        super().__init__(level)
+        self.target = RotatingFileHandler(
+            filename, maxBytes=max_bytes, backupCount=backup_count,
+            encoding=encoding, delay=True,
+        )
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self.written = 0
+        self._reported_dropped = 0
+        self._pid = None
+        self._queue = None
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def setFormatter(self, fmt):
+        super().setFormatter(fmt)
+        self.target.setFormatter(fmt)
+
+    # Producer side (request threads)
+
+    def _ensure_started(self):
+        """Start the writer thread lazily, and again in forked workers"""
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.Queue(maxsize=self.queue_size)
+            self._thread = threading.Thread(
+                target=self._run, name=f'log-writer-{os.path.basename(self.target.baseFilename)}',
+                daemon=True,
+            )
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def prepare(self, record):
+        """
+        Merge args into the message and render the traceback now, so the
+        record no longer references objects the caller may mutate
+        """
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = (self.formatter or logging.Formatter()).formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def emit(self, record):
+        try:
+            self._ensure_started()
+            self._queue.put_nowait(self.prepare(record))
+        except queue.Full:
+            self.dropped += 1
+        except Exception:
+            self.handleError(record)
+
+    # Consumer side (writer thread)
+
+    def _run(self):
+        q = self._queue
+        while True:
+            try:
+                first = q.get(timeout=self.flush_interval)
+            except queue.Empty:
+                self._report_drops()
+                continue
+
+            batch = [first]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(q.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = _STOP in batch
+            self._write([record for record in batch if record is not _STOP])
+            self._report_drops()
+            for _ in batch:
+                q.task_done()
+            if stop:
+                return
+
+    def _write(self, records):
+        """Write a batch of records with a single flush"""
+        if not records:
+            return
+        target = self.target
+        with target.lock:
+            for record in records:
+                try:
+                    if target.shouldRollover(record):
+                        target.doRollover()
+                    if target.stream is None:
+                        target.stream = target._open()
+                    target.stream.write(target.format(record) + target.terminator)
+                    self.written += 1
+                except Exception:
+                    target.handleError(record)
+            try:
+                target.stream.flush()
+            except Exception:
+                pass
+
+    def _report_drops(self):
+        dropped = self.dropped
+        if dropped == self._reported_dropped:
+            return
+        count = dropped - self._reported_dropped
+        self._reported_dropped = dropped
+        record = logging.LogRecord(
+            'safehome.logging', logging.WARNING, __file__, 0,
+            f"Log queue full: dropped {count} records ({dropped} total)", None, None,
+        )
+        self._write([record])
+
+    def flush(self):
+        """Wait (up to a few seconds) until queued records have been written"""
+        q = self._queue
+        if q is None or self._pid != os.getpid():
+            return
+        deadline = time.monotonic() + 5.0
+        with q.all_tasks_done:
+            while q.unfinished_tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                q.all_tasks_done.wait(remaining)
+
+    def close(self):
+        """Stop the writer after draining the queue, then close the file"""
+        if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+            try:
+                self._queue.put(_STOP, timeout=1.0)
+            except queue.Full:
+                pass
+            self._thread.join(timeout=5.0)
+        self._pid = None
+        self.target.close()
+        super().close()
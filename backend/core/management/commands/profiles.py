@@ -0,0 +1,60 @@
+import io
+import pstats
+from django.core.management.base import BaseCommand, CommandError
+from core.profiling import ProfileSpool
+
+
+class Command(BaseCommand):
+    """List, aggregate and clear request profiles captured by ProfilingMiddleware"""
+    help = 'Inspect the request profile spool (list, top, clear)'
+
+    def add_arguments(self, parser):
+        subparsers = parser.add_subparsers(dest='action', required=True)
+        subparsers.add_parser('list', help='List captured profiles')
+
+        top = subparsers.add_parser('top', help='Print the top functions across captured profiles')
+        top.add_argument('--route', help='Only aggregate profiles of this URL name')
+        top.add_argument('--request-id', help='Only use the profile of this request')
+        top.add_argument('--limit', type=int, default=25, help='Number of functions to print')
+        top.add_argument('--sort', choices=['cumulative', 'tottime', 'calls'], default='cumulative')
+
+        subparsers.add_parser('clear', help='Delete all captured profiles')
+
+    def handle(self, *args, **options):
+        spool = ProfileSpool()
+        getattr(self, f"handle_{options['action']}")(spool, options)
+
+    def handle_list(self, spool, options):
+        entries = spool.entries()
+        if not entries:
+            self.stdout.write(f'No profiles in {spool.directory}')
+            return
+        for path, meta in entries:
+            self.stdout.write(
+                f"{meta.get('ts', '?'):25} {meta.get('request_id', '?'):32} "
+                f"{meta.get('method', ''):6} {str(meta.get('status', '')):4} "
+                f"{meta.get('duration_ms', 0):>10.2f}ms  {meta.get('route') or '-'}"
+            )
+        self.stdout.write(f'{len(entries)} profile(s) in {spool.directory}')
+
+    def handle_top(self, spool, options):
+        paths = [
+            path for path, meta in spool.entries()
+            if (not options['route'] or meta.get('route') == options['route'])
+            and (not options['request_id'] or meta.get('request_id') == options['request_id'])
+        ]
+        if not paths:
+            raise CommandError('No matching profiles')
+
+        output = io.StringIO()
+        stats = spool.stats(paths)
+        stats.stream = output
+        stats.sort_stats(options['sort']).print_stats(options['limit'])
+        self.stdout.write(f'Aggregated {len(paths)} profile(s)')
+        self.stdout.write(output.getvalue())
+
+    def handle_clear(self, spool, options):
+        entries = spool.entries()
+        for path, _ in entries:
+            spool.remove(path)
+        self.stdout.write(self.style.SUCCESS(f'Removed {len(entries)} profile(s)'))
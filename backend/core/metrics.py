@@ -0,0 +1,401 @@
+"""
+In-process metrics with file-backed aggregation across worker processes
+
+Counters, gauges and fixed-bucket histograms live in memory and are updated
+under a per-metric lock, so recording a request costs a few dict operations.
+Every process periodically writes a snapshot of its own metrics to
+METRICS_DIR/<pid>-<start time>.json (atomic rename, from a background
+thread). A scrape of /metrics writes the serving process's snapshot, then
+merges the snapshot files of all workers; request threads are never
+involved.
+
+Counters and histograms of workers that have exited are kept, so totals do
+not go backwards when a worker is recycled; their gauges are dropped. The
+scrape folds the snapshot of an exited worker (its pid is gone, or a newer
+process reuses the pid) into METRICS_DIR/dead.json and deletes it, so the
+directory holds one file per live worker plus one. Clear METRICS_DIR when
+the server starts (entrypoint.sh does).
+
+Usage:
+    from core.metrics import registry
+    bookings_created = registry.counter('safehome_bookings_created_total',
+                                        'Bookings created', ['service_type'])
+    bookings_created.inc(service_type='cleaning')
+"""
+import os
+import time
+import hmac
+import json
+import math
+import fcntl
+import atexit
+import threading
+from django.conf import settings
+
+# Counters and histograms of exited workers, folded together
+DEAD_FILE = 'dead.json'
+LOCK_FILE = '.lock'
+
+# Request latency buckets in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _Metric:
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def snapshot(self):
+        with self._lock:
+            samples = [[list(key), value] for key, value in self._values.items()]
+        return {'type': self.type, 'help': self.documentation,
+                'labels': list(self.labelnames), 'samples': samples}
+
+
+class Counter(_Metric):
+    """Monotonically increasing value"""
+    type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """Value that can go up and down; summed across live workers"""
+    type = 'gauge'
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """Distribution over fixed buckets, stored as [bucket counts, sum]"""
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def snapshot(self):
+        with self._lock:
+            samples = [[list(key), [list(counts), total]] for key, (counts, total) in self._values.items()]
+        return {'type': self.type, 'help': self.documentation, 'labels': list(self.labelnames),
+                'buckets': list(self.buckets), 'samples': samples}
+
+
+class Registry:
+    """Metrics of this process plus the snapshot store shared with other workers"""
+
+    def __init__(self, directory=None, flush_interval=None):
+        self._directory = directory
+        self._flush_interval = flush_interval
+        self._metrics = {}
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._flusher_pid = None
+        self._started = time.time_ns() // 1000
+
+    @property
+    def directory(self):
+        return self._directory or settings.METRICS_DIR
+
+    @property
+    def flush_interval(self):
+        return self._flush_interval or settings.METRICS_FLUSH_INTERVAL
+
+    def _register(self, cls, name, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} already registered as {metric.type}")
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def _after_fork(self):
+        """Start the child with empty metrics and its own snapshot thread"""
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        for metric in self._metrics.values():
+            metric._lock = threading.Lock()
+            metric._values = {}
+        self._started = time.time_ns() // 1000
+        started = self._flusher_pid is not None
+        self._flusher_pid = None
+        if started:
+            self.start()
+
+    # Snapshot store
+
+    def start(self):
+        """Start writing snapshots of this process (called by the middleware)"""
+        if self._flusher_pid == os.getpid():
+            return
+        with self._lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+            thread = threading.Thread(target=self._flush_loop, name='metrics-flusher', daemon=True)
+            thread.start()
+
+    def _flush_loop(self):
+        stop = threading.Event()
+        while not stop.wait(self.flush_interval):
+            try:
+                self.write_snapshot()
+            except OSError:
+                pass
+
+    def write_snapshot(self):
+        """Write this process's metrics to <METRICS_DIR>/<pid>-<start time>.json"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        pid = os.getpid()
+        data = {'pid': pid, 'started': self._started,
+                'metrics': {metric.name: metric.snapshot() for metric in metrics}}
+        directory = self.directory
+        os.makedirs(directory, exist_ok=True)
+        with self._write_lock:
+            _write_json(os.path.join(directory, f'{pid}-{self._started}.json'), data)
+
+    def collect(self):
+        """Merge the snapshots of every worker into one set of metrics"""
+        directory = self.directory
+        try:
+            names = [name for name in os.listdir(directory) if name.endswith('.json') and name != DEAD_FILE]
+        except FileNotFoundError:
+            return {}
+
+        # Newest process per pid; older snapshots under a reused pid are dead
+        processes = {}
+        for name in names:
+            pid, _, started = name[:-len('.json')].partition('-')
+            try:
+                pid, started = int(pid), int(started or 0)
+            except ValueError:
+                continue
+            processes.setdefault(pid, []).append((started, name))
+        live, dead = [], []
+        for pid, snapshots in processes.items():
+            snapshots.sort()
+            dead.extend(name for _, name in snapshots[:-1])
+            (live if _pid_alive(pid) else dead).append(snapshots[-1][1])
+
+        if dead:
+            self._fold_dead(dead)
+
+        merged = {}
+        for name in [DEAD_FILE] + sorted(live):
+            data = _read_json(os.path.join(directory, name))
+            if data is not None:
+                _merge(merged, data, gauges=name != DEAD_FILE)
+        return merged
+
+    def _fold_dead(self, names):
+        """Add the counters and histograms of exited workers to DEAD_FILE and delete their snapshots"""
+        directory = self.directory
+        with open(os.path.join(directory, LOCK_FILE), 'a') as lock:
+            # Scrapes in other workers may fold the same files
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                dead_path = os.path.join(directory, DEAD_FILE)
+                merged = {}
+                _merge(merged, _read_json(dead_path) or {}, gauges=False)
+                folded = []
+                for name in names:
+                    path = os.path.join(directory, name)
+                    data = _read_json(path)
+                    if data is not None:
+                        _merge(merged, data, gauges=False)
+                        folded.append(path)
+                if not folded:
+                    return
+                metrics = {
+                    name: {**metric, 'samples': [[list(key), value] for key, value in metric['samples'].items()]}
+                    for name, metric in merged.items()
+                }
+                _write_json(dead_path, {'pid': None, 'metrics': metrics})
+                for path in folded:
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def render(self):
+        """Prometheus text exposition of all workers' metrics"""
+        self.write_snapshot()
+        lines = []
+        for name, metric in sorted(self.collect().items()):
+            labelnames = metric['labels']
+            lines.append(f"# HELP {name} {_escape_help(metric['help'])}")
+            lines.append(f"# TYPE {name} {metric['type']}")
+            for key, value in sorted(metric['samples'].items()):
+                labels = list(zip(labelnames, key))
+                if metric['type'] == 'histogram':
+                    counts, total = value
+                    cumulative = 0
+                    for bound, count in zip(metric['buckets'] + [math.inf], counts):
+                        cumulative += count
+                        le = '+Inf' if bound == math.inf else _format_value(bound)
+                        lines.append(f"{name}_bucket{_format_labels(labels + [('le', le)])} {cumulative}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(total)}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {cumulative}")
+                else:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+
+def _read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path, data):
+    tmp = f'{path}.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(data, f, separators=(',', ':'))
+    os.replace(tmp, path)
+
+
+def _merge(merged, data, gauges):
+    """Add the metrics of one snapshot file to `merged` ({name: metric with samples by label tuple})"""
+    for name, metric in data.get('metrics', {}).items():
+        if metric['type'] == 'gauge' and not gauges:
+            continue
+        target = merged.setdefault(name, {**metric, 'samples': {}})
+        samples = target['samples']
+        for labels, value in metric['samples']:
+            key = tuple(labels)
+            if metric['type'] == 'histogram':
+                counts, total = value
+                current = samples.get(key)
+                if current is None:
+                    samples[key] = [list(counts), total]
+                else:
+                    current[0] = [a + b for a, b in zip(current[0], counts)]
+                    current[1] += total
+            else:
+                samples[key] = samples.get(key, 0) + value
+
+
+def _pid_alive(pid):
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, TypeError):
+        return pid is not None
+    return True
+
+
+def _escape_help(text):
+    return text.replace('\\', r'\\').replace('\n', r'\n')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    pairs = (
+        '{}="{}"'.format(name, value.replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n'))
+        for name, value in labels
+    )
+    return '{' + ','.join(pairs) + '}'
+
+
+def _format_value(value):
+    if isinstance(value, float) and value.is_integer():
+        return repr(value)
+    return str(value)
+
+
+def scrape_allowed(request) -> bool:
+    """
+    Check access to the metrics endpoint: a matching bearer token when
+    METRICS_TOKEN is set, otherwise a client address in METRICS_ALLOWED_IPS
+    """
+    token = settings.METRICS_TOKEN
+    if token:
+        supplied = request.META.get('HTTP_AUTHORIZATION', '').encode()
+        return hmac.compare_digest(supplied, f'Bearer {token}'.encode())
+    return request.META.get('REMOTE_ADDR') in settings.METRICS_ALLOWED_IPS
+
+
+registry = Registry()
+os.register_at_fork(after_in_child=registry._after_fork)
+
+
+@atexit.register
+def _final_snapshot():
+    if registry._flusher_pid == os.getpid():
+        try:
+            registry.write_snapshot()
+        except Exception:
+            pass
+
+
+# Request metrics recorded by core.middleware.MetricsMiddleware
+http_requests_total = registry.counter(
+    'safehome_http_requests_total', 'HTTP requests by route, method and status',
+    ['route', 'method', 'status'],
+)
+http_request_duration_seconds = registry.histogram(
+    'safehome_http_request_duration_seconds', 'HTTP request latency by route', ['route'],
+)
+http_requests_in_progress = registry.gauge(
+    'safehome_http_requests_in_progress', 'HTTP requests currently being handled',
+)
+slow_requests_total = registry.counter(
+    'safehome_slow_requests_total', 'Requests over SLOW_REQUEST_THRESHOLD_MS by route', ['route'],
+)
@@ -1,19 +1,28 @@
 """
 Custom middleware for logging and error handling
 """
+import os
 import time
 import json
+import cProfile
 import logging
 import traceback
+from contextlib import ExitStack
+from datetime import datetime, timezone
+from django.db import connections
+from django.urls import resolve, Resolver404
 from django.http import JsonResponse
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from rest_framework.exceptions import APIException
 from rest_framework.views import exception_handler
 from django.utils.deprecation import MiddlewareMixin
+from . import metrics, nplusone, profiling, slow_requests
+from .timing import make_request_id, start_request, end_request, db_timer
 
 # Get logger for this module
 logger = logging.getLogger('safehome')
+access_logger = logging.getLogger('safehome.access')
 
 
 class DisableCSRFMiddleware(MiddlewareMixin):
@@ -26,58 +35,235 @@ class DisableCSRFMiddleware(MiddlewareMixin):
             setattr(request, '_dont_enforce_csrf_checks', True)
 
 class RequestLoggingMiddleware:
-    """Middleware to log HTTP requests and responses"""
+    """
+    Middleware to write one structured access-log record per request
+
+    Each request gets a unique ID (a well-formed incoming X-Request-ID is
+    reused) and a core.timing.RequestTimings that collects the time spent in
+    DB queries, core.crypto and Stripe calls. The breakdown is written as a
+    JSON line to the 'safehome.access' logger and returned to the client in
+    the Server-Timing header.
+    """
+
+    # Buckets reported in the Server-Timing header, in order
+    TIMING_BUCKETS = ('db', 'crypto', 'stripe')
 
     def __init__(self, get_response):
         self.get_response = get_response
 
     def __call__(self, request):
-        # Start timing the request
-        start_time = time.time()
+        request_id = make_request_id(request.META.get('HTTP_X_REQUEST_ID'))
+        request.request_id = request_id
+        timings, token = start_request(request_id)
+
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(db_timer))
+                response = self.get_response(request)
+
+            elapsed = timings.elapsed
+            response['X-Request-ID'] = request_id
+            response['Server-Timing'] = timings.server_timing(self.TIMING_BUCKETS)
+            if access_logger.isEnabledFor(logging.INFO):
+                access_logger.info(json.dumps(self._access_record(request, response, timings, elapsed)))
+            return response
+        finally:
+            end_request(token)
+
+    def _access_record(self, request, response, timings, elapsed):
+        """Build the access-log record for a finished request"""
+        match = getattr(request, 'resolver_match', None)
+        user = getattr(request, 'user', None)
+        return {
+            'ts': datetime.now(timezone.utc).isoformat(timespec='milliseconds'),
+            'request_id': timings.request_id,
+            'method': request.method,
+            'path': request.path,
+            'route': match.view_name if match else None,
+            'status': response.status_code,
+            'duration_ms': round(elapsed * 1000, 2),
+            'db_ms': round(timings.duration('db') * 1000, 2),
+            'db_queries': timings.count('db'),
+            'crypto_ms': round(timings.duration('crypto') * 1000, 2),
+            'stripe_ms': round(timings.duration('stripe') * 1000, 2),
+            'response_bytes': self._response_size(response),
+            'user_id': str(user.pk) if user is not None and user.is_authenticated else None,
+            'ip': self._get_client_ip(request),
+            'user_agent': request.META.get('HTTP_USER_AGENT', ''),
+        }
 
-        # Generate unique request ID for tracking
-        request_id = id(request)
+    def _response_size(self, response):
+        """Body size in bytes, or None for streaming responses"""
+        if getattr(response, 'streaming', False):
+            return None
+        return len(response.content)
 
-        # Log request details
-        logger.info(
-            f"Request {request_id}: {request.method} {request.path} "
-            f"from {self._get_client_ip(request)}",
-            extra={
-                'request_id': request_id,
+    def _get_client_ip(self, request):
+        """Get the client's real IP address"""
+        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+        if x_forwarded_for:
+            return x_forwarded_for.split(',')[0].strip()
+        return request.META.get('REMOTE_ADDR', 'unknown')
+
+
+class MetricsMiddleware:
+    """Middleware to record request counts and latency in core.metrics"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        metrics.registry.start()
+
+    def __call__(self, request):
+        start = time.perf_counter()
+        metrics.http_requests_in_progress.inc()
+        status = 500
+        try:
+            response = self.get_response(request)
+            status = response.status_code
+            return response
+        finally:
+            metrics.http_requests_in_progress.dec()
+            match = getattr(request, 'resolver_match', None)
+            route = match.view_name if match else 'unmatched'
+            metrics.http_requests_total.inc(route=route, method=request.method, status=status)
+            metrics.http_request_duration_seconds.observe(time.perf_counter() - start, route=route)
+
+
+class SlowRequestMiddleware:
+    """
+    Middleware to record requests slower than SLOW_REQUEST_THRESHOLD_MS
+
+    Every request's SQL statements are collected by core.slow_requests;
+    slow requests are stored (with EXPLAIN output for the slowest
+    statements) by a background thread. A threshold of 0 disables capture.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        threshold = settings.SLOW_REQUEST_THRESHOLD_MS
+        if threshold <= 0:
+            return self.get_response(request)
+
+        start = time.perf_counter()
+        query_log, token = slow_requests.start()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(slow_requests.collect_queries))
+                response = self.get_response(request)
+        finally:
+            slow_requests.stop(token)
+
+        duration_ms = (time.perf_counter() - start) * 1000
+        if duration_ms >= threshold:
+            match = getattr(request, 'resolver_match', None)
+            route = match.view_name if match else ''
+            metrics.slow_requests_total.inc(route=route or 'unmatched')
+            slow_requests.recorder.submit({
+                'request_id': getattr(request, 'request_id', None) or make_request_id(),
                 'method': request.method,
-                'path': request.path,
-                'user_agent': request.META.get('HTTP_USER_AGENT', ''),
-                'ip': self._get_client_ip(request),
-            }
-        )
+                'path': request.path[:500],
+                'route': route,
+                'status': response.status_code,
+                'duration_ms': round(duration_ms, 2),
+            }, query_log)
+        return response
 
-        # Process the request
-        response = self.get_response(request)
 
-        # Calculate processing time
-        processing_time = time.time() - start_time
+class NPlusOneMiddleware:
+    """
+    Middleware to flag requests that repeat the same query shape
+    (see core.nplusone). N_PLUS_ONE_DETECTION selects 'warn', 'raise'
+    or 'off'.
+    """
 
-        # Log response details
-        logger.info(
-            f"Response {request_id}: {response.status_code} in {processing_time:.3f}s",
-            extra={
-                'request_id': request_id,
-                'status_code': response.status_code,
-                'processing_time': processing_time,
-            }
-        )
+    def __init__(self, get_response):
+        self.get_response = get_response
 
-        # Add request ID to response headers for debugging
-        response['X-Request-ID'] = str(request_id)
+    def __call__(self, request):
+        mode = settings.N_PLUS_ONE_DETECTION
+        if mode == 'off':
+            return self.get_response(request)
 
+        counter, token = nplusone.start()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(nplusone.count_shapes))
+                response = self.get_response(request)
+        finally:
+            nplusone.stop(token)
+
+        repeated = counter.repeated(settings.N_PLUS_ONE_THRESHOLD)
+        if repeated:
+            report = nplusone.describe(repeated, request.path)
+            if mode == 'raise':
+                raise nplusone.NPlusOneError(report)
+            logger.warning(report)
         return response
 
-    def _get_client_ip(self, request):
-        """Get the client's real IP address"""
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            return x_forwarded_for.split(',')[0].strip()
-        return request.META.get('REMOTE_ADDR', 'unknown')
+
+class ProfilingMiddleware:
+    """
+    Middleware to run selected requests under cProfile
+
+    A request is profiled when it carries "X-Profile: <PROFILING_TOKEN>" or
+    is picked by the admin-controlled sampling rate (core.models.ProfilingConfig).
+    The profile is saved to the core.profiling spool and its file name is
+    returned in the X-Profile-Id header.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        route = None
+        forced = profiling.header_requested(request)
+        if not forced:
+            rate, _ = profiling.sampling_config()
+            if rate <= 0:
+                return self.get_response(request)
+            route = self._route(request)
+            if not profiling.sampled(route):
+                return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        status = 500
+        response = None
+        try:
+            response = profiler.runcall(self.get_response, request)
+            status = response.status_code
+            return response
+        finally:
+            elapsed = time.perf_counter() - start
+            match = getattr(request, 'resolver_match', None)
+            meta = {
+                'request_id': getattr(request, 'request_id', None) or make_request_id(),
+                'route': match.view_name if match else route,
+                'method': request.method,
+                'path': request.path,
+                'status': status,
+                'duration_ms': round(elapsed * 1000, 2),
+                'trigger': 'header' if forced else 'sample',
+                'ts': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            }
+            try:
+                path = profiling.ProfileSpool().save(profiler, meta)
+                if response is not None:
+                    response['X-Profile-Id'] = os.path.basename(path)[:-len('.prof')]
+            except OSError as e:
+                logger.warning(f"Could not save profile for request {meta['request_id']}: {e}")
+
+    def _route(self, request):
+        """URL name of the request, resolved before the view runs"""
+        try:
+            return resolve(request.path_info).view_name
+        except Resolver404:
+            return None
 
 
 class ErrorHandlingMiddleware:
@@ -95,7 +281,7 @@ class ErrorHandlingMiddleware:
 
     def _handle_exception(self, request, exception):
         """Handle different types of exceptions"""
-        request_id = id(request)
+        request_id = getattr(request, 'request_id', None)
 
         # Log the exception with full traceback
         logger.error(
@@ -164,7 +350,7 @@ def custom_exception_handler(exc, context):
     if response is not None:
         # Log API exceptions
         request = context['request']
-        request_id = id(request)
+        request_id = getattr(request, 'request_id', None)
 
         logger.error(
             f"API exception in request {request_id}: {response.status_code} - {response.data}",
@@ -176,6 +362,7 @@ def custom_exception_handler(exc, context):
         )
 
         # Add request ID to response for debugging
-        response['X-Request-ID'] = str(request_id)
+        if request_id:
+            response['X-Request-ID'] = request_id
 
     return response
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProfilingConfig',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sample_rate', models.FloatField(default=0.0, help_text='Fraction of matching requests to profile (0 disables, 1 profiles all)', verbose_name='Sample Rate')),
+                ('route', models.CharField(blank=True, default='', help_text='Only profile this URL name (e.g. booking-list); empty matches every route', max_length=200, verbose_name='Route')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated At')),
+            ],
+            options={
+                'verbose_name': 'Profiling Configuration',
+                'verbose_name_plural': 'Profiling Configuration',
+            },
+        ),
+    ]
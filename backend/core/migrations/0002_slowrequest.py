@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlowRequest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Recorded At')),
+                ('request_id', models.CharField(max_length=64, verbose_name='Request ID')),
+                ('method', models.CharField(max_length=10, verbose_name='Method')),
+                ('path', models.CharField(max_length=500, verbose_name='Path')),
+                ('route', models.CharField(blank=True, db_index=True, default='', max_length=200, verbose_name='Route')),
+                ('status', models.PositiveSmallIntegerField(verbose_name='Status Code')),
+                ('duration_ms', models.FloatField(verbose_name='Duration (ms)')),
+                ('db_ms', models.FloatField(default=0.0, verbose_name='DB Time (ms)')),
+                ('query_count', models.PositiveIntegerField(default=0, verbose_name='Query Count')),
+                ('queries', models.JSONField(blank=True, default=list, help_text='SQL statements (without parameters) with duration, origin and EXPLAIN output', verbose_name='Queries')),
+            ],
+            options={
+                'verbose_name': 'Slow Request',
+                'verbose_name_plural': 'Slow Requests',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
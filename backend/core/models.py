@@ -26,3 +26,117 @@ class UUIDModel(models.Model):
 
     def __str__(self):
         return str(self.id)
+
+
+class ProfilingConfig(models.Model):
+    """
+    Admin-controlled sampling of requests for core.profiling
+
+    A single row (pk=1) is used. ProfilingMiddleware re-reads it at most
+    every PROFILING_CONFIG_TTL seconds, so changes apply without a redeploy.
+    """
+
+    sample_rate = models.FloatField(
+        default=0.0,
+        verbose_name='Sample Rate',
+        help_text='Fraction of matching requests to profile (0 disables, 1 profiles all)'
+    )
+
+    route = models.CharField(
+        max_length=200,
+        blank=True,
+        default='',
+        verbose_name='Route',
+        help_text='Only profile this URL name (e.g. booking-list); empty matches every route'
+    )
+
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Updated At'
+    )
+
+    class Meta:
+        verbose_name = 'Profiling Configuration'
+        verbose_name_plural = 'Profiling Configuration'
+
+    def __str__(self):
+        target = self.route or 'all routes'
+        return f"Profile {self.sample_rate:.1%} of {target}"
+
+    def save(self, *args, **kwargs):
+        self.pk = 1
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def load(cls):
+        """Return the configuration row, or an unsaved default"""
+        return cls.objects.filter(pk=1).first() or cls(pk=1)
+
+
+class SlowRequest(models.Model):
+    """
+    A request that exceeded SLOW_REQUEST_THRESHOLD_MS, recorded by
+    core.slow_requests. Only the newest SLOW_REQUEST_KEEP rows are kept.
+    """
+
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        db_index=True,
+        verbose_name='Recorded At'
+    )
+
+    request_id = models.CharField(
+        max_length=64,
+        verbose_name='Request ID'
+    )
+
+    method = models.CharField(
+        max_length=10,
+        verbose_name='Method'
+    )
+
+    path = models.CharField(
+        max_length=500,
+        verbose_name='Path'
+    )
+
+    route = models.CharField(
+        max_length=200,
+        blank=True,
+        default='',
+        db_index=True,
+        verbose_name='Route'
+    )
+
+    status = models.PositiveSmallIntegerField(
+        verbose_name='Status Code'
+    )
+
+    duration_ms = models.FloatField(
+        verbose_name='Duration (ms)'
+    )
+
+    db_ms = models.FloatField(
+        default=0.0,
+        verbose_name='DB Time (ms)'
+    )
+
+    query_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Query Count'
+    )
+
+    queries = models.JSONField(
+        default=list,
+        blank=True,
+        verbose_name='Queries',
+        help_text='SQL statements (without parameters) with duration, origin and EXPLAIN output'
+    )
+
+    class Meta:
+        verbose_name = 'Slow Request'
+        verbose_name_plural = 'Slow Requests'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.method} {self.path} ({self.duration_ms:.0f}ms)"
@@ -0,0 +1,91 @@
+"""
+N+1 query detection for SafeHome
+
+NPlusOneMiddleware installs `count_shapes` as a DB execute wrapper. Each
+statement is reduced to its shape (parameters, literals and IN lists
+removed), and a request that runs the same shape N_PLUS_ONE_THRESHOLD
+times or more is reported:
+
+    N_PLUS_ONE_DETECTION = 'warn'   # log a warning (default with DEBUG)
+    N_PLUS_ONE_DETECTION = 'raise'  # raise NPlusOneError (tests/conftest.py)
+    N_PLUS_ONE_DETECTION = 'off'    # no wrapper installed (default in production)
+
+The usual fix is select_related/prefetch_related on the view's queryset.
+"""
+import re
+import contextvars
+from .slow_requests import query_origin
+
+_current = contextvars.ContextVar('safehome_query_shapes', default=None)
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST_RE = re.compile(r'\bIN\s*\((?:\s*(?:%s|\?|NULL)\s*,?)+\)', re.IGNORECASE)
+_SPACE_RE = re.compile(r'\s+')
+
+
+class NPlusOneError(Exception):
+    """A request repeated the same query shape too often"""
+
+
+def normalize_sql(sql) -> str:
+    """Shape of a statement: literals become ?, IN lists collapse to IN (...)"""
+    shape = _STRING_RE.sub('?', sql)
+    shape = _NUMBER_RE.sub('?', shape)
+    shape = shape.replace('%s', '?')
+    shape = _IN_LIST_RE.sub('IN (...)', shape)
+    return _SPACE_RE.sub(' ', shape).strip()
+
+
+class ShapeCounter:
+    """Statement shapes executed during one request, with the origin of the repeats"""
+
+    __slots__ = ('counts', 'origins')
+
+    def __init__(self):
+        self.counts = {}
+        self.origins = {}
+
+    def add(self, sql):
+        shape = normalize_sql(sql)
+        count = self.counts.get(shape, 0) + 1
+        self.counts[shape] = count
+        if count == 2:
+            # Only repeated shapes pay for a stack walk
+            self.origins[shape] = query_origin()
+
+    def repeated(self, threshold):
+        """[(shape, count, origin)] for shapes run at least `threshold` times, most frequent first"""
+        found = [
+            (shape, count, self.origins.get(shape, []))
+            for shape, count in self.counts.items() if count >= threshold
+        ]
+        return sorted(found, key=lambda item: item[1], reverse=True)
+
+
+def start():
+    """Begin counting shapes; returns (counter, token for stop)"""
+    counter = ShapeCounter()
+    return counter, _current.set(counter)
+
+
+def stop(token):
+    _current.reset(token)
+
+
+def count_shapes(execute, sql, params, many, context):
+    """connection.execute_wrapper() hook that counts query shapes of the current request"""
+    counter = _current.get()
+    if counter is not None:
+        counter.add(sql)
+    return execute(sql, params, many, context)
+
+
+def describe(repeated, path=None) -> str:
+    """Human-readable report of repeated shapes"""
+    lines = [f"N+1 queries detected{f' in {path}' if path else ''}:"]
+    for shape, count, origin in repeated:
+        lines.append(f"  {count}x {shape}")
+        for frame in origin:
+            lines.append(f"      at {frame}")
+    return '\n'.join(lines)
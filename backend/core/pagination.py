@@ -0,0 +1,96 @@
+"""
+Keyset (cursor) pagination for SafeHome list endpoints
+
+Pages are ordered by (created_at, id), newest first. Instead of an offset,
+the client passes back an opaque cursor naming the last row it has seen;
+the next page is fetched with
+
+    WHERE created_at < :created_at OR (created_at = :created_at AND id < :id)
+    ORDER BY created_at DESC, id DESC LIMIT :page_size + 1
+
+which an index on (..., created_at, id) answers by seeking, so page 1000
+costs the same as page 1. Rows inserted meanwhile never shift a page.
+
+Query parameters: `cursor` (from the previous response) and `page_size`
+(default API_PAGE_SIZE, capped at API_MAX_PAGE_SIZE). Views return the
+page in `data` and the position in a `pagination` key of the envelope:
+
+    {"success": true, "data": [...],
+     "pagination": {"next_cursor": "...", "has_more": true, "page_size": 20}}
+"""
+import json
+import base64
+import binascii
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from .utils import success_response
+
+
+def encode_cursor(created_at, pk) -> str:
+    payload = json.dumps([created_at.isoformat(), str(pk)], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """(created_at, pk) from a cursor, or ValidationError"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, pk = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        created_at = parse_datetime(created_at)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        created_at = None
+    # encode_cursor writes the pk as a string; anything else was tampered with
+    if created_at is None or not isinstance(pk, str):
+        raise ValidationError({'cursor': 'Invalid cursor.'})
+    return created_at, pk
+
+
+class KeysetPagination(BasePagination):
+    """Newest-first pagination on (created_at, id)"""
+
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+
+    def get_page_size(self, request):
+        page_size = settings.API_PAGE_SIZE
+        requested = request.query_params.get(self.page_size_query_param)
+        if requested:
+            try:
+                page_size = int(requested)
+            except ValueError:
+                raise ValidationError({self.page_size_query_param: 'A valid integer is required.'})
+        return max(1, min(page_size, settings.API_MAX_PAGE_SIZE))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        queryset = queryset.order_by('-created_at', '-pk')
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            created_at, pk = decode_cursor(cursor)
+            try:
+                pk = queryset.model._meta.pk.to_python(pk)
+            except DjangoValidationError:
+                raise ValidationError({self.cursor_query_param: 'Invalid cursor.'})
+            queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk))
+
+        rows = list(queryset[:self.page_size + 1])
+        self.has_more = len(rows) > self.page_size
+        page = rows[:self.page_size]
+        self.next_cursor = encode_cursor(page[-1].created_at, page[-1].pk) if self.has_more else None
+        return page
+
+    def get_pagination_data(self):
+        """The `pagination` entry of the response envelope"""
+        return {
+            'next_cursor': self.next_cursor,
+            'has_more': self.has_more,
+            'page_size': self.page_size,
+        }
+
+    def get_paginated_response(self, data):
+        return success_response(data=data, pagination=self.get_pagination_data())
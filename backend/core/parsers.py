@@ -1,8 +1,9 @@
 import json
 import logging
-from rest_framework.parsers import JSONParser
+from rest_framework.parsers import BaseParser, JSONParser
 from rest_framework.exceptions import ParseError
-from .crypto import dec_aes_gcm
+from .codec import get_codec
+from .crypto import dec_aes_gcm, dec_aes_gcm_bytes
 
 logger = logging.getLogger(__name__)
 
@@ -15,8 +16,9 @@ class EncryptedJSONParser(JSONParser):
     media_type = 'application/json'
 
     def parse(self, stream, media_type=None, parser_context=None):
+        codec = get_codec()
         try:
-            data = super().parse(stream, media_type, parser_context)
+            data = codec.loads(stream.read())
             logger.info(f"Received data keys: {data.keys() if isinstance(data, dict) else 'not a dict'}")
             
             if isinstance(data, dict) and 'payload' in data:
@@ -26,7 +28,7 @@ class EncryptedJSONParser(JSONParser):
                 decrypted_string = dec_aes_gcm(encrypted_payload)
                 logger.info(f"Decrypted string (first 200 chars): {decrypted_string[:200]}")
                 
-                decrypted_data = json.loads(decrypted_string)
+                decrypted_data = codec.loads(decrypted_string)
                 logger.info(f"Decrypted data keys: {decrypted_data.keys() if isinstance(decrypted_data, dict) else 'not a dict'}")
                 
                 return decrypted_data
@@ -36,3 +38,20 @@ class EncryptedJSONParser(JSONParser):
         except (ValueError, json.JSONDecodeError) as e:
             logger.error(f"Encrypted payload parsing failed: {e}", exc_info=True)
             raise ParseError(f"Encrypted payload parsing failed: {e}")
+
+
+class EncryptedBinaryParser(BaseParser):
+    """
+    Parses a binary encrypted request body.
+    The body is the raw AES-GCM output "nonce || ciphertext || tag" (12-byte
+    nonce), so there is no hex or JSON envelope to decode: the stream is
+    decrypted directly and the plaintext goes through a single JSON decode.
+    """
+    media_type = 'application/vnd.safehome.enc+octet-stream'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return get_codec().loads(dec_aes_gcm_bytes(stream.read()))
+        except (TypeError, ValueError) as e:
+            logger.error(f"Encrypted binary body parsing failed: {e}")
+            raise ParseError(f"Encrypted payload parsing failed: {e}")
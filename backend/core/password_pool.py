@@ -0,0 +1,172 @@
+"""
+Bounded thread pool for password hashing
+
+PBKDF2 takes hundreds of milliseconds of CPU per call. Run inline, a burst
+of logins occupies every request worker and cheap endpoints queue behind
+them. hash_password() and verify_password() instead run the hasher on a
+small dedicated pool:
+  - at most PASSWORD_POOL_WORKERS hashes run at once,
+  - at most PASSWORD_POOL_QUEUE_SIZE more wait for a worker, and
+  - a task still waiting after PASSWORD_POOL_QUEUE_TIMEOUT seconds is
+    cancelled, and one that a worker picks up too late is dropped without
+    hashing.
+A request that cannot be admitted, or whose task was dropped, fails fast
+with PasswordPoolBusy (503 with Retry-After) and frees its worker.
+
+PASSWORD_POOL_WORKERS = 0 hashes inline (no limit).
+"""
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from . import metrics
+
+queue_depth = metrics.registry.gauge(
+    'safehome_password_pool_queue_depth', 'Password hashing tasks waiting for a worker',
+)
+in_progress = metrics.registry.gauge(
+    'safehome_password_pool_in_progress', 'Password hashing tasks running',
+)
+rejected_total = metrics.registry.counter(
+    'safehome_password_pool_rejected_total', 'Password hashing requests refused with 503', ['reason'],
+)
+wait_seconds = metrics.registry.histogram(
+    'safehome_password_pool_wait_seconds', 'Time password hashing tasks waited for a worker',
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+
+
+class PasswordPoolBusy(APIException):
+    """The password hashing pool is saturated"""
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Too many sign-in attempts are being processed. Please retry shortly.'
+    default_code = 'password_pool_busy'
+
+    def __init__(self, wait):
+        super().__init__()
+        # Sent as Retry-After by DRF's exception handler
+        self.wait = wait
+
+
+class _Expired(Exception):
+    """A task waited in the queue past the timeout"""
+
+
+class PasswordHashingPool:
+    """Size-limited executor with admission control and a queue timeout"""
+
+    def __init__(self, workers=None, queue_size=None, queue_timeout=None):
+        self._workers = workers
+        self._queue_size = queue_size
+        self._queue_timeout = queue_timeout
+        self._pid = None
+        self._executor = None
+        self._slots = None
+        self._start_lock = threading.Lock()
+
+    @property
+    def workers(self):
+        return settings.PASSWORD_POOL_WORKERS if self._workers is None else self._workers
+
+    @property
+    def queue_size(self):
+        return settings.PASSWORD_POOL_QUEUE_SIZE if self._queue_size is None else self._queue_size
+
+    @property
+    def queue_timeout(self):
+        return settings.PASSWORD_POOL_QUEUE_TIMEOUT if self._queue_timeout is None else self._queue_timeout
+
+    def _ensure_started(self):
+        """Create the executor lazily, and again in forked workers"""
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='password-hasher')
+            self._slots = threading.BoundedSemaphore(self.workers + self.queue_size)
+            self._pid = os.getpid()
+
+    def run(self, func, *args):
+        """Run func(*args) on the pool and return its result, or raise PasswordPoolBusy"""
+        if self.workers <= 0:
+            return func(*args)
+        self._ensure_started()
+
+        if not self._slots.acquire(blocking=False):
+            rejected_total.inc(reason='queue_full')
+            raise PasswordPoolBusy(wait=self._retry_after())
+
+        enqueued = time.monotonic()
+        timeout = self.queue_timeout
+        queue_depth.inc()
+
+        def task():
+            waited = time.monotonic() - enqueued
+            queue_depth.dec()
+            wait_seconds.observe(waited)
+            if waited > timeout:
+                raise _Expired()
+            in_progress.inc()
+            try:
+                return func(*args)
+            finally:
+                in_progress.dec()
+
+        try:
+            future = self._executor.submit(task)
+        except BaseException:
+            queue_depth.dec()
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+
+        # Wait for a worker at most until the queue timeout; once the task
+        # is running it is not cancellable, so wait for the hash to finish
+        remaining = timeout - (time.monotonic() - enqueued)
+        try:
+            try:
+                return future.result(timeout=max(0, remaining))
+            except FutureTimeoutError:
+                if future.cancel():
+                    # Never started, so task() did not count it out of the queue
+                    queue_depth.dec()
+                    raise _Expired()
+            return future.result()
+        except _Expired:
+            rejected_total.inc(reason='timeout')
+            raise PasswordPoolBusy(wait=self._retry_after())
+
+    def _retry_after(self):
+        return max(1, round(self.queue_timeout))
+
+    def shutdown(self):
+        if self._executor is not None and self._pid == os.getpid():
+            self._executor.shutdown(wait=True)
+        self._pid = None
+
+
+pool = PasswordHashingPool()
+
+
+def hash_password(raw_password) -> str:
+    """make_password() on the hashing pool"""
+    return pool.run(make_password, raw_password)
+
+
+def verify_password(user, raw_password) -> bool:
+    """
+    user.check_password() with the hasher on the pool. A hash that needs
+    upgrading (new algorithm or iteration count) is re-hashed on the pool
+    and saved from the calling thread.
+    """
+    upgrade = []
+    valid = pool.run(check_password, raw_password, user.password, upgrade.append)
+    if valid and upgrade:
+        user.password = hash_password(raw_password)
+        user.save(update_fields=['password'])
+    return valid
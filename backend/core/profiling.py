@@ -0,0 +1,136 @@
+"""
+On-demand request profiling for SafeHome
+
+ProfilingMiddleware runs a request under cProfile when either
+  - the request carries "X-Profile: <PROFILING_TOKEN>", or
+  - it is picked by the sampling rate set in the admin (ProfilingConfig).
+
+Each profile is written to a bounded spool directory (PROFILING_DIR) as
+<timestamp>_<route>_<request id>.prof (pstats format) plus a .json sidecar
+with the route, status and duration. The oldest files are deleted once the spool
+holds more than PROFILING_MAX_FILES profiles. Inspect the spool with
+`python manage.py profiles`.
+"""
+import os
+import hmac
+import json
+import time
+import re
+import random
+import pstats
+import threading
+from datetime import datetime
+from django.conf import settings
+
+# Characters allowed in the route part of a profile file name
+_UNSAFE_RE = re.compile(r'[^A-Za-z0-9_.-]+')
+
+_config_lock = threading.Lock()
+_config_cache = (0.0, None)
+
+
+def sampling_config():
+    """Return (sample_rate, route) from ProfilingConfig, cached per process"""
+    global _config_cache
+    expires, config = _config_cache
+    now = time.monotonic()
+    if now < expires:
+        return config
+
+    with _config_lock:
+        expires, config = _config_cache
+        if now < expires:
+            return config
+        from .models import ProfilingConfig
+        try:
+            row = ProfilingConfig.load()
+            config = (row.sample_rate, row.route)
+        except Exception:
+            # Table missing (migrations not run) or DB unavailable
+            config = (0.0, '')
+        _config_cache = (now + settings.PROFILING_CONFIG_TTL, config)
+    return config
+
+
+def reset_sampling_config():
+    """Drop the cached configuration (after an admin change in this process)"""
+    global _config_cache
+    _config_cache = (0.0, None)
+
+
+def header_requested(request) -> bool:
+    """True when the request carries the profiling token"""
+    token = settings.PROFILING_TOKEN
+    supplied = request.META.get('HTTP_X_PROFILE')
+    if not token or not supplied:
+        return False
+    return hmac.compare_digest(supplied.encode(), token.encode())
+
+
+def sampled(route) -> bool:
+    """True when the admin sampling rate picks this request"""
+    rate, only_route = sampling_config()
+    if rate <= 0 or (only_route and only_route != route):
+        return False
+    return rate >= 1 or random.random() < rate
+
+
+class ProfileSpool:
+    """Bounded directory of captured profiles"""
+
+    def __init__(self, directory=None, max_files=None):
+        self.directory = directory or settings.PROFILING_DIR
+        self.max_files = max_files or settings.PROFILING_MAX_FILES
+
+    def save(self, profiler, meta):
+        """Write a profile and its metadata, then trim the spool"""
+        os.makedirs(self.directory, exist_ok=True)
+        route = _UNSAFE_RE.sub('-', meta.get('route') or 'unmatched')
+        stem = f"{datetime.now().strftime('%Y%m%dT%H%M%S%f')}_{route}_{meta['request_id']}"
+        path = os.path.join(self.directory, f'{stem}.prof')
+        profiler.dump_stats(path)
+        with open(os.path.join(self.directory, f'{stem}.json'), 'w') as f:
+            json.dump(meta, f)
+        self.trim()
+        return path
+
+    def entries(self):
+        """Captured profiles, oldest first, as (path, metadata) pairs"""
+        try:
+            names = sorted(os.listdir(self.directory))
+        except FileNotFoundError:
+            return []
+        result = []
+        for name in names:
+            if not name.endswith('.prof'):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                with open(path[:-len('.prof')] + '.json') as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                meta = {}
+            result.append((path, meta))
+        return result
+
+    def trim(self):
+        entries = self.entries()
+        for path, _ in entries[:max(len(entries) - self.max_files, 0)]:
+            self.remove(path)
+
+    def remove(self, path):
+        for candidate in (path, path[:-len('.prof')] + '.json'):
+            try:
+                os.remove(candidate)
+            except FileNotFoundError:
+                pass
+
+    def stats(self, paths):
+        """Aggregate several profiles into one pstats.Stats"""
+        stats = None
+        for path in paths:
+            if stats is None:
+                stats = pstats.Stats(path)
+            else:
+                stats.add(path)
+        return stats
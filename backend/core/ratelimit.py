@@ -0,0 +1,240 @@
+"""
+Token-bucket rate limiting for SafeHome
+
+A limit such as '10/min' is a bucket holding up to 10 tokens that refills at
+10 tokens per minute; every request takes one token and is refused (429
+with Retry-After) when the bucket is empty. Buckets are stored as a single
+"theoretical arrival time" per key (GCRA), which behaves exactly like a
+token bucket but needs one number and one update per request.
+
+Backends (RATE_LIMIT_BACKEND):
+  - 'local': per-process dict under a lock. Fastest; each worker process
+    enforces the limit separately.
+  - 'cache': the 'ratelimit' Django cache, shared by all workers when
+    RATE_LIMIT_CACHE_URL points at Redis or Memcached. Updated only with atomic add/incr, so concurrent
+    workers never admit more than the bucket allows.
+
+Views opt in with DRF throttle classes and a scope from RATE_LIMITS:
+
+    class LoginView(generics.GenericAPIView):
+        throttle_classes = [IPRateThrottle]
+        throttle_scope = 'login'
+
+Function views use the decorator, below @api_view:
+
+    @api_view(['GET'])
+    @rate_limit('covid_lookup')
+    def covid_restriction_lookup(request): ...
+"""
+import time
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import BaseThrottle
+from . import metrics
+
+rate_limited_total = metrics.registry.counter(
+    'safehome_rate_limited_total', 'Requests refused by the rate limiter', ['scope'],
+)
+
+_PERIODS = {'s': 1, 'sec': 1, 'second': 1, 'm': 60, 'min': 60, 'minute': 60,
+            'h': 3600, 'hour': 3600, 'd': 86400, 'day': 86400}
+
+
+@lru_cache(maxsize=None)
+def parse_rate(rate):
+    """
+    Parse '<tokens>/<period>' (e.g. '10/min', '5/30s') into
+    (capacity, seconds per token)
+    """
+    count, _, period = rate.partition('/')
+    count = int(count)
+    digits = ''.join(ch for ch in period if ch.isdigit())
+    unit = period[len(digits):]
+    if count <= 0 or unit not in _PERIODS:
+        raise ValueError(f"Invalid rate {rate!r}")
+    seconds = (int(digits) if digits else 1) * _PERIODS[unit]
+    return count, seconds / count
+
+
+class LocalBackend:
+    """
+    Buckets in this process's memory
+
+    Keys are kept in least-recently-used order. Past max_keys, full buckets
+    (nothing left to remember) are dropped from the old end first; only when
+    the oldest key is still draining is it evicted anyway. Every step is
+    O(1), and a client hammering its own key keeps it at the recent end.
+    """
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._tats = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key, capacity, interval, now=None):
+        """Take one token; returns (allowed, remaining, retry_after seconds)"""
+        now = time.monotonic() if now is None else now
+        burst = capacity * interval
+        tats = self._tats
+        with self._lock:
+            tat = max(tats.get(key, now), now) + interval
+            if tat - now > burst:
+                tats.move_to_end(key)
+                return False, 0, tat - burst - now
+            tats[key] = tat
+            tats.move_to_end(key)
+            if len(tats) > self.max_keys:
+                self._evict(now)
+        return True, int((burst - (tat - now)) / interval), 0.0
+
+    def _evict(self, now):
+        """Drop full buckets from the old end, then the oldest key if still over the limit"""
+        tats = self._tats
+        while tats and next(iter(tats.values())) <= now:
+            tats.popitem(last=False)
+        while len(tats) > self.max_keys:
+            tats.popitem(last=False)
+
+    def reset(self):
+        with self._lock:
+            self._tats.clear()
+
+
+class CacheBackend:
+    """
+    Buckets in the Django cache, shared across processes
+
+    The arrival time is kept in integer microseconds so it can be advanced
+    with the cache's atomic incr(): each request adds one interval, and a
+    request that would overdraw the bucket takes its interval back.
+    """
+
+    PREFIX = 'ratelimit:'
+
+    def __init__(self, alias='ratelimit'):
+        self.alias = alias
+
+    def hit(self, key, capacity, interval, now=None):
+        cache = caches[self.alias]
+        now_us = int((time.time() if now is None else now) * 1e6)
+        step = max(1, int(interval * 1e6))
+        burst = capacity * step
+        cache_key = self.PREFIX + key
+        timeout = int(burst / 1e6) + 1
+
+        if cache.add(cache_key, now_us + step, timeout):
+            return True, capacity - 1, 0.0
+        try:
+            tat = cache.incr(cache_key, step)
+        except ValueError:
+            # Expired between add() and incr()
+            cache.add(cache_key, now_us + step, timeout)
+            return True, capacity - 1, 0.0
+
+        if tat - step < now_us:
+            # Bucket had refilled completely; restart it from now. Concurrent
+            # requests racing here can each get a full bucket at most once.
+            tat = now_us + step
+            cache.set(cache_key, tat, timeout)
+        elif tat - now_us > burst:
+            cache.decr(cache_key, step)
+            return False, 0, (tat - burst - now_us) / 1e6
+        else:
+            cache.touch(cache_key, timeout)
+        return True, int((burst - (tat - now_us)) / step), 0.0
+
+    def reset(self):
+        """Forget all buckets; the alias holds nothing but buckets"""
+        caches[self.alias].clear()
+
+
+_backends = {}
+
+
+def get_backend(name=None):
+    """The configured backend instance ('local' or 'cache')"""
+    name = name or settings.RATE_LIMIT_BACKEND
+    backend = _backends.get(name)
+    if backend is None:
+        if name == 'local':
+            backend = LocalBackend(settings.RATE_LIMIT_LOCAL_MAX_KEYS)
+        elif name == 'cache':
+            backend = CacheBackend()
+        else:
+            raise ValueError(f"Unknown rate limit backend {name!r}")
+        backend = _backends.setdefault(name, backend)
+    return backend
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    DRF throttle taking one token per request from the bucket of
+    (scope, identity). The scope is the class's `scope` or else the view's
+    `throttle_scope`; the identity is the client address unless a subclass
+    chooses another.
+    """
+
+    scope = None
+
+    def get_identity(self, request):
+        return f"ip:{client_ip(request)}"
+
+    def allow_request(self, request, view):
+        if not settings.RATE_LIMIT_ENABLED:
+            return True
+        scope = self.scope or getattr(view, 'throttle_scope', None)
+        rate = settings.RATE_LIMITS.get(scope)
+        if rate is None:
+            return True
+
+        capacity, interval = parse_rate(rate)
+        key = f"{scope}:{self.get_identity(request)}"
+        allowed, self.remaining, self.retry_after = get_backend().hit(key, capacity, interval)
+        if not allowed:
+            rate_limited_total.inc(scope=scope)
+        return allowed
+
+    def wait(self):
+        return self.retry_after
+
+
+def client_ip(request):
+    """
+    Client address for rate limiting. X-Forwarded-For is only trusted for the
+    RATE_LIMIT_NUM_PROXIES hops added by our own proxies, so clients cannot
+    pick a fresh bucket by sending the header themselves.
+    """
+    num_proxies = settings.RATE_LIMIT_NUM_PROXIES
+    if num_proxies > 0:
+        forwarded = request.META.get('HTTP_X_FORWARDED_FOR')
+        if forwarded:
+            hops = forwarded.split(',')
+            return hops[-min(num_proxies, len(hops))].strip()
+    return request.META.get('REMOTE_ADDR', 'unknown')
+
+
+class IPRateThrottle(TokenBucketThrottle):
+    """Bucket per client address"""
+
+
+class UserRateThrottle(TokenBucketThrottle):
+    """Bucket per authenticated user, per client address for anonymous requests"""
+
+    def get_identity(self, request):
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            return f"user:{user.pk}"
+        return super().get_identity(request)
+
+
+def rate_limit(scope, throttle=IPRateThrottle):
+    """Decorator setting a function view's throttle (apply below @api_view)"""
+    scoped = type(throttle.__name__, (throttle,), {'scope': scope})
+
+    def decorator(func):
+        func.throttle_classes = [scoped]
+        return func
+    return decorator
@@ -0,0 +1,51 @@
+"""
+Response renderers: codec-backed JSON, AES-GCM encrypted JSON and event streams
+"""
+from rest_framework.renderers import JSONRenderer
+from .codec import get_codec
+from .crypto import enc_aes_gcm_bytes
+
+
+class CodecJSONRenderer(JSONRenderer):
+    """
+    Renders JSON with the configured core.codec codec.
+    Output is compact UTF-8 bytes produced in one pass; requests that ask
+    for indentation (the browsable API, "Accept: ...; indent=4") fall back
+    to DRF's JSONRenderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return get_codec().dumps(data)
+
+
+class EncryptedJSONRenderer(CodecJSONRenderer):
+    """
+    Renders the response as AES-GCM encrypted JSON.
+    The JSON body is serialized once into a byte buffer and encrypted as a
+    whole with the cached transport key, producing the same
+    "nonce || ciphertext || tag" layout EncryptedBinaryParser accepts.
+    Selected when the client sends a matching Accept header.
+    """
+    media_type = 'application/vnd.safehome.enc+octet-stream'
+    format = 'enc'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        body = super().render(data, accepted_media_type, renderer_context)
+        if not body:
+            return body
+        return enc_aes_gcm_bytes(body)
+
+
+class EventStreamRenderer(CodecJSONRenderer):
+    """
+    Accepts "Accept: text/event-stream" for endpoints that stream
+    core.events. The stream itself is a StreamingHttpResponse; only error
+    responses (401, 403) pass through here and are rendered as JSON.
+    """
+    media_type = 'text/event-stream'
+    format = 'sse'
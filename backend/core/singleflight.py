@@ -0,0 +1,52 @@
+"""
+Single-flight execution through the Django cache
+
+single_flight(key, compute, ttl) runs `compute` once for concurrent callers
+with the same key, across threads and (with a shared cache) processes:
+
+  - the first caller takes a lock entry with cache.add(), computes, and
+    stores the result for `ttl` seconds;
+  - callers arriving meanwhile poll for that result instead of computing;
+  - callers within `ttl` seconds afterwards get the stored result.
+
+When the leader fails (its compute raised, or it disappeared) a waiting
+caller computes for itself, so errors surface from the caller's own call.
+forget(key) drops a stored result that must no longer be handed out.
+"""
+import time
+from django.core.cache import cache
+
+_LOCK_SUFFIX = ':lock'
+_RESULT_SUFFIX = ':result'
+
+
+def single_flight(key, compute, ttl=10, poll_interval=0.02):
+    """Return compute(), shared with concurrent and recent calls for `key`"""
+    key = f'singleflight:{key}'
+    result = cache.get(key + _RESULT_SUFFIX)
+    if result is not None:
+        return result
+
+    if cache.add(key + _LOCK_SUFFIX, 1, ttl):
+        try:
+            result = compute()
+            cache.set(key + _RESULT_SUFFIX, result, ttl)
+            return result
+        finally:
+            cache.delete(key + _LOCK_SUFFIX)
+
+    deadline = time.monotonic() + ttl
+    while time.monotonic() < deadline:
+        time.sleep(poll_interval)
+        result = cache.get(key + _RESULT_SUFFIX)
+        if result is not None:
+            return result
+        if cache.get(key + _LOCK_SUFFIX) is None:
+            # Leader finished without storing a result (it raised)
+            break
+    return compute()
+
+
+def forget(key):
+    """Drop the stored result for `key`, so the next caller computes again"""
+    cache.delete(f'singleflight:{key}' + _RESULT_SUFFIX)
@@ -0,0 +1,231 @@
+"""
+Slow-request capture for SafeHome
+
+SlowRequestMiddleware installs `collect_queries` as a DB execute wrapper, so
+every SQL statement of a request is kept in memory with its duration and
+the project code that issued it. When the request takes longer than
+SLOW_REQUEST_THRESHOLD_MS the collected data is handed to a background
+thread, which:
+  - formats the origins of the statements as "path:line in function",
+  - runs EXPLAIN for the SLOW_QUERY_EXPLAIN_TOP slowest SELECT statements
+    on its own connection,
+  - stores a core.models.SlowRequest row (viewable in the admin), and
+  - deletes rows beyond the newest SLOW_REQUEST_KEEP (a ring buffer).
+
+Query parameters are only used for EXPLAIN and are never stored. Requests
+below the threshold cost, per query, a timer, a walk up the stack that
+keeps (code, line) pairs of project frames (whether a code object belongs
+to the project is decided once and cached), and a list append. Nothing is
+formatted unless the request turns out to be slow.
+"""
+import os
+import sys
+import time
+import queue
+import logging
+import threading
+import contextvars
+from django.conf import settings
+from django.db import connections, close_old_connections
+
+logger = logging.getLogger('safehome')
+
+_current = contextvars.ContextVar('safehome_request_queries', default=None)
+
+# Project frames recorded per statement
+ORIGIN_DEPTH = 3
+
+# Request plumbing that sits between every view and the database
+_PLUMBING = {
+    os.path.join(os.path.dirname(__file__), name)
+    for name in ('slow_requests.py', 'nplusone.py', 'timing.py', 'middleware.py')
+}
+
+
+class QueryLog:
+    """SQL statements executed during one request"""
+
+    __slots__ = ('queries', 'dropped', 'limit')
+
+    def __init__(self, limit):
+        self.queries = []
+        self.dropped = 0
+        self.limit = limit
+
+    def add(self, alias, sql, params, many, duration, origin):
+        if len(self.queries) >= self.limit:
+            self.dropped += 1
+            return
+        self.queries.append((alias, sql, params, many, duration, origin))
+
+    @property
+    def total(self) -> float:
+        return sum(query[4] for query in self.queries)
+
+
+def start():
+    """Begin collecting queries; returns (log, token for stop)"""
+    log = QueryLog(settings.SLOW_REQUEST_MAX_QUERIES)
+    return log, _current.set(log)
+
+
+def stop(token):
+    _current.reset(token)
+
+
+def collect_queries(execute, sql, params, many, context):
+    """connection.execute_wrapper() hook that records queries of the current request"""
+    log = _current.get()
+    if log is None:
+        return execute(sql, params, many, context)
+    start_time = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - start_time
+        log.add(context['connection'].alias, sql, params, many, duration, capture_origin())
+
+
+# Code object -> whether it is project code; code objects live as long as
+# their function, so this stays as small as the code base
+_project_code = {}
+
+
+def _is_project_code(code):
+    filename = code.co_filename
+    base_dir = str(settings.BASE_DIR)
+    return filename.startswith(base_dir) and 'site-packages' not in filename and filename not in _PLUMBING
+
+
+def capture_origin(depth=ORIGIN_DEPTH):
+    """
+    (code, line) of the innermost project frames (outside Django and
+    site-packages) on the stack, unformatted; see format_origin()
+    """
+    frames = []
+    frame = sys._getframe(1)
+    while frame is not None and len(frames) < depth:
+        code = frame.f_code
+        is_project = _project_code.get(code)
+        if is_project is None:
+            is_project = _project_code[code] = _is_project_code(code)
+        if is_project:
+            frames.append((code, frame.f_lineno))
+        frame = frame.f_back
+    return frames
+
+
+def format_origin(frames):
+    """["path:line in function"] for frames from capture_origin()"""
+    base_dir = str(settings.BASE_DIR)
+    return [f"{os.path.relpath(code.co_filename, base_dir)}:{lineno} in {code.co_name}"
+            for code, lineno in frames]
+
+
+def query_origin(depth=ORIGIN_DEPTH):
+    """The innermost project frames (outside Django and site-packages) that issued a query"""
+    return format_origin(capture_origin(depth))
+
+
+def explain(alias, sql, params):
+    """EXPLAIN output of a SELECT statement as a list of row dicts"""
+    connection = connections[alias]
+    prefix = 'EXPLAIN QUERY PLAN ' if connection.vendor == 'sqlite' else 'EXPLAIN '
+    with connection.cursor() as cursor:
+        cursor.execute(prefix + sql, params)
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, (str(value) if value is not None else None for value in row)))
+                for row in cursor.fetchall()]
+
+
+class SlowRequestRecorder:
+    """Stores slow requests from a background thread so responses never wait on it"""
+
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self.dropped = 0
+        self._pid = None
+        self._queue = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_started(self):
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.Queue(maxsize=self.queue_size)
+            threading.Thread(target=self._run, name='slow-request-recorder', daemon=True).start()
+            self._pid = os.getpid()
+
+    def submit(self, record, query_log):
+        """Queue a slow request for storage; dropped when the recorder is behind"""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((record, query_log))
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        q = self._queue
+        while True:
+            record, query_log = q.get()
+            try:
+                self.store(record, query_log)
+            except Exception:
+                logger.exception(f"Could not store slow request {record.get('request_id')}")
+            finally:
+                close_old_connections()
+                q.task_done()
+
+    def store(self, record, query_log):
+        """Explain the slowest statements and save the SlowRequest row"""
+        from .models import SlowRequest
+
+        queries = query_log.queries
+        slowest = sorted(range(len(queries)), key=lambda i: queries[i][4], reverse=True)
+        explain_top = set()
+        for i in slowest:
+            if len(explain_top) >= settings.SLOW_QUERY_EXPLAIN_TOP:
+                break
+            alias, sql, params, many, _, _ = queries[i]
+            if not many and sql.lstrip()[:6].upper() == 'SELECT':
+                explain_top.add(i)
+
+        entries = []
+        for i, (alias, sql, params, many, duration, origin) in enumerate(queries):
+            entry = {'sql': sql, 'duration_ms': round(duration * 1000, 3), 'origin': format_origin(origin)}
+            if i in explain_top:
+                try:
+                    entry['explain'] = explain(alias, sql, params)
+                except Exception as e:
+                    entry['explain_error'] = str(e)
+            entries.append(entry)
+
+        SlowRequest.objects.create(
+            **record,
+            db_ms=round(query_log.total * 1000, 2),
+            query_count=len(queries) + query_log.dropped,
+            queries=entries,
+        )
+
+        keep = settings.SLOW_REQUEST_KEEP
+        cutoff = list(SlowRequest.objects.order_by('-id').values_list('id', flat=True)[keep:keep + 1])
+        if cutoff:
+            SlowRequest.objects.filter(id__lte=cutoff[0]).delete()
+
+    def flush(self, timeout=5.0):
+        """Wait until queued slow requests have been stored"""
+        q = self._queue
+        if q is None or self._pid != os.getpid():
+            return
+        deadline = time.monotonic() + timeout
+        with q.all_tasks_done:
+            while q.unfinished_tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                q.all_tasks_done.wait(remaining)
+
+
+recorder = SlowRequestRecorder()
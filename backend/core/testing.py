@@ -0,0 +1,35 @@
+"""
+Test helpers for SafeHome
+
+    from core.testing import assert_max_queries
+
+    with assert_max_queries(4):
+        response = client.get('/api/bookings/')
+
+fails with the executed statements (grouped by shape) when the block runs
+more than the given number of queries.
+"""
+from contextlib import contextmanager
+from django.db import connections, DEFAULT_DB_ALIAS
+from django.test.utils import CaptureQueriesContext
+from .nplusone import normalize_sql
+
+
+@contextmanager
+def assert_max_queries(limit, using=DEFAULT_DB_ALIAS):
+    """Fail if the block executes more than `limit` queries on `using`"""
+    with CaptureQueriesContext(connections[using]) as context:
+        yield context
+
+    executed = len(context.captured_queries)
+    if executed > limit:
+        shapes = {}
+        for query in context.captured_queries:
+            shape = normalize_sql(query['sql'])
+            shapes[shape] = shapes.get(shape, 0) + 1
+        lines = [f"{executed} queries executed, expected at most {limit}:"]
+        lines.extend(
+            f"  {count}x {shape}"
+            for shape, count in sorted(shapes.items(), key=lambda item: item[1], reverse=True)
+        )
+        raise AssertionError('\n'.join(lines))
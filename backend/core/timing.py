@@ -0,0 +1,132 @@
+"""
+Per-request timing breakdown for SafeHome
+
+RequestLoggingMiddleware starts a RequestTimings for every request and keeps
+it in a context variable. Code that talks to slow dependencies wraps the
+work in `timed(name)` (as a context manager or decorator) and the elapsed
+time is added to the current request's bucket:
+
+    with timed('stripe'):
+        session = stripe.checkout.Session.retrieve(session_id)
+
+Outside a request (management commands, shell) `timed` only costs a context
+variable lookup. Nested blocks with the same name are counted once.
+"""
+import re
+import time
+import uuid
+import functools
+import contextvars
+
+_current = contextvars.ContextVar('safehome_request_timings', default=None)
+
+# Incoming X-Request-ID values we are willing to reuse
+_REQUEST_ID_RE = re.compile(r'^[A-Za-z0-9._-]{8,64}$')
+
+
+class RequestTimings:
+    """Time spent per named bucket during one request"""
+
+    __slots__ = ('request_id', 'started', 'buckets', '_active')
+
+    def __init__(self, request_id=None):
+        self.request_id = request_id or uuid.uuid4().hex
+        self.started = time.perf_counter()
+        self.buckets = {}
+        self._active = set()
+
+    def add(self, name, seconds, count=1):
+        bucket = self.buckets.get(name)
+        if bucket is None:
+            self.buckets[name] = [seconds, count]
+        else:
+            bucket[0] += seconds
+            bucket[1] += count
+
+    def duration(self, name) -> float:
+        """Seconds spent in `name`"""
+        return self.buckets.get(name, (0.0, 0))[0]
+
+    def count(self, name) -> int:
+        """Number of timed calls to `name`"""
+        return self.buckets.get(name, (0.0, 0))[1]
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def server_timing(self, names) -> str:
+        """Format buckets (and the total) as a Server-Timing header value"""
+        parts = [f"{name};dur={self.duration(name) * 1000:.2f}" for name in names]
+        parts.append(f"total;dur={self.elapsed * 1000:.2f}")
+        return ', '.join(parts)
+
+
+def make_request_id(incoming=None) -> str:
+    """Reuse a well-formed incoming X-Request-ID, otherwise generate one"""
+    if incoming and _REQUEST_ID_RE.match(incoming):
+        return incoming
+    return uuid.uuid4().hex
+
+
+def start_request(request_id=None):
+    """Begin timing a request; returns (timings, token for end_request)"""
+    timings = RequestTimings(request_id)
+    return timings, _current.set(timings)
+
+
+def end_request(token):
+    _current.reset(token)
+
+
+def current():
+    """The RequestTimings of the request being handled, or None"""
+    return _current.get()
+
+
+class timed:
+    """Add the time spent in a block or function to the current request"""
+
+    __slots__ = ('name', '_timings', '_start')
+
+    def __init__(self, name):
+        self.name = name
+        self._timings = None
+        self._start = None
+
+    def __enter__(self):
+        timings = _current.get()
+        if timings is not None and self.name not in timings._active:
+            timings._active.add(self.name)
+            self._timings = timings
+            self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        timings = self._timings
+        if timings is not None:
+            timings.add(self.name, time.perf_counter() - self._start)
+            timings._active.discard(self.name)
+            self._timings = None
+        return False
+
+    def __call__(self, func):
+        name = self.name
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed(name):
+                return func(*args, **kwargs)
+        return wrapper
+
+
+def db_timer(execute, sql, params, many, context):
+    """connection.execute_wrapper() hook that times queries into 'db'"""
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.add('db', time.perf_counter() - start)
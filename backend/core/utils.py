@@ -5,7 +5,7 @@ from rest_framework.response import Response
 from rest_framework import status
 
 
-def create_response(data=None, message="", success=True, status_code=status.HTTP_200_OK):
+def create_response(data=None, message="", success=True, status_code=status.HTTP_200_OK, pagination=None):
     """
     Create a standardized API response format
 
@@ -14,6 +14,7 @@ def create_response(data=None, message="", success=True, status_code=status.HTTP
         message: Success or error message
         success: Boolean indicating if the request was successful
         status_code: HTTP status code
+        pagination: Position of a paginated `data` list (core.pagination)
 
     Returns:
         Response object with standardized format
@@ -27,12 +28,16 @@ def create_response(data=None, message="", success=True, status_code=status.HTTP
     if data is not None:
         response_data['data'] = data
 
+    if pagination is not None:
+        response_data['pagination'] = pagination
+
     return Response(response_data, status=status_code)
 
 
-def success_response(data=None, message="Success", status_code=status.HTTP_200_OK):
+def success_response(data=None, message="Success", status_code=status.HTTP_200_OK, pagination=None):
     """Create a successful response"""
-    return create_response(data=data, message=message, success=True, status_code=status_code)
+    return create_response(data=data, message=message, success=True, status_code=status_code,
+                           pagination=pagination)
 
 
 def error_response(message="Error", status_code=status.HTTP_400_BAD_REQUEST):
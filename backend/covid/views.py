@@ -6,6 +6,7 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from core import success_response, error_response
+from core.ratelimit import rate_limit
 
 
 class CovidRestrictionService:
@@ -249,6 +250,7 @@ class CovidRestrictionService:
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@rate_limit('covid_lookup')
 def covid_restriction_lookup(request):
     """
     Get COVID restriction level for a location
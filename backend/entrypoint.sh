@@ -15,6 +15,10 @@ if [ "$DATABASE_URL" ] && [[ "$DATABASE_URL" != *"sqlite"* ]]; then
     echo "✅ Database is ready!"
 fi
 
+# Start with empty metrics; worker snapshots from a previous run would be
+# added to the new totals
+rm -rf "${METRICS_DIR:-/tmp/safehome-metrics}"
+
 # Run database migrations
 echo "🔄 Running database migrations..."
 python manage.py migrate --settings=safehome.settings
@@ -3,14 +3,14 @@ Payment views for SafeHome - Stripe integration
 """
 import stripe
 from rest_framework import status, permissions
-from rest_framework.decorators import parser_classes as parser_classes_decorator, authentication_classes
+from rest_framework.decorators import authentication_classes
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
 from django.conf import settings
 from django.shortcuts import get_object_or_404
 from core import success_response, error_response
 from accounts.authentication import JWTCookieAuthentication
-from core.parsers import EncryptedJSONParser
+from core.timing import timed
 from .models import Payment
 
 
@@ -52,7 +52,6 @@ def stripe_config(request):
 @api_view(['POST'])
 @authentication_classes([JWTCookieAuthentication])
 @permission_classes([permissions.IsAuthenticated])
-@parser_classes_decorator([EncryptedJSONParser])
 def create_stripe_checkout_session(request):
     """
     Create Stripe checkout session for a booking payment
@@ -128,27 +127,28 @@ def create_stripe_checkout_session(request):
         )
 
         # Create Stripe checkout session
-        checkout_session = stripe.checkout.Session.create(
-            payment_method_types=['card'],
-            line_items=[{
-                'price_data': {
-                    'currency': currency,
-                    'product_data': {
-                        'name': 'SafeHome Service Booking',
-                        'description': f'{booking.get_service_type_display()} - {booking.duration_hours}h in {booking.city}',
+        with timed('stripe'):
+            checkout_session = stripe.checkout.Session.create(
+                payment_method_types=['card'],
+                line_items=[{
+                    'price_data': {
+                        'currency': currency,
+                        'product_data': {
+                            'name': 'SafeHome Service Booking',
+                            'description': f'{booking.get_service_type_display()} - {booking.duration_hours}h in {booking.city}',
+                        },
+                        'unit_amount': amount,
                     },
-                    'unit_amount': amount,
-                },
-                'quantity': 1,
-            }],
-            mode='payment',
-            success_url=f'{settings.FRONTEND_URL}/dashboard/booking/{booking_id}?payment=success',
-            cancel_url=f'{settings.FRONTEND_URL}/dashboard/booking/{booking_id}?payment=cancelled',
-            metadata={
-                'booking_id': str(booking_id),
-                'user_id': str(request.user.id),
-            }
-        )
+                    'quantity': 1,
+                }],
+                mode='payment',
+                success_url=f'{settings.FRONTEND_URL}/dashboard/booking/{booking_id}?payment=success',
+                cancel_url=f'{settings.FRONTEND_URL}/dashboard/booking/{booking_id}?payment=cancelled',
+                metadata={
+                    'booking_id': str(booking_id),
+                    'user_id': str(request.user.id),
+                }
+            )
 
         # Save session_id to payment record
         payment.stripe_session_id = checkout_session.id
@@ -175,6 +175,8 @@ def create_stripe_checkout_session(request):
 
 
 @api_view(['POST'])
+@authentication_classes([])
+@permission_classes([permissions.AllowAny])  # Verified by the Stripe signature
 def stripe_webhook(request):
     """
     Handle Stripe webhooks with signature verification
@@ -259,7 +261,8 @@ def payment_success(request):
 
     try:
         stripe.api_key = StripeConfig.get_secret_key()
-        session = stripe.checkout.Session.retrieve(session_id)
+        with timed('stripe'):
+            session = stripe.checkout.Session.retrieve(session_id)
 
         return success_response(
             data={
@@ -332,7 +335,6 @@ def payment_qr_data(request, payment_id):
 @api_view(['POST'])
 @authentication_classes([JWTCookieAuthentication])
 @permission_classes([permissions.IsAuthenticated])
-@parser_classes_decorator([EncryptedJSONParser])
 def verify_payment_session(request):
     """
     Verify Stripe session and update payment status
@@ -350,7 +352,8 @@ def verify_payment_session(request):
         stripe.api_key = StripeConfig.get_secret_key()
 
         # Retrieve session from Stripe
-        session = stripe.checkout.Session.retrieve(session_id)
+        with timed('stripe'):
+            session = stripe.checkout.Session.retrieve(session_id)
 
         # Check if payment was successful
         if session.payment_status == 'paid':
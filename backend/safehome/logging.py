@@ -13,9 +13,25 @@ LOG_DIR.mkdir(exist_ok=True)
 
 # Log file paths
 ACCESS_LOG = LOG_DIR / 'access.log'
+ACCESS_JSON_LOG = LOG_DIR / 'access.json.log'
 ERROR_LOG = LOG_DIR / 'error.log'
 SECURITY_LOG = LOG_DIR / 'security.log'
 
+# File handlers write from a background thread through a bounded queue;
+# records are dropped (and counted) rather than blocking when it is full
+LOG_MAX_BYTES = int(os.environ.get('DJANGO_LOG_MAX_BYTES', 10 * 1024 * 1024))
+LOG_BACKUP_COUNT = int(os.environ.get('DJANGO_LOG_BACKUP_COUNT', 5))
+LOG_QUEUE_SIZE = int(os.environ.get('DJANGO_LOG_QUEUE_SIZE', 10000))
+
+QUEUED_FILE_HANDLER = {
+    'class': 'core.log_handlers.QueuedRotatingFileHandler',
+    'max_bytes': LOG_MAX_BYTES,
+    'backup_count': LOG_BACKUP_COUNT,
+    'queue_size': LOG_QUEUE_SIZE,
+    'batch_size': 256,
+    'flush_interval': 0.5,
+}
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -34,23 +50,33 @@ LOGGING = {
             'style': '{',
             'datefmt': '%Y-%m-%d %H:%M:%S',
         },
+        'json_line': {
+            'format': '{message}',
+            'style': '{',
+        },
     },
     'handlers': {
         'file': {
             'level': 'INFO',
-            'class': 'logging.FileHandler',
+            **QUEUED_FILE_HANDLER,
             'filename': ACCESS_LOG,
             'formatter': 'detailed',
         },
+        'access_json_file': {
+            'level': 'INFO',
+            **QUEUED_FILE_HANDLER,
+            'filename': ACCESS_JSON_LOG,
+            'formatter': 'json_line',
+        },
         'error_file': {
             'level': 'ERROR',
-            'class': 'logging.FileHandler',
+            **QUEUED_FILE_HANDLER,
             'filename': ERROR_LOG,
             'formatter': 'detailed',
         },
         'security_file': {
             'level': 'WARNING',
-            'class': 'logging.FileHandler',
+            **QUEUED_FILE_HANDLER,
             'filename': SECURITY_LOG,
             'formatter': 'detailed',
         },
@@ -76,6 +102,11 @@ LOGGING = {
             'level': 'INFO',
             'propagate': False,
         },
+        'safehome.access': {
+            'handlers': ['access_json_file'],
+            'level': 'INFO',
+            'propagate': False,
+        },
         'safehome.security': {
             'handlers': ['security_file', 'console'],
             'level': 'WARNING',
@@ -13,10 +13,10 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 from pathlib import Path
 import environ
 import os
+import tempfile
 
-# Import custom logging configuration and middleware
+# Import custom logging configuration
 from .logging import LOGGING
-from core.middleware import RequestLoggingMiddleware, ErrorHandlingMiddleware, custom_exception_handler
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -86,8 +86,12 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 
     # Custom middleware
+    'core.middleware.MetricsMiddleware',
     'core.middleware.RequestLoggingMiddleware',
+    'core.middleware.SlowRequestMiddleware',
+    'core.middleware.NPlusOneMiddleware',
     'core.middleware.ErrorHandlingMiddleware',
+    'core.middleware.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'safehome.urls'
@@ -168,9 +172,15 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # REST Framework settings
 REST_FRAMEWORK = {
+    # EncryptedJSONParser also reads plain JSON bodies, through core.codec
     'DEFAULT_PARSER_CLASSES': [
         'core.parsers.EncryptedJSONParser',
-        'rest_framework.parsers.JSONParser',
+        'core.parsers.EncryptedBinaryParser',
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.CodecJSONRenderer',
+        'core.renderers.EncryptedJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'accounts.authentication.JWTCookieAuthentication',
@@ -191,6 +201,49 @@ SIMPLE_JWT = {
     'BLACKLIST_AFTER_ROTATION': True,
 }
 
+# Shared cache (auth epochs). Point DJANGO_CACHE_URL at Redis or Memcached
+# when running several workers so role changes reach all of them.
+CACHES = {
+    'default': env.cache('DJANGO_CACHE_URL', default='locmemcache://safehome'),
+    # Rate limit buckets (RATE_LIMIT_BACKEND=cache); give it its own Redis
+    # database so resetting the buckets never touches the default cache
+    'ratelimit': env.cache('RATE_LIMIT_CACHE_URL', default='locmemcache://safehome-ratelimit'),
+}
+
+# Users resolved from access tokens are cached per process for this many
+# seconds (0 disables); saving a user invalidates its entries
+AUTH_USER_CACHE_TTL = env.float('AUTH_USER_CACHE_TTL', default=30.0)
+AUTH_USER_CACHE_SIZE = env.int('AUTH_USER_CACHE_SIZE', default=2048)
+
+# Token revocation (accounts.revocation): each worker checks tokens against a
+# Bloom filter of revoked jtis, refreshed from the table every
+# REVOCATION_REFRESH_INTERVAL seconds and rebuilt every REVOCATION_REBUILD_INTERVAL
+REVOCATION_REFRESH_INTERVAL = env.float('REVOCATION_REFRESH_INTERVAL', default=5.0)
+REVOCATION_REBUILD_INTERVAL = env.float('REVOCATION_REBUILD_INTERVAL', default=3600.0)
+REVOCATION_FILTER_CAPACITY = env.int('REVOCATION_FILTER_CAPACITY', default=100000)
+REVOCATION_FILTER_ERROR_RATE = env.float('REVOCATION_FILTER_ERROR_RATE', default=0.001)
+
+# Concurrent /api/auth/refresh/ calls with the same refresh token within this
+# many seconds get the tokens of the first call instead of failing rotation
+# (0 disables sharing)
+TOKEN_REFRESH_SHARE_SECONDS = env.int('TOKEN_REFRESH_SHARE_SECONDS', default=10)
+
+# Keyset pagination of list endpoints (core.pagination): rows per page by
+# default and the most a client may request with ?page_size=
+API_PAGE_SIZE = env.int('API_PAGE_SIZE', default=20)
+API_MAX_PAGE_SIZE = env.int('API_MAX_PAGE_SIZE', default=100)
+
+# Server-Sent Events (core.events, /api/bookings/events/). EVENTS_BACKEND
+# 'local' keeps events within one process; 'cache' relays them through
+# DJANGO_CACHE_URL so every worker sees them (needs a shared cache).
+EVENTS_BACKEND = env('EVENTS_BACKEND', default='local')
+EVENTS_BUFFER_SIZE = env.int('EVENTS_BUFFER_SIZE', default=1000)  # Events kept for Last-Event-ID resume
+EVENTS_HEARTBEAT_SECONDS = env.float('EVENTS_HEARTBEAT_SECONDS', default=15)
+EVENTS_STREAM_MAX_SECONDS = env.float('EVENTS_STREAM_MAX_SECONDS', default=300)  # Then the client reconnects
+EVENTS_RETRY_MS = env.int('EVENTS_RETRY_MS', default=3000)
+EVENTS_POLL_INTERVAL = env.float('EVENTS_POLL_INTERVAL', default=0.25)  # 'cache' backend only
+EVENTS_CACHE_TTL = env.int('EVENTS_CACHE_TTL', default=300)
+
 # CORS settings
 CORS_ALLOWED_ORIGINS = env('DJANGO_CORS_ALLOWED_ORIGINS').split(',') if env('DJANGO_CORS_ALLOWED_ORIGINS') else [
     'http://localhost:3000',
@@ -229,3 +282,55 @@ STRIPE_PUBLISHABLE_KEY = env('STRIPE_PUBLISHABLE_KEY')
 STRIPE_SECRET_KEY = env('STRIPE_SECRET_KEY')
 STRIPE_WEBHOOK_SECRET = env('STRIPE_WEBHOOK_SECRET')
 FRONTEND_URL = env('FRONTEND_URL')
+
+# JSON codec for API parsers and renderers: auto, stdlib or orjson
+JSON_CODEC = env('JSON_CODEC', default='auto')
+
+# Encryption Configuration
+# Threads used to decrypt booking fields on list endpoints (0 = decrypt sequentially)
+CRYPTO_DECRYPT_WORKERS = env.int('CRYPTO_DECRYPT_WORKERS', default=0)
+
+# Metrics: per-worker snapshots are written to METRICS_DIR and merged on scrape
+METRICS_DIR = env('METRICS_DIR', default=os.path.join(tempfile.gettempdir(), 'safehome-metrics'))
+METRICS_FLUSH_INTERVAL = env.float('METRICS_FLUSH_INTERVAL', default=5.0)
+METRICS_TOKEN = env('METRICS_TOKEN', default='')
+METRICS_ALLOWED_IPS = env.list('METRICS_ALLOWED_IPS', default=['127.0.0.1', '::1'])
+
+# Profiling: requests sent with "X-Profile: <PROFILING_TOKEN>" (or sampled via
+# the admin ProfilingConfig) are profiled into PROFILING_DIR
+PROFILING_DIR = env('PROFILING_DIR', default=os.path.join(tempfile.gettempdir(), 'safehome-profiles'))
+PROFILING_MAX_FILES = env.int('PROFILING_MAX_FILES', default=200)
+PROFILING_TOKEN = env('PROFILING_TOKEN', default='')
+PROFILING_CONFIG_TTL = env.float('PROFILING_CONFIG_TTL', default=30.0)
+
+# Slow requests: requests over the threshold are stored with their SQL and
+# EXPLAIN output in the admin (Core > Slow Requests); 0 disables capture
+SLOW_REQUEST_THRESHOLD_MS = env.float('SLOW_REQUEST_THRESHOLD_MS', default=1000.0)
+SLOW_REQUEST_KEEP = env.int('SLOW_REQUEST_KEEP', default=500)
+SLOW_REQUEST_MAX_QUERIES = env.int('SLOW_REQUEST_MAX_QUERIES', default=500)
+SLOW_QUERY_EXPLAIN_TOP = env.int('SLOW_QUERY_EXPLAIN_TOP', default=3)
+
+# N+1 detection: 'warn' logs, 'raise' fails the request (tests), 'off' disables
+N_PLUS_ONE_DETECTION = env('N_PLUS_ONE_DETECTION', default='warn' if DEBUG else 'off')
+N_PLUS_ONE_THRESHOLD = env.int('N_PLUS_ONE_THRESHOLD', default=5)
+
+# Password hashing pool: concurrent hashes, waiting tasks, and seconds a task
+# may wait before the request fails with 503 (0 workers hashes inline)
+PASSWORD_POOL_WORKERS = env.int('PASSWORD_POOL_WORKERS', default=max(1, (os.cpu_count() or 2) // 2))
+PASSWORD_POOL_QUEUE_SIZE = env.int('PASSWORD_POOL_QUEUE_SIZE', default=16)
+PASSWORD_POOL_QUEUE_TIMEOUT = env.float('PASSWORD_POOL_QUEUE_TIMEOUT', default=2.0)
+
+# Rate limiting: token buckets per scope ('<tokens>/<period>'), 'local' keeps
+# buckets per process, 'cache' shares them across workers through
+# CACHES['ratelimit'] (RATE_LIMIT_CACHE_URL)
+RATE_LIMIT_ENABLED = env.bool('RATE_LIMIT_ENABLED', default=True)
+RATE_LIMIT_BACKEND = env('RATE_LIMIT_BACKEND', default='local')
+RATE_LIMIT_LOCAL_MAX_KEYS = env.int('RATE_LIMIT_LOCAL_MAX_KEYS', default=100000)
+# Reverse proxies in front of Django whose X-Forwarded-For entries are trusted
+RATE_LIMIT_NUM_PROXIES = env.int('RATE_LIMIT_NUM_PROXIES', default=0)
+RATE_LIMITS = {
+    'login': env('RATE_LIMIT_LOGIN', default='10/min'),
+    'register': env('RATE_LIMIT_REGISTER', default='10/hour'),
+    'booking_create': env('RATE_LIMIT_BOOKING_CREATE', default='30/hour'),
+    'covid_lookup': env('RATE_LIMIT_COVID_LOOKUP', default='60/min'),
+}
@@ -16,15 +16,23 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
-from django.http import JsonResponse
+from django.http import JsonResponse, HttpResponse, Http404
+from core.metrics import registry, scrape_allowed
 
 def health_check(request):
     """Simple health check endpoint"""
     return JsonResponse({'status': 'ok', 'message': 'SafeHome API is running'})
 
+def metrics(request):
+    """Prometheus metrics aggregated across all workers (internal only)"""
+    if not scrape_allowed(request):
+        raise Http404
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('health/', health_check, name='health_check'),
+    path('metrics/', metrics, name='metrics'),
     path('api/', include([
         path('auth/', include('accounts.urls')),
         path('services/', include('services.urls')),
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark JSON encoding and decoding of booking list responses
+
+Usage:
+    python scripts/bench_codec.py [--iterations N] [--rows N ...]
+
+Compares DRF's JSONRenderer with the core.codec stdlib and (when installed)
+orjson codecs used by CodecJSONRenderer, using the create_response envelope around rows
+shaped like BookingDetailSerializer output.
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import argparse
+import django
+from decimal import Decimal
+from datetime import datetime, timedelta, timezone
+
+# Set up Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'safehome.settings')
+os.environ.setdefault('FERNET_KEY', 'bench-fernet-key-32-characters-long-for-encryption')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+django.setup()
+
+from rest_framework.renderers import JSONRenderer
+from core import codec as codec_module
+from core.codec import get_codec
+
+
+def _booking_row(i: int) -> dict:
+    """One booking as BookingDetailSerializer returns it"""
+    start = datetime(2026, 11, 2, 9, 30, tzinfo=timezone.utc) + timedelta(hours=i)
+    return {
+        'id': uuid.uuid4(),
+        'user': {'id': uuid.uuid4(), 'email': f'customer{i}@example.com',
+                 'first_name': 'Jane', 'last_name': 'Citizen'},
+        'provider': None,
+        'service_type': 'cleaning',
+        'service_type_display': 'Home Cleaning',
+        'budget': Decimal('180.00') + i,
+        'provider_quote': None,
+        'address': f'{i} Rundle Mall, Adelaide SA 5000',
+        'phone': f'+61 400 000 {i % 1000:03d}',
+        'city': 'Adelaide',
+        'state': 'SA',
+        'country': 'AU',
+        'start_time': start,
+        'duration_hours': 3,
+        'status': 'pending',
+        'confirmation_code': '4821',
+        'notes': 'Side gate is unlocked, please mind the dog.',
+        'payment_status': None,
+        'created_at': start - timedelta(days=3),
+        'updated_at': start - timedelta(days=3),
+    }
+
+
+def _envelope(rows: int) -> dict:
+    return {
+        'success': True,
+        'message': 'Bookings retrieved successfully',
+        'status_code': 200,
+        'data': [_booking_row(i) for i in range(rows)],
+    }
+
+
+def _time_per_call(func, iterations: int) -> float:
+    """Return the mean wall time of func() in microseconds"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--rows', type=int, nargs='+', default=[1, 20, 100, 500])
+    args = parser.parse_args()
+
+    codecs = ['stdlib'] + (['orjson'] if codec_module.orjson is not None else [])
+    if len(codecs) == 1:
+        print("orjson is not installed; only the stdlib codec is measured\n")
+
+    print(f"{'rows':>6}  {'implementation':<22}{'bytes':>10}{'dump (us)':>12}{'load (us)':>12}")
+    print('-' * 62)
+    for rows in args.rows:
+        data = _envelope(rows)
+        iterations = max(args.iterations * 20 // max(rows, 20), 10)
+
+        drf = JSONRenderer()
+        body = drf.render(data)
+        dump = _time_per_call(lambda: drf.render(data), iterations)
+        load = _time_per_call(lambda: json.loads(body), iterations)
+        print(f"{rows:>6}  {'DRF JSONRenderer':<22}{len(body):>10}{dump:>12.1f}{load:>12.1f}")
+
+        for name in codecs:
+            codec = get_codec(name)
+            body = codec.dumps(data)
+            dump = _time_per_call(lambda: codec.dumps(data), iterations)
+            load = _time_per_call(lambda: codec.loads(body), iterations)
+            print(f"{rows:>6}  {'codec ' + name:<22}{len(body):>10}{dump:>12.1f}{load:>12.1f}")
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-call cost of core.crypto with and without the derived-key cache
+
+Usage:
+    python scripts/bench_crypto.py [--iterations N] [--batch N]
+
+"cold" invalidates the keyring before every call, which reproduces the old
+behaviour of running PBKDF2 on each enc/dec/dec_aes_gcm call. "warm" reuses
+the keys derived once per process.
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('FERNET_KEY', 'bench-fernet-key-32-characters-long-for-encryption')
+
+from core.crypto import enc, dec, dec_many, enc_bytes, dec_bytes, dec_aes_gcm, keyring
+
+
+def _make_transport_payload(plaintext: str) -> str:
+    """Build an "iv:ciphertext:tag" payload the way the frontend does"""
+    iv = os.urandom(16)
+    encrypted = keyring.aesgcm().encrypt(iv, plaintext.encode('utf-8'), None)
+    return f"{iv.hex()}:{encrypted[:-16].hex()}:{encrypted[-16:].hex()}"
+
+
+def _time_per_call(func, iterations: int, cold: bool) -> float:
+    """Return the mean wall time of func() in microseconds"""
+    total = 0.0
+    for _ in range(iterations):
+        if cold:
+            keyring.invalidate()
+        start = time.perf_counter()
+        func()
+        total += time.perf_counter() - start
+    return total / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--batch', type=int, default=1000)
+    args = parser.parse_args()
+
+    plaintext = '42 Wallaby Way, Sydney NSW 2000'
+    token = enc(plaintext)
+    blob = enc_bytes(plaintext)
+    payload = _make_transport_payload('{"booking_id": "abc", "confirmation_code": "1234"}')
+
+    cases = [
+        ('enc', lambda: enc(plaintext)),
+        ('dec', lambda: dec(token)),
+        ('enc_bytes', lambda: enc_bytes(plaintext)),
+        ('dec_bytes', lambda: dec_bytes(blob)),
+        ('dec_aes_gcm', lambda: dec_aes_gcm(payload)),
+    ]
+
+    print(f"{'function':<14}{'cold (us)':>14}{'warm (us)':>14}{'speedup':>10}")
+    print('-' * 52)
+    for name, func in cases:
+        cold = _time_per_call(func, args.iterations, cold=True)
+        keyring.aesgcm()  # prime the cache once
+        warm = _time_per_call(func, args.iterations * 100, cold=False)
+        print(f"{name:<14}{cold:>14.1f}{warm:>14.1f}{cold / warm:>9.0f}x")
+
+    # Bulk decryption of one list page (two fields per booking)
+    tokens = [enc(f"{i} Example Street, Adelaide SA 5000") for i in range(args.batch)]
+    print(f"\nDecrypting {len(tokens)} tokens")
+    print('-' * 52)
+    start = time.perf_counter()
+    for token in tokens:
+        dec(token)
+    baseline = time.perf_counter() - start
+    print(f"{'dec loop':<24}{baseline * 1e3:>10.1f} ms")
+    for workers in (None, 2, 4, 8):
+        start = time.perf_counter()
+        dec_many(tokens, workers=workers)
+        elapsed = time.perf_counter() - start
+        label = f"dec_many workers={workers or 0}"
+        print(f"{label:<24}{elapsed * 1e3:>10.1f} ms{baseline / elapsed:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark EncryptedJSONParser (hex envelope) against EncryptedBinaryParser
+
+Usage:
+    python scripts/bench_parsers.py [--iterations N]
+
+Both parsers decrypt the same booking payload. Parser logging is silenced so
+the numbers reflect decoding and decryption only.
+"""
+import io
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import django
+
+# Set up Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'safehome.settings')
+os.environ.setdefault('FERNET_KEY', 'bench-fernet-key-32-characters-long-for-encryption')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+django.setup()
+
+from core.crypto import keyring
+from core.parsers import EncryptedJSONParser, EncryptedBinaryParser
+
+
+def _booking_payload(notes_size: int) -> bytes:
+    """A create-booking body as the frontend sends it"""
+    return json.dumps({
+        'service_type': 'cleaning',
+        'budget': '180.00',
+        'address': '42 Wallaby Way, Sydney NSW 2000',
+        'phone': '+61 400 123 456',
+        'city': 'Sydney',
+        'state': 'NSW',
+        'country': 'AU',
+        'start_time': '2026-11-02T09:30:00+10:30',
+        'duration_hours': 3,
+        'notes': 'x' * notes_size,
+    }).encode('utf-8')
+
+
+def _hex_body(plaintext: bytes) -> bytes:
+    iv = os.urandom(16)
+    encrypted = keyring.aesgcm().encrypt(iv, plaintext, None)
+    payload = f"{iv.hex()}:{encrypted[:-16].hex()}:{encrypted[-16:].hex()}"
+    return json.dumps({'payload': payload}).encode('utf-8')
+
+
+def _binary_body(plaintext: bytes) -> bytes:
+    nonce = os.urandom(12)
+    return nonce + keyring.aesgcm().encrypt(nonce, plaintext, None)
+
+
+def _time_per_call(parser, body: bytes, iterations: int) -> float:
+    """Return the mean wall time of one parse in microseconds"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        parser.parse(io.BytesIO(body), parser.media_type, {})
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=5000)
+    args = parser.parse_args()
+
+    logging.getLogger('core.parsers').setLevel(logging.WARNING)
+    keyring.aesgcm()  # derive the transport key once up front
+
+    formats = [
+        ('hex json', EncryptedJSONParser(), _hex_body),
+        ('binary', EncryptedBinaryParser(), _binary_body),
+    ]
+
+    print(f"{'payload':<10}{'format':<10}{'wire bytes':>12}{'us/parse':>12}{'plain MB/s':>12}")
+    print('-' * 56)
+    for label, notes_size in (('small', 40), ('4 KiB', 4096), ('64 KiB', 65536)):
+        plaintext = _booking_payload(notes_size)
+        iterations = max(args.iterations * 64 // (64 + notes_size // 64), 50)
+        for name, instance, build in formats:
+            body = build(plaintext)
+            per_call = _time_per_call(instance, body, iterations)
+            throughput = len(plaintext) / per_call  # plaintext MB/s
+            print(f"{label:<10}{name:<10}{len(body):>12}{per_call:>12.1f}{throughput:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
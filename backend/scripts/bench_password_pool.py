@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark cheap-endpoint latency during a login storm
+
+Usage:
+    python scripts/bench_password_pool.py [--server-threads N] [--logins N] [--probes N]
+
+A fixed set of server threads (like gunicorn --threads) serves a burst of
+logins together with a steady stream of /health/ probes. Each probe's
+latency includes the time it queued for a free server thread. The run is
+repeated with hashing inline (PASSWORD_POOL_WORKERS=0) and on the bounded
+pool; with the pool, excess logins get 503 instead of holding server
+threads, so probe latency stays flat.
+
+Needs a migrated database; a benchmark user is created and removed.
+"""
+import os
+import sys
+import time
+import logging
+import argparse
+import statistics
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+import django
+
+# Set up Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'safehome.settings')
+os.environ.setdefault('FERNET_KEY', 'bench-fernet-key-32-characters-long-for-encryption')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+django.setup()
+
+from django.db import connection
+from django.test import Client
+from accounts.models import User
+from core import password_pool
+from core.password_pool import PasswordHashingPool
+
+EMAIL = 'bench-password-pool@example.com'
+PASSWORD = 'bench-password-123'
+
+_clients = threading.local()
+
+
+def _client():
+    client = getattr(_clients, 'client', None)
+    if client is None:
+        client = _clients.client = Client()
+    return client
+
+
+def _login():
+    response = _client().post('/api/auth/login/', {'email': EMAIL, 'password': PASSWORD},
+                              content_type='application/json')
+    return response.status_code
+
+
+def _probe(submitted):
+    _client().get('/health/')
+    return time.perf_counter() - submitted
+
+
+def _run(pool, server_threads, logins, probes, probe_interval):
+    """Return (probe latencies in seconds, login status counts)"""
+    with patch.object(password_pool, 'pool', pool), ThreadPoolExecutor(server_threads) as server:
+        login_futures = [server.submit(_login) for _ in range(logins)]
+        probe_futures = []
+        for _ in range(probes):
+            probe_futures.append(server.submit(_probe, time.perf_counter()))
+            time.sleep(probe_interval)
+        latencies = [future.result() for future in probe_futures]
+        statuses = {}
+        for future in login_futures:
+            code = future.result()
+            statuses[code] = statuses.get(code, 0) + 1
+    pool.shutdown()
+    return latencies, statuses
+
+
+def _percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--server-threads', type=int, default=8)
+    parser.add_argument('--logins', type=int, default=48)
+    parser.add_argument('--probes', type=int, default=50)
+    parser.add_argument('--probe-interval', type=float, default=0.02)
+    parser.add_argument('--pool-workers', type=int, default=2)
+    parser.add_argument('--pool-queue', type=int, default=4)
+    parser.add_argument('--pool-timeout', type=float, default=0.5)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    User.objects.filter(email=EMAIL).delete()
+    User.objects.create_user(username='bench-password-pool', email=EMAIL, password=PASSWORD)
+    connection.close()
+
+    modes = [
+        ('inline', PasswordHashingPool(workers=0)),
+        (f'pool {args.pool_workers}+{args.pool_queue}',
+         PasswordHashingPool(args.pool_workers, args.pool_queue, args.pool_timeout)),
+    ]
+
+    try:
+        print(f"{args.logins} logins, {args.probes} /health/ probes, {args.server_threads} server threads")
+        print(f"{'hashing':<12}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}  login statuses")
+        print('-' * 64)
+        for name, pool in modes:
+            latencies, statuses = _run(pool, args.server_threads, args.logins,
+                                       args.probes, args.probe_interval)
+            print(f"{name:<12}{statistics.median(latencies) * 1000:>10.1f}"
+                  f"{_percentile(latencies, 0.95) * 1000:>10.1f}{max(latencies) * 1000:>10.1f}  "
+                  f"{dict(sorted(statuses.items()))}")
+    finally:
+        User.objects.filter(email=EMAIL).delete()
+
+
+if __name__ == '__main__':
+    main()
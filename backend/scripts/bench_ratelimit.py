@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark the cost of rate limiting per request
+
+Usage:
+    python scripts/bench_ratelimit.py [--iterations N] [--keys N]
+
+Times one token-bucket check on each backend, both directly and through
+the DRF throttle on a request object (the full per-request overhead), over
+a spread of client addresses. The 'cache' backend uses whatever CACHES
+configures (local memory unless DJANGO_CACHE_URL is set).
+"""
+import os
+import sys
+import time
+import argparse
+import django
+
+# Set up Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'safehome.settings')
+os.environ.setdefault('FERNET_KEY', 'bench-fernet-key-32-characters-long-for-encryption')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+django.setup()
+
+from django.test import RequestFactory, override_settings
+from rest_framework.request import Request
+from core.ratelimit import IPRateThrottle, get_backend, parse_rate
+
+
+class _View:
+    throttle_scope = 'bench'
+
+
+def _time(func, iterations):
+    """Mean microseconds per call"""
+    start = time.perf_counter()
+    for i in range(iterations):
+        func(i)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=100000)
+    parser.add_argument('--keys', type=int, default=1000)
+    args = parser.parse_args()
+
+    capacity, interval = parse_rate('100/s')
+    factory = RequestFactory()
+    requests = [Request(factory.post('/', REMOTE_ADDR=f'10.0.{i // 256}.{i % 256}'))
+                for i in range(args.keys)]
+    view = _View()
+    throttle = IPRateThrottle()
+
+    print(f"{args.iterations} checks over {args.keys} client addresses")
+    print(f"{'backend':<10}{'hit() us':>12}{'throttle us':>14}")
+    print('-' * 36)
+    for name in ('local', 'cache'):
+        with override_settings(RATE_LIMIT_ENABLED=True, RATE_LIMIT_BACKEND=name,
+                               RATE_LIMITS={'bench': '100/s'}):
+            backend = get_backend()
+            backend.reset()
+            direct = _time(lambda i: backend.hit(f'bench:ip:{i % args.keys}', capacity, interval),
+                           args.iterations)
+            backend.reset()
+            full = _time(lambda i: throttle.allow_request(requests[i % args.keys], view), args.iterations)
+            backend.reset()
+        print(f"{name:<10}{direct:>12.2f}{full:>14.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -18,6 +18,7 @@ class ServiceListView(generics.ListAPIView):
     serializer_class = ServiceSerializer
     queryset = Service.objects.filter(is_active=True)
     pagination_class = None  # No pagination for simple list
+    authentication_classes = []
     permission_classes = [AllowAny]  # Allow unauthenticated access
 
 
@@ -29,6 +30,7 @@ class ServiceDetailView(generics.RetrieveAPIView):
     """
     serializer_class = ServiceDetailSerializer
     queryset = Service.objects.filter(is_active=True)
+    authentication_classes = []
     permission_classes = [AllowAny]  # Allow unauthenticated access
 
     def get_object(self):
@@ -0,0 +1,11 @@
+"""
+pytest configuration for the SafeHome test scripts
+
+Requests that repeat the same query shape fail the test instead of only
+being logged (see core.nplusone). Must run before Django settings load.
+"""
+import os
+
+os.environ.setdefault('N_PLUS_ONE_DETECTION', 'raise')
+# Tests log in and register many times; test_ratelimit.py enables limits itself
+os.environ.setdefault('RATE_LIMIT_ENABLED', 'false')
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Test script for the authenticated-user cache in JWTCookieAuthentication
+"""
+import os
+import sys
+import django
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+# Set FERNET_KEY environment variable
+os.environ['FERNET_KEY'] = 'test-fernet-key-32-characters-long-for-encryption'
+
+# Set up Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'safehome.settings')
+django.setup()
+
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.tokens import RefreshToken
+from accounts.models import User
+from accounts.authentication import user_cache
+
+
+def _customer():
+    user = User.objects.filter(email='cache-customer@test.com').first()
+    if user is None:
+        user = User.objects.create_user(username='cache-customer', email='cache-customer@test.com',
+                                        password='testpass123', role='customer', city='Sydney')
+    return user
+
+
+def _client(user):
+    client = Client()
+    client.cookies['access_token'] = str(RefreshToken.for_user(user).access_token)
+    return client
+
+
+def _user_queries(context):
+    return [q for q in context.captured_queries if 'FROM "accounts_user"' in q['sql']]
+
+
+def test_steady_state_has_no_auth_query():
+    """Test that repeated requests with one token load the user once"""
+    print("Testing cached user resolution...")
+    user_cache.clear()
+    client = _client(_customer())
+
+    with CaptureQueriesContext(connection) as first:
+        assert client.get('/api/bookings/stats/').status_code == 200
+    with CaptureQueriesContext(connection) as second:
+        assert client.get('/api/bookings/stats/').status_code == 200
+
+    assert len(_user_queries(first)) == 1
+    assert _user_queries(second) == [], second.captured_queries
+    assert len(second.captured_queries) == 1
+    print("  PASS: Second request runs only the view's query")
+    return True
+
+
+def test_profile_update_invalidates():
+    """Test that updating the profile is visible on the next request"""
+    print("\nTesting invalidation...")
+    user_cache.clear()
+    user = _customer()
+    client = _client(user)
+
+    assert client.get('/api/auth/me/').json()['data']['city'] == 'Sydney'
+    response = client.patch('/api/auth/me/', {'city': 'Melbourne'}, content_type='application/json')
+    assert response.status_code == 200, response.content
+    assert client.get('/api/auth/me/').json()['data']['city'] == 'Melbourne'
+    print("  PASS: Profile update invalidates the cached user")
+
+    user.refresh_from_db()
+    user.is_active = False
+    user.save()
+    assert client.get('/api/auth/me/').status_code == 401
+    print("  PASS: Deactivation applies immediately")
+
+    user.is_active = True
+    user.city = 'Sydney'
+    user.save()
+    return True
+
+
+def test_cached_instance_not_shared():
+    """Test that views cannot modify the cached user in place"""
+    print("\nTesting per-request copies...")
+    user_cache.clear()
+    client = _client(_customer())
+    client.get('/api/auth/me/')
+
+    cached = next(iter(user_cache._data.values()))[1]
+    response = client.patch('/api/auth/me/', {'first_name': 'x' * 500}, content_type='application/json')
+    assert response.status_code == 400
+    assert cached.first_name != 'x' * 500
+    print("  PASS: Failed update leaves the cached user untouched")
+    return True
+
+
+if __name__ == '__main__':
+    print("Testing SafeHome auth user cache...")
+
+    success = True
+    success &= test_steady_state_has_no_auth_query()
+    success &= test_profile_update_invalidates()
+    success &= test_cached_instance_not_shared()
+
+    if success:
+        print("\n🎉 All auth user cache tests passed!")
+    else:
+        print("\n❌ Some tests failed!")
+        sys.exit(1)
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Test script for the filtered available tasks feed
+"""
+import os
+import sys
+import django
+from pathlib import Path
+from datetime import timedelta
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+# Set FERNET_KEY environment variable
+os.environ['FERNET_KEY'] = 'test-fernet-key-32-characters-long-for-encryption'
+
+# Set up Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'safehome.settings')
+django.setup()
+
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+from accounts.models import User
+from bookings.models import Booking
+
+FEED = '/api/bookings/provider/available/'
+
+# (city, state, service_type, budget, days from now)
+TASKS = [
+    ('Adelaide', 'SA', 'cleaning', 80, 1),
+    ('Adelaide', 'SA', 'plumbing', 150, 2),
+    ('Adelaide', 'SA', 'cleaning', 300, 10),
+    ('Sydney', 'NSW', 'cleaning', 120, 3),
+    ('Sydney', 'NSW', 'electrical', 90, 4),
+    ('Melbourne', 'VIC', 'gardening', 60, 5),
+]
+
+
+def _user(email, role):
+    user = User.objects.filter(email=email).first()
+    if user is None:
+        user = User.objects.create_user(username=email.split('@')[0], email=email,
+                                        password='testpass123', role=role)
+    return user
+
+
+def _client(user):
+    client = Client()
+    client.cookies['access_token'] = str(RefreshToken.for_user(user).access_token)
+    return client
+
+
+def _booking(customer, city, state, service_type, budget, days, **extra):
+    booking = Booking(
+        user=customer, service_type=service_type, budget=budget, city=city, state=state,
+        country='AU', start_time=timezone.now() + timedelta(days=days), duration_hours=2, **extra,
+    )
+    booking.set_address(f'1 {city} Street')
+    booking.set_phone('+61400000000')
+    booking.save()
+    return booking
+
+
+def _setup():
+    customer = _user('feed-customer@test.com', 'customer')
+    provider = _user('feed-provider@test.com', 'provider')
+    Booking.objects.filter(provider__isnull=True, status='pending').delete()
+    Booking.objects.filter(user=customer).delete()
+    for task in TASKS:
+        _booking(customer, *task)
+    # Not in the feed: already assigned, or no longer pending
+    _booking(customer, 'Adelaide', 'SA', 'cleaning', 100, 1, provider=provider, status='confirmed')
+    _booking(customer, 'Adelaide', 'SA', 'cleaning', 100, 1, status='cancelled')
+    return _client(provider)
+
+
+def _cities(response):
+    assert response.status_code == 200, response.content
+    return sorted((row['city'], row['service_type']) for row in response.json()['data'])
+
+
+def test_filters():
+    """Test each filter and their combination"""
+    print("Testing feed filters...")
+    client = _setup()
+    assert len(client.get(FEED).json()['data']) == len(TASKS)
+
+    assert _cities(client.get(FEED, {'city': 'Adelaide'})) == [
+        ('Adelaide', 'cleaning'), ('Adelaide', 'cleaning'), ('Adelaide', 'plumbing')]
+    assert _cities(client.get(FEED, {'state': 'NSW', 'country': 'AU'})) == [
+        ('Sydney', 'cleaning'), ('Sydney', 'electrical')]
+    assert _cities(client.get(FEED, {'service_type': 'cleaning', 'budget_min': '100'})) == [
+        ('Adelaide', 'cleaning'), ('Sydney', 'cleaning')]
+    assert _cities(client.get(FEED, {'budget_max': '90'})) == [
+        ('Adelaide', 'cleaning'), ('Melbourne', 'gardening'), ('Sydney', 'electrical')]
+    start_before = (timezone.now() + timedelta(days=7)).isoformat()
+    assert _cities(client.get(FEED, {'city': 'Adelaide', 'service_type': 'cleaning',
+                                     'start_before': start_before})) == [('Adelaide', 'cleaning')]
+    assert len(client.get(FEED, {'city': ''}).json()['data']) == len(TASKS)
+    print("  PASS: City, region, service type, budget and start window filters")
+
+    for params in ({'service_type': 'juggling'}, {'budget_min': 'cheap'},
+                   {'budget_min': '200', 'budget_max': '100'}):
+        assert client.get(FEED, params).status_code == 400, params
+    print("  PASS: Invalid filters rejected with 400")
+
+    body = client.get(FEED, {'page_size': 2}).json()
+    assert len(body['data']) == 2 and body['pagination']['has_more']
+    print("  PASS: Responses limited to one page")
+    return True
+
+
+def test_city_feed_uses_index():
+    """Test that a city feed seeks its composite index instead of scanning the pending set"""
+    print("\nTesting feed index...")
+    client = _setup()
+    with CaptureQueriesContext(connection) as context:
+        client.get(FEED, {'city': 'Adelaide', 'page_size': 2})
+    feed_query = next(q['sql'] for q in context.captured_queries if 'bookings_booking' in q['sql'])
+
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {feed_query}')
+            plan = ' '.join(str(row[-1]) for row in cursor.fetchall())
+        assert 'city=?' in plan and 'status=?' in plan, plan
+        assert 'TEMP B-TREE' not in plan, plan
+    print("  PASS: (status, provider, city, created_at, id) index seeked, no sort")
+    return True
+
+
+if __name__ == '__main__':
+    print("Testing SafeHome available tasks feed...")
+
+    success = True
+    success &= test_filters()
+    success &= test_city_feed_uses_index()
+
+    if success:
+        print("\n🎉 All available tasks tests passed!")
+    else:
+        print("\n❌ Some tests failed!")
+        sys.exit(1)
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Test script for the binary at-rest ciphertext format
+"""
+import os
+import sys
+import uuid
+import django
+from importlib import import_module
+from pathlib import Path
+from datetime import timedelta
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+# Set FERNET_KEY environment variable
+os.environ['FERNET_KEY'] = 'test-fernet-key-32-characters-long-for-encryption'
+
+# Set up Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'safehome.settings')
+django.setup()
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from core.crypto import enc, enc_bytes, dec_bytes, dec_bytes_many, blob_key_version, BLOB_FORMAT
+from bookings.models import Booking
+
+User = get_user_model()
+
+ADDRESS = '42 Wallaby Way, Sydney NSW 2000'
+
+
+def test_binary_roundtrip_and_size():
+    """Test that the binary format round-trips and is compact"""
+    print("Testing binary ciphertext format...")
+
+    blob = enc_bytes(ADDRESS)
+    assert blob[0] == BLOB_FORMAT and blob_key_version(blob) == 1
+    assert dec_bytes(blob) == ADDRESS
+    assert dec_bytes(memoryview(blob)) == ADDRESS
+
+    legacy = enc(ADDRESS).encode('utf-8')
+    overhead = len(blob) - len(ADDRESS.encode('utf-8'))
+    assert overhead == 30, f"Expected 30 bytes of overhead, got {overhead}"
+    print(f"  PASS: {len(ADDRESS)} chars -> {len(blob)} bytes (legacy text format: {len(legacy)} bytes)")
+
+    tampered = bytearray(blob)
+    tampered[1] = 2
+    try:
+        dec_bytes(bytes(tampered))
+        assert False, "Tampered header should not decrypt"
+    except ValueError:
+        print("  PASS: Tampered header is rejected")
+
+    return True
+
+
+def test_legacy_values_still_decrypt():
+    """Test that rows written in the old text format stay readable"""
+    print("\nTesting legacy text values...")
+
+    legacy = enc(ADDRESS).encode('utf-8')
+    assert blob_key_version(legacy) is None
+    assert dec_bytes(legacy) == ADDRESS
+    assert dec_bytes_many([legacy, enc_bytes('0400 000 000'), b'']) == [ADDRESS, '0400 000 000', '']
+    print("  PASS: Legacy and binary values decrypt side by side")
+    return True
+
+
+def test_migration_converts_rows():
+    """Test that the data migration rewrites legacy rows"""
+    print("\nTesting conversion migration...")
+
+    migration = import_module('bookings.migrations.0007_convert_encrypted_fields_to_binary')
+
+    suffix = uuid.uuid4().hex[:8]
+    user = User.objects.create_user(
+        email=f'binary-{suffix}@example.com',
+        username=f'binary-{suffix}',
+        password='testpass123',
+    )
+    booking = Booking.objects.create(
+        user=user,
+        city='Sydney',
+        start_time=timezone.now() + timedelta(days=1),
+        address_enc=enc(ADDRESS).encode('utf-8'),
+        phone_enc=enc('0400 123 456').encode('utf-8'),
+    )
+
+    try:
+        migration.text_to_binary(apps, None)
+        booking.refresh_from_db()
+        assert blob_key_version(booking.address_enc) == 1
+        assert blob_key_version(booking.phone_enc) == 1
+        assert booking.get_address() == ADDRESS
+        assert booking.get_phone() == '0400 123 456'
+        print("  PASS: Legacy rows converted to the binary format")
+
+        migration.binary_to_text(apps, None)
+        booking.refresh_from_db()
+        assert blob_key_version(booking.address_enc) is None
+        assert booking.get_address() == ADDRESS
+        print("  PASS: Reverse migration restores the text format")
+    finally:
+        booking.delete()
+        user.delete()
+
+    return True
+
+
+if __name__ == '__main__':
+    print("Testing SafeHome binary ciphertexts...")
+
+    success = True
+    success &= test_binary_roundtrip_and_size()
+    success &= test_legacy_values_still_decrypt()
+    success &= test_migration_converts_rows()
+
+    if success:
+        print("\n🎉 All binary ciphertext tests passed!")
+    else:
+        print("\n❌ Some tests failed!")
+        sys.exit(1)
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Test script for blind-index lookups on encrypted booking fields
+"""
+import os
+import sys
+import uuid
+import django
+from io import StringIO
+from pathlib import Path
+from datetime import timedelta
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+# Set FERNET_KEY environment variable
+os.environ['FERNET_KEY'] = 'test-fernet-key-32-characters-long-for-encryption'
+
+# Set up Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'safehome.settings')
+django.setup()
+
+from django.core.management import call_command
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from core.crypto import blind_index
+from bookings.models import Booking
+from bookings.management.commands import backfill_booking_blind_index as backfill
+
+User = get_user_model()
+
+
+def _create_user():
+    suffix = uuid.uuid4().hex[:8]
+    return User.objects.create_user(
+        email=f'bidx-{suffix}@example.com',
+        username=f'bidx-{suffix}',
+        password='testpass123',
+    )
+
+
+def _create_booking(user, address, phone):
+    booking = Booking(user=user, city='Adelaide', start_time=timezone.now() + timedelta(days=1))
+    booking.set_address(address)
+    booking.set_phone(phone)
+    booking.save()
+    return booking
+
+
+def test_blind_index_properties():
+    """Test that blind indexes are deterministic and keyed"""
+    print("Testing blind_index...")
+
+    assert blind_index('0400000123') == blind_index('0400000123')
+    assert blind_index('0400000123') != blind_index('0400000124')
+    assert len(blind_index('0400000123')) == 64
+    assert blind_index('') == ''
+
+    print("  PASS: Indexes are deterministic, distinct and fixed-length")
+
+    default_index = blind_index('0400000123')
+    os.environ['BLIND_INDEX_KEY'] = 'a-separate-blind-index-key'
+    try:
+        assert blind_index('0400000123') != default_index
+    finally:
+        os.environ.pop('BLIND_INDEX_KEY')
+    assert blind_index('0400000123') == default_index
+    print("  PASS: BLIND_INDEX_KEY selects a different index key")
+    return True
+
+
+def test_queryset_lookups():
+    """Test equality lookups on normalized phone and address"""
+    print("\nTesting Booking.objects.with_phone / with_address...")
+
+    user = _create_user()
+    try:
+        first = _create_booking(user, '42 Wallaby Way, Sydney', '+61 400 000 123')
+        second = _create_booking(user, '1 Rundle Mall, Adelaide', '+61 400 000 999')
+
+        matches = list(Booking.objects.with_phone('+61 (400) 000-123').filter(user=user))
+        assert matches == [first], f"Unexpected matches: {matches}"
+        print("  PASS: Phone lookup ignores formatting")
+
+        matches = list(Booking.objects.with_address('1 RUNDLE MALL  adelaide.').filter(user=user))
+        assert matches == [second], f"Unexpected matches: {matches}"
+        print("  PASS: Address lookup ignores case and punctuation")
+
+        assert not Booking.objects.with_phone('0400 000 123').filter(user=user).exists()
+        print("  PASS: Different numbers do not match")
+    finally:
+        Booking.objects.filter(user=user).delete()
+        user.delete()
+
+    return True
+
+
+def test_backfill_command():
+    """Test that the backfill command fills in missing indexes"""
+    print("\nTesting backfill_booking_blind_index command...")
+
+    user = _create_user()
+    try:
+        booking = _create_booking(user, '7 Hindley St, Adelaide', '0411 222 333')
+        Booking.objects.filter(pk=booking.pk).update(address_bidx='', phone_bidx='')
+
+        out = StringIO()
+        call_command('backfill_booking_blind_index', batch_size=1, missing_only=True, stdout=out)
+        assert 'Done:' in out.getvalue()
+
+        assert Booking.objects.with_phone('0411222333').filter(pk=booking.pk).exists()
+        assert Booking.objects.with_address('7 hindley st adelaide').filter(pk=booking.pk).exists()
+        print("  PASS: Missing indexes backfilled")
+
+        # The phone changes after the command has read the row
+        Booking.objects.filter(pk=booking.pk).update(address_bidx='', phone_bidx='')
+        original = backfill.dec_bytes_many
+
+        def decrypt_then_change(blobs):
+            plaintexts = original(blobs)
+            changed = Booking.objects.with_pii().get(pk=booking.pk)
+            changed.set_phone('0499 888 777')
+            changed.save()
+            return plaintexts
+
+        backfill.dec_bytes_many = decrypt_then_change
+        try:
+            out = StringIO()
+            call_command('backfill_booking_blind_index', missing_only=True, stdout=out)
+        finally:
+            backfill.dec_bytes_many = original
+        assert 'updated 0, skipped 1' in out.getvalue(), out.getvalue()
+        assert Booking.objects.with_phone('0499888777').filter(pk=booking.pk).exists()
+        print("  PASS: Rows changed during the backfill keep their new index")
+    finally:
+        Booking.objects.filter(user=user).delete()
+        user.delete()
+
+    return True
+
+
+if __name__ == '__main__':
+    print("Testing SafeHome blind indexes...")
+
+    success = True
+    success &= test_blind_index_properties()
+    success &= test_queryset_lookups()
+    success &= test_backfill_command()
+
+    if success:
+        print("\n🎉 All blind index tests passed!")
+    else:
+        print("\n❌ Some tests failed!")
+        sys.exit(1)
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Test script for deferring heavy Booking columns by default
+"""
+import os
+import sys
+import uuid
+import django
+from pathlib import Path
+from datetime import timedelta
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+# Set FERNET_KEY environment variable
+os.environ['FERNET_KEY'] = 'test-fernet-key-32-characters-long-for-encryption'
+
+# Set up Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'safehome.settings')
+django.setup()
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from bookings.models import Booking, DEFERRED_FIELDS
+from bookings.serializers import BookingDetailSerializer
+
+User = get_user_model()
+
+
+def _create_bookings(count):
+    """Create a user with `count` saved bookings"""
+    suffix = uuid.uuid4().hex[:8]
+    user = User.objects.create_user(
+        email=f'defer-{suffix}@example.com',
+        username=f'defer-{suffix}',
+        password='testpass123',
+    )
+    for i in range(count):
+        booking = Booking(
+            user=user,
+            city='Adelaide',
+            start_time=timezone.now() + timedelta(days=1),
+            notes=f'Gate code {i}',
+        )
+        booking.set_address(f'{i} North Terrace, Adelaide')
+        booking.set_phone(f'0400 000 {i:03d}')
+        booking.save()
+    return user
+
+
+def _column_names(sql):
+    return {name for name in DEFERRED_FIELDS if f'"{name}"' in sql or f'`{name}`' in sql}
+
+
+def test_default_manager_defers():
+    """Test that the default manager leaves heavy columns out of SELECT and UPDATE"""
+    print("Testing default deferral...")
+
+    user = _create_bookings(1)
+    try:
+        with CaptureQueriesContext(connection) as ctx:
+            booking = Booking.objects.get(user=user)
+            booking.status = 'confirmed'
+            booking.save()
+        select_sql, update_sql = ctx.captured_queries[0]['sql'], ctx.captured_queries[-1]['sql']
+        assert not _column_names(select_sql), select_sql
+        print("  PASS: SELECT skips address_enc, phone_enc and notes")
+        assert update_sql.startswith('UPDATE') and not _column_names(update_sql), update_sql
+        print("  PASS: Status UPDATE does not rewrite the blobs")
+
+        with CaptureQueriesContext(connection) as ctx:
+            booking = Booking.objects.with_pii().get(user=user)
+            assert booking.address == '0 North Terrace, Adelaide'
+            assert booking.notes == 'Gate code 0'
+        assert len(ctx.captured_queries) == 1
+        print("  PASS: with_pii() loads everything in one query")
+    finally:
+        user.delete()
+
+    return True
+
+
+def test_serializer_loads_deferred_in_one_query():
+    """Test that serializers fetch all deferred columns with a single query"""
+    print("\nTesting serializer loading of deferred columns...")
+
+    user = _create_bookings(5)
+    try:
+        booking = Booking.objects.select_related('user', 'provider').filter(user=user).first()
+        with CaptureQueriesContext(connection) as ctx:
+            data = BookingDetailSerializer(booking).data
+        heavy = [q for q in ctx.captured_queries if _column_names(q['sql'])]
+        assert len(heavy) == 1, f"Expected 1 query for deferred columns, got {len(heavy)}"
+        assert data['notes'].startswith('Gate code') and data['phone'].startswith('0400')
+        print("  PASS: Detail serializer loads deferred columns once")
+
+        bookings = list(Booking.objects.select_related('user', 'provider').filter(user=user))
+        with CaptureQueriesContext(connection) as ctx:
+            data = BookingDetailSerializer(bookings, many=True).data
+        heavy = [q for q in ctx.captured_queries if _column_names(q['sql'])]
+        assert len(heavy) == 1, f"Expected 1 query for deferred columns, got {len(heavy)}"
+        assert sorted(row['address'] for row in data) == sorted(
+            f'{i} North Terrace, Adelaide' for i in range(5))
+        print("  PASS: List serializer loads deferred columns for the page once")
+    finally:
+        user.delete()
+
+    return True
+
+
+if __name__ == '__main__':
+    print("Testing SafeHome booking column deferral...")
+
+    success = True
+    success &= test_default_manager_defers()
+    success &= test_serializer_loads_deferred_in_one_query()
+
+    if success:
+        print("\n🎉 All deferral tests passed!")
+    else:
+        print("\n❌ Some tests failed!")
+        sys.exit(1)
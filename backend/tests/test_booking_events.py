@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Test script for the booking Server-Sent Events stream
+"""
+import os
+import sys
+import django
+from pathlib import Path
+from datetime import timedelta
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+# Set FERNET_KEY environment variable
+os.environ['FERNET_KEY'] = 'test-fernet-key-32-characters-long-for-encryption'
+
+# Set up Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'safehome.settings')
+django.setup()
+
+import json
+import time
+import uuid
+from django.test import Client, override_settings
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+from accounts.models import User
+from bookings.models import Booking
+from core import events
+from core.testing import assert_max_queries
+
+STREAM = '/api/bookings/events/'
+# Short streams so reading streaming_content ends quickly
+SHORT_STREAM = dict(EVENTS_STREAM_MAX_SECONDS=0.3, EVENTS_HEARTBEAT_SECONDS=0.1)
+
+
+def _user(email, role):
+    user = User.objects.filter(email=email).first()
+    if user is None:
+        user = User.objects.create_user(username=email.split('@')[0], email=email,
+                                        password='testpass123', role=role)
+    return user
+
+
+def _client(user):
+    client = Client()
+    client.cookies['access_token'] = str(RefreshToken.for_user(user).access_token)
+    return client
+
+
+def _booking(customer, **extra):
+    booking = Booking(
+        user=customer, service_type='cleaning', budget=100, city='Adelaide', state='SA',
+        country='AU', start_time=timezone.now() + timedelta(days=1), duration_hours=2, **extra,
+    )
+    booking.set_address('1 Event Street')
+    booking.set_phone('+61400000000')
+    booking.save()
+    return booking
+
+
+def _read(client, last_event_id=None):
+    """Open the stream and parse what it sends before it ends"""
+    headers = {'HTTP_ACCEPT': 'text/event-stream'}
+    if last_event_id is not None:
+        headers['HTTP_LAST_EVENT_ID'] = str(last_event_id)
+    with override_settings(**SHORT_STREAM):
+        response = client.get(STREAM, **headers)
+        assert response.status_code == 200, response.content
+        assert response['Content-Type'] == 'text/event-stream'
+        body = b''.join(response.streaming_content).decode()
+    received = []
+    for block in body.split('\n\n'):
+        fields = dict(line.split(': ', 1) for line in block.splitlines() if not line.startswith(':'))
+        if 'event' in fields:
+            received.append((int(fields['id']), fields['event'], json.loads(fields['data'])))
+    return body, received
+
+
+def test_broker():
+    """Test waiting, timeouts and resynchronization in the broker"""
+    print("Testing event broker...")
+    broker = events.EventBroker(buffer_size=3)
+    started = time.monotonic()
+    assert broker.wait(0, 0.05) == []
+    assert time.monotonic() - started >= 0.05
+    print("  PASS: Waiting with nothing new times out empty")
+
+    for n in range(5):
+        broker.append('tick', {'n': n}, ['user:1'])
+    assert [event.id for event in broker.wait(3, 0)] == [4, 5]
+    assert [event.id for event in broker.wait(2, 0)] == [3, 4, 5]
+    assert broker.wait(1, 0) is None, 'events 2.. are no longer buffered'
+    assert broker.wait(9, 0) is None, 'unknown id'
+    print("  PASS: Buffered events returned, gaps and unknown ids reported")
+
+    broker.skip_to(100)
+    assert broker.wait(5, 0) is None, 'events 6..100 were never buffered here'
+    assert broker.wait(100, 0) == []
+    empty = events.EventBroker(buffer_size=3)
+    empty.skip_to(100)
+    assert empty.wait(50, 0) is None, 'nothing buffered after 50'
+    assert empty.wait(100, 0) == []
+    print("  PASS: Ids skipped over without buffering are reported as gaps")
+
+    event = events.Event(6, 'tick', {'n': 5}, ['user:1'])
+    assert event.to_sse() == 'id: 6\nevent: tick\ndata: {"n": 5}\n\n'
+    print("  PASS: text/event-stream formatting")
+    return True
+
+
+def test_stream_audience():
+    """Test that users only receive the events addressed to them"""
+    print("\nTesting stream audience...")
+    customer = _user('events-customer@test.com', 'customer')
+    other = _user('events-other@test.com', 'customer')
+    provider = _user('events-provider@test.com', 'provider')
+
+    assert Client().get(STREAM, HTTP_ACCEPT='text/event-stream').status_code == 401
+    print("  PASS: Anonymous clients rejected")
+
+    start = events.broker.last_id
+    booking = _booking(customer)
+    booking.provider = provider
+    booking.status = 'confirmed'
+    booking.save()
+    booking.save()  # Nothing changed: no event
+    _booking(other, status='cancelled')  # Never an open task
+
+    body, received = _read(_client(provider), start)
+    assert body.startswith('retry: ')
+    assert [(kind, data['id']) for _, kind, data in received] == [
+        ('task.created', str(booking.pk)), ('task.removed', str(booking.pk)),
+        ('booking.status_changed', str(booking.pk))], received
+    assert 'phone' not in received[0][2] and 'address' not in received[0][2]
+    print("  PASS: Provider sees new and taken tasks and its own booking")
+
+    _, received = _read(_client(customer), start)
+    assert [kind for _, kind, _ in received] == ['booking.status_changed'], received
+    assert received[0][2]['status'] == 'confirmed' and received[0][2]['previous_status'] == 'pending'
+    _, received = _read(_client(other), start)
+    assert received == [], received
+    print("  PASS: Customers only see changes to their own bookings")
+    return True
+
+
+def test_partial_loads():
+    """Test that loading bookings with deferred fields runs no extra queries"""
+    print("\nTesting deferred loads...")
+    customer = _user('events-customer@test.com', 'customer')
+    for _ in range(3):
+        _booking(customer)
+    with assert_max_queries(1):
+        bookings = list(Booking.objects.filter(user=customer).only('id', 'status'))
+    assert len(bookings) >= 3 and all(booking._loaded_state is None for booking in bookings)
+    print("  PASS: .only('id', 'status') loads in one query without change tracking")
+
+    start = events.broker.last_id
+    booking = bookings[0]
+    booking.status = 'cancelled'
+    booking.save(update_fields=['status'])
+    _, received = _read(_client(customer), start)
+    assert [(kind, data['status']) for _, kind, data in received] == [('booking.status_changed', 'cancelled')]
+    print("  PASS: Saving a partially loaded booking still publishes its change")
+    return True
+
+
+def test_resume_and_heartbeat():
+    """Test Last-Event-ID resume, resets and heartbeats"""
+    print("\nTesting resume...")
+    customer = _user('events-customer@test.com', 'customer')
+    client = _client(customer)
+    start = events.broker.last_id
+    for status in ('confirmed', 'in_progress'):
+        booking = _booking(customer)
+        booking.status = status
+        booking.save()
+
+    _, received = _read(client, start)
+    assert [data['status'] for _, _, data in received] == ['confirmed', 'in_progress']
+    _, resumed = _read(client, received[0][0])
+    assert [data['status'] for _, _, data in resumed] == ['in_progress']
+    print("  PASS: Last-Event-ID resumes after the given event")
+
+    _, received = _read(client, events.broker.last_id + 100)
+    assert [kind for _, kind, _ in received] == ['reset'], received
+    assert received[0][0] == events.broker.last_id
+    print("  PASS: Unknown Last-Event-ID answered with a reset")
+
+    body, received = _read(client)
+    assert received == [] and ': heartbeat' in body
+    print("  PASS: Idle streams send heartbeats")
+    return True
+
+
+def test_cache_backend():
+    """Test that events published through the cache reach a polling broker"""
+    print("\nTesting cache backend...")
+    broker = events.EventBroker()
+    backend = events.CacheBackend(broker)
+    with override_settings(EVENTS_POLL_INTERVAL=0.02):
+        backend.start()
+        published = [backend.publish('tick', {'token': uuid.uuid4().hex}, ['user:1']) for _ in range(3)]
+        received = []
+        deadline = time.monotonic() + 2
+        while len(received) < 3 and time.monotonic() < deadline:
+            received = broker.wait(published[0].id - 1, 0.1) or []
+    assert [(event.id, event.data) for event in received] == [(event.id, event.data) for event in published]
+    print("  PASS: Events relayed through the shared log with the same ids")
+    return True
+
+
+if __name__ == '__main__':
+    print("Testing SafeHome booking events...")
+
+    success = True
+    success &= test_broker()
+    success &= test_stream_audience()
+    success &= test_partial_loads()
+    success &= test_resume_and_heartbeat()
+    success &= test_cache_backend()
+
+    if success:
+        print("\n🎉 All booking event tests passed!")
+    else:
+        print("\n❌ Some tests failed!")
+        sys.exit(1)
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Test script for batched decryption of booking list responses
+"""
+import os
+import sys
+import django
+from pathlib import Path
+from datetime import timedelta
+from unittest.mock import patch
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+# Set FERNET_KEY environment variable
+os.environ['FERNET_KEY'] = 'test-fernet-key-32-characters-long-for-encryption'
+
+# Set up Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'safehome.settings')
+django.setup()
+
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+from core.crypto import enc, enc_bytes, dec_many, dec_bytes_many
+from bookings.models import Booking
+from bookings.serializers import BookingDetailSerializer
+
+User = get_user_model()
+
+
+def _make_bookings(count):
+    """Build unsaved bookings holding only ciphertext, as if loaded from the DB"""
+    user = User(email='list-decrypt@example.com', username='list-decrypt', role='customer')
+    bookings = []
+    for i in range(count):
+        booking = Booking(
+            user=user,
+            service_type='cleaning',
+            city='Adelaide',
+            start_time=timezone.now() + timedelta(days=1),
+        )
+        booking.address_enc = enc_bytes(f'{i} Rundle Mall, Adelaide SA 5000')
+        booking.phone_enc = enc_bytes(f'+61 400 000 {i:03d}')
+        bookings.append(booking)
+    return bookings
+
+
+def test_dec_many_roundtrip():
+    """Test that dec_many keeps order and handles empty values"""
+    print("Testing dec_many...")
+
+    values = [f"value {i}" for i in range(25)]
+    tokens = [enc(value) for value in values] + [None, ""]
+
+    assert dec_many(tokens) == values + ["", ""]
+    print("  PASS: Sequential batch decrypted in order")
+
+    assert dec_many(tokens, workers=4) == values + ["", ""]
+    print("  PASS: Thread-pool batch decrypted in order")
+
+    try:
+        dec_many([tokens[0], "not-a-token"])
+        assert False, "Invalid token should raise ValueError"
+    except ValueError:
+        print("  PASS: Invalid token raises ValueError")
+
+    return True
+
+
+def test_list_serializer_decrypts_in_one_pass():
+    """Test that many=True serialization decrypts the whole page at once"""
+    print("\nTesting BookingDetailSerializer(many=True)...")
+
+    bookings = _make_bookings(10)
+
+    with patch('core.fields.dec_bytes', side_effect=AssertionError('per-row dec called')), \
+            patch('core.fields.dec_bytes_many', wraps=dec_bytes_many) as bulk:
+        data = BookingDetailSerializer(bookings, many=True).data
+
+    assert bulk.call_count == 1, f"Expected one bulk call, got {bulk.call_count}"
+    assert len(bulk.call_args[0][0]) == 20
+    for i, row in enumerate(data):
+        assert row['address'] == f'{i} Rundle Mall, Adelaide SA 5000'
+        assert row['phone'] == f'+61 400 000 {i:03d}'
+    print("  PASS: 10 bookings decrypted with a single dec_bytes_many call")
+
+    # Single-object serialization still decrypts on its own
+    single = BookingDetailSerializer(bookings[3]).data
+    assert single['address'] == '3 Rundle Mall, Adelaide SA 5000'
+    print("  PASS: Single booking serialization unchanged")
+    return True
+
+
+if __name__ == '__main__':
+    print("Testing batched booking decryption...")
+
+    success = True
+    success &= test_dec_many_roundtrip()
+    success &= test_list_serializer_decrypts_in_one_pass()
+
+    if success:
+        print("\n🎉 All batched decryption tests passed!")
+    else:
+        print("\n❌ Some tests failed!")
+        sys.exit(1)
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Test script for keyset pagination of the booking lists
+"""
+import os
+import sys
+import json
+import base64
+import django
+from pathlib import Path
+from datetime import timedelta
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+# Set FERNET_KEY environment variable
+os.environ['FERNET_KEY'] = 'test-fernet-key-32-characters-long-for-encryption'
+
+# Set up Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'safehome.settings')
+django.setup()
+
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+from accounts.models import User
+from bookings.models import Booking
+from core.pagination import encode_cursor
+
+BOOKINGS = 45
+
+
+def _user(email, role):
+    user = User.objects.filter(email=email).first()
+    if user is None:
+        user = User.objects.create_user(username=email.split('@')[0], email=email,
+                                        password='testpass123', role=role)
+    return user
+
+
+def _client(user):
+    client = Client()
+    client.cookies['access_token'] = str(RefreshToken.for_user(user).access_token)
+    return client
+
+
+def _setup():
+    customer = _user('pages-customer@test.com', 'customer')
+    Booking.objects.filter(user=customer).delete()
+    for i in range(BOOKINGS):
+        booking = Booking(
+            user=customer, service_type='cleaning',
+            start_time=timezone.now() + timedelta(days=i + 1), duration_hours=2,
+            city='Page City', status='pending', budget=100,
+        )
+        booking.set_address(f'{i} Page Street')
+        booking.set_phone(f'+614000000{i:02d}')
+        booking.save()
+    # Rows sharing a timestamp must still be paged exactly once
+    tied = Booking.objects.filter(user=customer).order_by('created_at')[10:20]
+    Booking.objects.filter(pk__in=[b.pk for b in tied]).update(created_at=timezone.now() - timedelta(hours=1))
+    return customer
+
+
+def _walk(client, path, page_size):
+    """Follow next_cursor to the end; returns (ids, number of pages)"""
+    ids, pages, params = [], 0, {'page_size': page_size}
+    while True:
+        body = client.get(path, params).json()
+        assert body['success'], body
+        ids.extend(row['id'] for row in body['data'])
+        pages += 1
+        pagination = body['pagination']
+        if not pagination['has_more']:
+            assert pagination['next_cursor'] is None
+            return ids, pages
+        params = {'page_size': page_size, 'cursor': pagination['next_cursor']}
+
+
+def test_pages_cover_every_booking_once():
+    """Test that following cursors returns every row once, newest first"""
+    print("Testing cursor walk...")
+    customer = _setup()
+    client = _client(customer)
+    ids, pages = _walk(client, '/api/bookings/my-bookings/', 10)
+    expected = [str(pk) for pk in Booking.objects.filter(user=customer)
+                .order_by('-created_at', '-id').values_list('id', flat=True)]
+    assert ids == expected, 'pages out of order or overlapping'
+    assert pages == 5
+    print(f"  PASS: {BOOKINGS} bookings in {pages} pages, ties on created_at included once")
+    return True
+
+
+def test_page_size_limits():
+    """Test default and maximum page sizes and invalid input"""
+    print("\nTesting page sizes...")
+    client = _client(_user('pages-customer@test.com', 'customer'))
+    with override_settings(API_PAGE_SIZE=7, API_MAX_PAGE_SIZE=12):
+        body = client.get('/api/bookings/my-bookings/').json()
+        assert len(body['data']) == 7 and body['pagination']['page_size'] == 7
+        body = client.get('/api/bookings/my-bookings/', {'page_size': 1000}).json()
+        assert len(body['data']) == 12
+    print("  PASS: Default applied, requests capped at the maximum")
+
+    for params in ({'cursor': 'not-a-cursor'}, {'cursor': encode_cursor(timezone.now(), 'x')},
+                   {'page_size': 'ten'}):
+        assert client.get('/api/bookings/my-bookings/', params).status_code == 400, params
+    print("  PASS: Malformed cursors and page sizes rejected with 400")
+
+    for pk in (None, {'id': 1}, [1], 12345):
+        payload = json.dumps(['2024-01-01T00:00:00+00:00', pk]).encode()
+        tampered = base64.urlsafe_b64encode(payload).decode().rstrip('=')
+        response = client.get('/api/bookings/my-bookings/', {'cursor': tampered})
+        assert response.status_code == 400 and b'cursor' in response.content, (pk, response.content)
+    print("  PASS: Tampered cursor pks rejected with 400")
+    return True
+
+
+def test_deep_pages_seek():
+    """Test that a deep page is one bounded, index-backed query without OFFSET"""
+    print("\nTesting deep pages...")
+    customer = _user('pages-customer@test.com', 'customer')
+    client = _client(customer)
+    last = Booking.objects.filter(user=customer).order_by('-created_at', '-id')[39]
+    with CaptureQueriesContext(connection) as context:
+        body = client.get('/api/bookings/my-bookings/',
+                          {'page_size': 10, 'cursor': encode_cursor(last.created_at, last.pk)}).json()
+    assert len(body['data']) == BOOKINGS - 40
+    page_query = next(q['sql'] for q in context.captured_queries if 'bookings_booking' in q['sql'])
+    assert 'OFFSET' not in page_query.upper() and 'LIMIT 11' in page_query.upper(), page_query
+
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {page_query}')
+            plan = ' '.join(str(row[-1]) for row in cursor.fetchall())
+        assert 'USING INDEX bookings_bo_user_id' in plan, plan
+        assert 'TEMP B-TREE' not in plan, plan
+    print("  PASS: Cursor pages seek the (user, created_at, id) index, no OFFSET or sort")
+    return True
+
+
+if __name__ == '__main__':
+    print("Testing SafeHome booking pagination...")
+
+    success = True
+    success &= test_pages_cover_every_booking_once()
+    success &= test_page_size_limits()
+    success &= test_deep_pages_seek()
+
+    if success:
+        print("\n🎉 All pagination tests passed!")
+    else:
+        print("\n❌ Some tests failed!")
+        sys.exit(1)
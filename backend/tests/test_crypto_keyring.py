@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Test script for the derived-key cache in core.crypto
+"""
+import os
+import sys
+import threading
+from pathlib import Path
+from unittest.mock import patch
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+# Set FERNET_KEY environment variable
+os.environ['FERNET_KEY'] = 'test-fernet-key-32-characters-long-for-encryption'
+
+from core import crypto
+from core.crypto import enc, dec, keyring
+
+
+def _counting_derive():
+    """Wrap _derive_raw_key and count how often PBKDF2 actually runs"""
+    calls = []
+    original = crypto._derive_raw_key
+
+    def derive(key_string, *args):
+        calls.append(key_string)
+        return original(key_string, *args)
+
+    return calls, derive
+
+
+def test_key_derived_once():
+    """Test that repeated enc/dec calls reuse the derived key"""
+    print("Testing that the key is derived once per process...")
+
+    keyring.invalidate()
+    calls, derive = _counting_derive()
+
+    with patch.object(crypto, '_derive_raw_key', side_effect=derive):
+        for i in range(20):
+            assert dec(enc(f"value {i}")) == f"value {i}"
+
+    assert len(calls) == 1, f"Expected 1 derivation, got {len(calls)}"
+    print("  PASS: 40 calls triggered a single PBKDF2 derivation")
+    return True
+
+
+def test_key_change_invalidates_cache():
+    """Test that changing FERNET_KEY derives a new key"""
+    print("\nTesting cache invalidation on FERNET_KEY change...")
+
+    original_key = os.environ['FERNET_KEY']
+    token = enc("secret")
+
+    try:
+        os.environ['FERNET_KEY'] = 'another-fernet-key-for-cache-invalidation'
+        try:
+            dec(token)
+            assert False, "Token encrypted with the old key should not decrypt"
+        except ValueError:
+            print("  PASS: New FERNET_KEY is picked up without restarting")
+    finally:
+        os.environ['FERNET_KEY'] = original_key
+
+    assert dec(token) == "secret"
+    print("  PASS: Restoring FERNET_KEY restores decryption")
+    return True
+
+
+def test_concurrent_first_use():
+    """Test that concurrent first calls derive the key only once"""
+    print("\nTesting concurrent first use...")
+
+    keyring.invalidate()
+    calls, derive = _counting_derive()
+    barrier = threading.Barrier(8)
+    errors = []
+
+    def worker():
+        barrier.wait()
+        try:
+            assert dec(enc("concurrent")) == "concurrent"
+        except Exception as e:  # pragma: no cover - reported below
+            errors.append(e)
+
+    with patch.object(crypto, '_derive_raw_key', side_effect=derive):
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert not errors, f"Worker errors: {errors}"
+    assert len(calls) == 1, f"Expected 1 derivation, got {len(calls)}"
+    print("  PASS: 8 concurrent callers shared one derivation")
+    return True
+
+
+if __name__ == '__main__':
+    print("Testing SafeHome derived-key cache...")
+
+    success = True
+    success &= test_key_derived_once()
+    success &= test_key_change_invalidates_cache()
+    success &= test_concurrent_first_use()
+
+    if success:
+        print("\n🎉 All keyring tests passed!")
+    else:
+        print("\n❌ Some tests failed!")
+        sys.exit(1)
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Test script for lazy, memoized decryption of Booking fields
+"""
+import os
+import sys
+import uuid
+import django
+from pathlib import Path
+from datetime import timedelta
+from unittest.mock import patch
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+# Set FERNET_KEY environment variable
+os.environ['FERNET_KEY'] = 'test-fernet-key-32-characters-long-for-encryption'
+
+# Set up Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'safehome.settings')
+django.setup()
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from core import fields
+from core.crypto import enc_bytes
+from bookings.models import Booking
+
+User = get_user_model()
+
+
+def _new_booking(user=None):
+    booking = Booking(
+        user=user or User(email='lazy@example.com', username='lazy'),
+        city='Adelaide',
+        start_time=timezone.now() + timedelta(days=1),
+    )
+    booking.set_address('12 Grenfell St, Adelaide')
+    booking.set_phone('0400 111 222')
+    return booking
+
+
+def test_reads_are_memoized():
+    """Test that repeated reads decrypt only once"""
+    print("Testing memoized reads...")
+
+    booking = _new_booking()
+    # Simulate a freshly loaded row: raw column set, nothing memoized
+    booking.address_enc = enc_bytes('12 Grenfell St, Adelaide')
+
+    with patch.object(fields, 'dec_bytes', wraps=fields.dec_bytes) as dec_bytes:
+        for _ in range(5):
+            assert booking.address == '12 Grenfell St, Adelaide'
+            assert booking.get_address() == '12 Grenfell St, Adelaide'
+    assert dec_bytes.call_count == 1, f"Expected 1 decryption, got {dec_bytes.call_count}"
+    print("  PASS: 10 reads, 1 decryption")
+    return True
+
+
+def test_cache_invalidation():
+    """Test that setting the plaintext or the raw column refreshes the memo"""
+    print("\nTesting cache invalidation...")
+
+    booking = _new_booking()
+    assert booking.phone == '0400 111 222'
+
+    with patch.object(fields, 'dec_bytes', side_effect=AssertionError('should not decrypt')):
+        booking.phone = '0400 333 444'
+        assert booking.phone == '0400 333 444'
+    print("  PASS: Assigning the plaintext needs no decryption")
+
+    booking.phone_enc = enc_bytes('0499 999 999')
+    assert booking.phone == '0499 999 999'
+    print("  PASS: Replacing the raw column invalidates the memo")
+    return True
+
+
+def test_unread_fields_cost_nothing():
+    """Test that status transitions on a loaded booking do no crypto work"""
+    print("\nTesting that unread fields are never decrypted...")
+
+    suffix = uuid.uuid4().hex[:8]
+    user = User.objects.create_user(
+        email=f'lazy-{suffix}@example.com',
+        username=f'lazy-{suffix}',
+        password='testpass123',
+    )
+    booking = _new_booking(user)
+    booking.save()
+
+    try:
+        with patch.object(fields, 'dec_bytes', side_effect=AssertionError('decrypted')), \
+                patch.object(fields, 'enc_bytes', side_effect=AssertionError('encrypted')):
+            loaded = Booking.objects.get(pk=booking.pk)
+            loaded.status = 'confirmed'
+            loaded.save()
+        print("  PASS: Loading and saving a booking did no crypto work")
+
+        loaded.refresh_from_db()
+        assert loaded.address == '12 Grenfell St, Adelaide'
+        print("  PASS: Field still decrypts on first read")
+    finally:
+        booking.delete()
+        user.delete()
+
+    return True
+
+
+def test_constructor_keywords():
+    """Test that address and phone can be passed to the model constructor"""
+    print("\nTesting constructor keywords...")
+
+    suffix = uuid.uuid4().hex[:8]
+    user = User.objects.create_user(
+        email=f'lazy-{suffix}@example.com',
+        username=f'lazy-{suffix}',
+        password='testpass123',
+    )
+    try:
+        booking = Booking(user=user, city='Adelaide', start_time=timezone.now() + timedelta(days=1),
+                          address='1 Main St', phone='+1 555')
+        assert booking.address == '1 Main St' and booking.phone == '+1 555'
+        assert booking.address_bidx and booking.phone_bidx
+        print("  PASS: Booking(address=..., phone=...) encrypts and indexes")
+
+        created = Booking.objects.create(user=user, start_time=timezone.now() + timedelta(days=1),
+                                         address='2 Main St', phone='+1 556')
+        loaded = Booking.objects.with_phone('+1 556').get(pk=created.pk)
+        assert loaded.address == '2 Main St'
+        print("  PASS: Booking.objects.create(address=..., phone=...) round-trips")
+    finally:
+        Booking.objects.filter(user=user).delete()
+        user.delete()
+
+    return True
+
+
+if __name__ == '__main__':
+    print("Testing SafeHome encrypted attributes...")
+
+    success = True
+    success &= test_reads_are_memoized()
+    success &= test_cache_invalidation()
+    success &= test_unread_fields_cost_nothing()
+    success &= test_constructor_keywords()
+
+    if success:
+        print("\n🎉 All encrypted attribute tests passed!")
+    else:
+        print("\n❌ Some tests failed!")
+        sys.exit(1)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test script for the encrypted response renderer
+"""
+import os
+import sys
+import json
+import django
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+# Set FERNET_KEY environment variable
+os.environ['FERNET_KEY'] = 'test-fernet-key-32-characters-long-for-encryption'
+
+# Set up Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'safehome.settings')
+django.setup()
+
+from rest_framework import permissions
+from rest_framework.decorators import api_view, permission_classes, authentication_classes
+from rest_framework.test import APIRequestFactory
+from core import success_response
+from core.crypto import dec_aes_gcm_bytes
+from core.renderers import EncryptedJSONRenderer
+
+ROWS = [{'id': i, 'city': 'Adelaide', 'status': 'pending'} for i in range(20)]
+
+
+# No renderer_classes: the REST_FRAMEWORK defaults must apply
+@api_view(['GET'])
+@authentication_classes([])
+@permission_classes([permissions.AllowAny])
+def bookings_page(request):
+    return success_response(data=ROWS, message='Bookings retrieved successfully')
+
+
+def test_render_roundtrip():
+    """Test that the renderer output decrypts to the JSON body"""
+    print("Testing EncryptedJSONRenderer.render...")
+
+    renderer = EncryptedJSONRenderer()
+    body = renderer.render({'data': ROWS})
+    assert isinstance(body, bytes)
+    assert json.loads(dec_aes_gcm_bytes(body)) == {'data': ROWS}
+    print("  PASS: Encrypted body decrypts to the rendered JSON")
+
+    assert renderer.render({'data': ROWS}) != body
+    print("  PASS: Each response uses a fresh nonce")
+
+    assert renderer.render(None) == b''
+    print("  PASS: Empty responses stay empty")
+    return True
+
+
+def test_accept_header_selection():
+    """Test that the Accept header selects plain or encrypted output"""
+    print("\nTesting renderer selection by Accept header...")
+
+    factory = APIRequestFactory()
+
+    response = bookings_page(factory.get('/'))
+    response.render()
+    assert response['Content-Type'] == 'application/json'
+    assert json.loads(response.content)['data'] == ROWS
+    print("  PASS: Plain JSON by default")
+
+    response = bookings_page(factory.get('/', HTTP_ACCEPT=EncryptedJSONRenderer.media_type))
+    response.render()
+    assert response['Content-Type'] == EncryptedJSONRenderer.media_type
+    envelope = json.loads(dec_aes_gcm_bytes(response.content))
+    assert envelope['success'] is True and envelope['data'] == ROWS
+    print("  PASS: Encrypted envelope when requested")
+    return True
+
+
+if __name__ == '__main__':
+    print("Testing SafeHome encrypted renderer...")
+
+    success = True
+    success &= test_render_roundtrip()
+    success &= test_accept_header_selection()
+
+    if success:
+        print("\n🎉 All renderer tests passed!")
+    else:
+        print("\n❌ Some tests failed!")
+        sys.exit(1)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Test script for the pluggable JSON codecs
+"""
+import os
+import sys
+import json
+import uuid
+import django
+from pathlib import Path
+from decimal import Decimal
+from datetime import datetime, timezone
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+# Set FERNET_KEY environment variable
+os.environ['FERNET_KEY'] = 'test-fernet-key-32-characters-long-for-encryption'
+
+# Set up Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'safehome.settings')
+django.setup()
+
+from django.utils.translation import gettext_lazy
+from core import codec as codec_module
+from core.codec import StdlibCodec, OrjsonCodec, get_codec
+from core.renderers import CodecJSONRenderer
+
+BOOKING_ID = uuid.UUID('6f1c2f5e-0d4b-4c1e-9a43-1f6f3c1d2e7a')
+ENVELOPE = {
+    'success': True,
+    'message': gettext_lazy('Bookings retrieved successfully'),
+    'status_code': 200,
+    'data': [{
+        'id': BOOKING_ID,
+        'budget': Decimal('180.00'),
+        'provider_quote': None,
+        'start_time': datetime(2026, 11, 2, 9, 30, tzinfo=timezone.utc),
+        'city': 'Adelaide – CBD',
+        'duration_hours': 3,
+    }],
+}
+
+
+def _codecs():
+    codecs = [StdlibCodec()]
+    if codec_module.orjson is not None:
+        codecs.append(OrjsonCodec())
+    else:
+        print("  SKIP: orjson not installed")
+    return codecs
+
+
+def test_model_types():
+    """Test that Decimal, UUID and datetime encode the same in every codec"""
+    print("Testing codec output...")
+
+    for codec in _codecs():
+        body = codec.dumps(ENVELOPE)
+        assert isinstance(body, bytes)
+        row = json.loads(body)['data'][0]
+        assert row['id'] == str(BOOKING_ID)
+        assert row['budget'] == '180.00'
+        assert row['start_time'] == '2026-11-02T09:30:00Z'
+        assert row['city'] == 'Adelaide – CBD'
+        assert codec.loads(body) == json.loads(body)
+        print(f"  PASS: {codec.name} encodes model types")
+
+    outputs = {codec.dumps(ENVELOPE) for codec in _codecs()}
+    assert len(outputs) == 1, outputs
+    print("  PASS: All codecs produce identical bytes")
+
+    for codec in _codecs():
+        try:
+            codec.loads(b'{"budget": NaN}')
+            assert False, "NaN should be rejected"
+        except ValueError:
+            pass
+    print("  PASS: Non-finite numbers are rejected")
+    return True
+
+
+def test_codec_selection():
+    """Test JSON_CODEC selection and the renderer"""
+    print("\nTesting codec selection...")
+
+    assert get_codec('stdlib').name == 'stdlib'
+    expected = 'orjson' if codec_module.orjson is not None else 'stdlib'
+    assert get_codec('auto').name == expected
+    print(f"  PASS: auto selects {expected}")
+
+    try:
+        get_codec('yaml')
+        assert False, "Unknown codec should raise ValueError"
+    except ValueError:
+        print("  PASS: Unknown codec raises ValueError")
+
+    renderer = CodecJSONRenderer()
+    assert renderer.render(ENVELOPE) == get_codec().dumps(ENVELOPE)
+    assert renderer.render(None) == b''
+    print("  PASS: Renderer emits codec output")
+    return True
+
+
+if __name__ == '__main__':
+    print("Testing SafeHome JSON codecs...")
+
+    success = True
+    success &= test_model_types()
+    success &= test_codec_selection()
+
+    if success:
+        print("\n🎉 All codec tests passed!")
+    else:
+        print("\n❌ Some tests failed!")
+        sys.exit(1)
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Test script for the metrics registry and /metrics endpoint
+"""
+import os
+import sys
+import json
+import tempfile
+import django
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+# Set FERNET_KEY environment variable
+os.environ['FERNET_KEY'] = 'test-fernet-key-32-characters-long-for-encryption'
+os.environ['METRICS_DIR'] = tempfile.mkdtemp(prefix='safehome-metrics-test-')
+
+# Set up Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'safehome.settings')
+django.setup()
+
+from django.test import Client, override_settings
+from core.metrics import Registry
+
+
+def _fork_worker(registry, counter, gauge, amount):
+    """Record metrics in a child process that then exits"""
+    pid = os.fork()
+    if pid == 0:
+        registry._after_fork()
+        counter.inc(amount, route='booking-list')
+        gauge.set(7)
+        registry.write_snapshot()
+        os._exit(0)
+    os.waitpid(pid, 0)
+
+
+def test_multi_worker_aggregation():
+    """Test that snapshots from several processes are merged on scrape"""
+    print("Testing aggregation across workers...")
+
+    with tempfile.TemporaryDirectory() as directory:
+        registry = Registry(directory=directory, flush_interval=60)
+        requests = registry.counter('test_requests_total', 'Requests', ['route'])
+        latency = registry.histogram('test_latency_seconds', 'Latency', ['route'], buckets=(0.1, 1.0))
+        in_flight = registry.gauge('test_in_flight', 'In flight')
+
+        requests.inc(route='booking-list')
+        latency.observe(0.05, route='booking-list')
+        latency.observe(0.5, route='booking-list')
+        latency.observe(3.0, route='booking-list')
+        in_flight.set(2)
+
+        _fork_worker(registry, requests, in_flight, amount=5)
+        _fork_worker(registry, requests, in_flight, amount=10)
+        assert len(os.listdir(directory)) == 2
+
+        text = registry.render()
+        assert 'test_requests_total{route="booking-list"} 16' in text, text
+        print("  PASS: Counters summed across live and exited workers")
+
+        assert 'test_in_flight 2' in text, text
+        print("  PASS: Gauges of exited workers dropped")
+
+        assert 'test_latency_seconds_bucket{route="booking-list",le="0.1"} 1' in text
+        assert 'test_latency_seconds_bucket{route="booking-list",le="1.0"} 2' in text
+        assert 'test_latency_seconds_bucket{route="booking-list",le="+Inf"} 3' in text
+        assert 'test_latency_seconds_count{route="booking-list"} 3' in text
+        assert '# TYPE test_latency_seconds histogram' in text
+        print("  PASS: Histogram exposed with cumulative buckets")
+
+        snapshots = [name for name in os.listdir(directory) if name.endswith('.json')]
+        assert sorted(snapshots) == sorted(['dead.json', f'{os.getpid()}-{registry._started}.json']), snapshots
+        assert 'test_requests_total{route="booking-list"} 16' in registry.render()
+        print("  PASS: Exited workers folded into dead.json, totals unchanged")
+
+        # An earlier process that had this pid left a snapshot behind
+        stale = {'pid': os.getpid(), 'started': 1, 'metrics': {
+            'test_requests_total': {**requests.snapshot(), 'samples': [[['booking-list'], 100]]},
+            'test_in_flight': {**in_flight.snapshot(), 'samples': [[[], 50]]},
+        }}
+        with open(os.path.join(directory, f'{os.getpid()}-1.json'), 'w') as f:
+            json.dump(stale, f)
+        text = registry.render()
+        assert 'test_requests_total{route="booking-list"} 116' in text, text
+        assert 'test_in_flight 2' in text, text
+        assert not os.path.exists(os.path.join(directory, f'{os.getpid()}-1.json'))
+        print("  PASS: Snapshot of a reused pid treated as an exited worker")
+
+    return True
+
+
+def test_metrics_endpoint():
+    """Test the middleware-populated /metrics endpoint and its access check"""
+    print("\nTesting /metrics endpoint...")
+
+    client = Client()
+    client.get('/health/')
+    client.get('/api/services/')
+
+    response = client.get('/metrics/')
+    assert response.status_code == 200
+    text = response.content.decode()
+    assert 'safehome_http_requests_total{route="health_check",method="GET",status="200"}' in text
+    assert 'safehome_http_request_duration_seconds_bucket{route="service-list",le="+Inf"}' in text
+    print("  PASS: Request metrics labelled by route and status")
+
+    response = client.get('/metrics/', REMOTE_ADDR='203.0.113.9')
+    assert response.status_code == 404
+    print("  PASS: External addresses refused")
+
+    with override_settings(METRICS_TOKEN='scrape-secret'):
+        assert client.get('/metrics/').status_code == 404
+        response = client.get('/metrics/', HTTP_AUTHORIZATION='Bearer scrape-secret')
+        assert response.status_code == 200
+    print("  PASS: Bearer token required when METRICS_TOKEN is set")
+    return True
+
+
+if __name__ == '__main__':
+    print("Testing SafeHome metrics...")
+
+    success = True
+    success &= test_multi_worker_aggregation()
+    success &= test_metrics_endpoint()
+
+    if success:
+        print("\n🎉 All metrics tests passed!")
+    else:
+        print("\n❌ Some tests failed!")
+        sys.exit(1)
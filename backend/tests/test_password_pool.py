@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Test script for the bounded password hashing pool
+"""
+import os
+import sys
+import django
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+# Set FERNET_KEY environment variable
+os.environ['FERNET_KEY'] = 'test-fernet-key-32-characters-long-for-encryption'
+
+# Set up Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'safehome.settings')
+django.setup()
+
+import time
+import threading
+from unittest.mock import patch
+from django.test import Client
+from accounts.models import User
+from core import password_pool
+from core.password_pool import PasswordHashingPool, PasswordPoolBusy, hash_password, verify_password
+
+
+def _occupy(pool, seconds, release=None):
+    """Run a task that holds a pool worker for `seconds` (or until `release` is set); returns the thread"""
+    started = threading.Event()
+    release = release or threading.Event()
+
+    def hold():
+        started.set()
+        release.wait(seconds)
+
+    thread = threading.Thread(target=pool.run, args=(hold,))
+    thread.start()
+    started.wait(1.0)
+    return thread
+
+
+def test_hash_and_verify():
+    """Test that hashing through the pool produces usable passwords"""
+    print("Testing hash and verify...")
+    user = User(username='pool-hash', email='pool-hash@test.com')
+    user.password = hash_password('s3cret-pass')
+    assert user.password.startswith('pbkdf2_sha256$')
+    assert verify_password(user, 's3cret-pass')
+    assert not verify_password(user, 'wrong-pass')
+    print("  PASS: Passwords hashed and verified on the pool")
+    return True
+
+
+def test_admission_and_queue_timeout():
+    """Test that a saturated pool refuses work instead of queueing it"""
+    print("\nTesting saturation...")
+    pool = PasswordHashingPool(workers=1, queue_size=0, queue_timeout=1.0)
+    holder = _occupy(pool, 0.3)
+    start = time.perf_counter()
+    try:
+        pool.run(lambda: None)
+        raise AssertionError('full pool accepted work')
+    except PasswordPoolBusy as e:
+        assert e.status_code == 503 and e.wait >= 1
+    assert time.perf_counter() - start < 0.05
+    holder.join()
+    assert pool.run(lambda: 'ok') == 'ok'
+    print("  PASS: Full queue refused immediately; slot released afterwards")
+
+    pool = PasswordHashingPool(workers=1, queue_size=1, queue_timeout=0.05)
+    ran = []
+    holder = _occupy(pool, 0.3)
+    try:
+        pool.run(ran.append, 'queued')
+        raise AssertionError('expired task ran')
+    except PasswordPoolBusy:
+        pass
+    holder.join()
+    assert ran == []
+    print("  PASS: Tasks waiting past the queue timeout are dropped unrun")
+    return True
+
+
+def test_caller_not_blocked_by_saturated_pool():
+    """Test that a queued caller gives up at the queue timeout, not when a worker frees up"""
+    print("\nTesting queue timeout while every worker is busy...")
+    pool = PasswordHashingPool(workers=1, queue_size=1, queue_timeout=0.05)
+    ran = []
+    holder = _occupy(pool, 1.0)
+    start = time.perf_counter()
+    try:
+        pool.run(ran.append, 'queued')
+        raise AssertionError('queued task ran')
+    except PasswordPoolBusy as e:
+        assert e.status_code == 503 and e.wait >= 1
+    assert time.perf_counter() - start < 0.5
+    print("  PASS: 503 raised at the queue timeout while the worker is still busy")
+
+    # The cancelled task gave its queue slot back
+    try:
+        pool.run(lambda: None)
+        raise AssertionError('queued task ran')
+    except PasswordPoolBusy:
+        pass
+    holder.join()
+    assert ran == []
+    assert pool.run(lambda: 'ok') == 'ok'
+    print("  PASS: Cancelled task never runs and frees its slot")
+    return True
+
+
+def test_login_returns_503_when_saturated():
+    """Test the login endpoint's response when the pool is saturated"""
+    print("\nTesting login under saturation...")
+    if not User.objects.filter(email='pool-login@test.com').exists():
+        User.objects.create_user(username='pool-login', email='pool-login@test.com', password='testpass123')
+    client = Client()
+    body = {'email': 'pool-login@test.com', 'password': 'testpass123'}
+
+    saturated = PasswordHashingPool(workers=1, queue_size=0, queue_timeout=2.0)
+    release = threading.Event()
+    holder = _occupy(saturated, 10.0, release)
+    with patch.object(password_pool, 'pool', saturated):
+        response = client.post('/api/auth/login/', body, content_type='application/json')
+    release.set()
+    holder.join()
+    assert response.status_code == 503, response.content
+    assert response['Retry-After'] == '2'
+    print("  PASS: 503 with Retry-After")
+
+    response = client.post('/api/auth/login/', body, content_type='application/json')
+    assert response.status_code == 200
+    print("  PASS: Login succeeds once the pool has capacity")
+    return True
+
+
+if __name__ == '__main__':
+    print("Testing SafeHome password hashing pool...")
+
+    success = True
+    success &= test_hash_and_verify()
+    success &= test_admission_and_queue_timeout()
+    success &= test_caller_not_blocked_by_saturated_pool()
+    success &= test_login_returns_503_when_saturated()
+
+    if success:
+        print("\n🎉 All password pool tests passed!")
+    else:
+        print("\n❌ Some tests failed!")
+        sys.exit(1)
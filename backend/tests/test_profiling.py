@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Test script for on-demand request profiling
+"""
+import os
+import sys
+import tempfile
+import django
+from io import StringIO
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+# Set FERNET_KEY environment variable
+os.environ['FERNET_KEY'] = 'test-fernet-key-32-characters-long-for-encryption'
+os.environ['PROFILING_DIR'] = tempfile.mkdtemp(prefix='safehome-profiles-test-')
+
+# Set up Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'safehome.settings')
+django.setup()
+
+from django.core.management import call_command
+from django.test import Client, override_settings
+from core.models import ProfilingConfig
+from core.profiling import ProfileSpool, reset_sampling_config
+
+
+def _clear():
+    call_command('profiles', 'clear', stdout=StringIO())
+    ProfilingConfig.objects.all().delete()
+    reset_sampling_config()
+
+
+def test_header_trigger():
+    """Test that only requests with the profiling token are profiled"""
+    print("Testing X-Profile header...")
+    _clear()
+    client = Client()
+    spool = ProfileSpool()
+
+    response = client.get('/api/services/')
+    assert 'X-Profile-Id' not in response
+    assert spool.entries() == []
+    print("  PASS: Requests are not profiled by default")
+
+    with override_settings(PROFILING_TOKEN='profile-secret'):
+        response = client.get('/api/services/', HTTP_X_PROFILE='wrong')
+        assert 'X-Profile-Id' not in response
+
+        response = client.get('/api/services/', HTTP_X_PROFILE='profile-secret')
+        assert response.status_code == 200
+        profile_id = response['X-Profile-Id']
+
+    entries = spool.entries()
+    assert len(entries) == 1
+    path, meta = entries[0]
+    assert os.path.basename(path) == f'{profile_id}.prof'
+    assert meta['request_id'] == response['X-Request-ID']
+    assert meta['route'] == 'service-list'
+    assert meta['status'] == 200 and meta['trigger'] == 'header'
+    assert 'service-list' in profile_id
+    print("  PASS: Profile saved with request ID and route")
+
+    with override_settings(PROFILING_TOKEN=''):
+        response = client.get('/api/services/', HTTP_X_PROFILE='')
+        assert 'X-Profile-Id' not in response
+    print("  PASS: Empty token disables the header trigger")
+    return True
+
+
+def test_admin_sampling():
+    """Test sampling controlled by ProfilingConfig"""
+    print("\nTesting admin sampling...")
+    _clear()
+    client = Client()
+    spool = ProfileSpool()
+
+    ProfilingConfig(sample_rate=0.5).save()
+    ProfilingConfig(sample_rate=1.0, route='health_check').save()
+    assert ProfilingConfig.objects.count() == 1
+    reset_sampling_config()
+
+    client.get('/api/services/')
+    client.get('/health/')
+    routes = [meta['route'] for _, meta in spool.entries()]
+    assert routes == ['health_check'], routes
+    print("  PASS: Only the configured route is sampled")
+
+    config = ProfilingConfig.load()
+    config.sample_rate = 0.0
+    config.save()
+    client.get('/health/')
+    assert len(spool.entries()) == 2
+    print("  PASS: Configuration is cached between reloads")
+
+    reset_sampling_config()
+    client.get('/health/')
+    assert len(spool.entries()) == 2
+    print("  PASS: Sampling disabled after reload")
+    return True
+
+
+def test_spool_bound_and_command():
+    """Test the spool limit and the profiles management command"""
+    print("\nTesting spool limit and profiles command...")
+    _clear()
+    client = Client()
+
+    with override_settings(PROFILING_TOKEN='profile-secret', PROFILING_MAX_FILES=3):
+        for _ in range(5):
+            client.get('/api/services/', HTTP_X_PROFILE='profile-secret')
+        client.get('/health/', HTTP_X_PROFILE='profile-secret')
+        assert len(ProfileSpool().entries()) == 3
+        assert len(os.listdir(ProfileSpool().directory)) == 6
+    print("  PASS: Oldest profiles removed beyond PROFILING_MAX_FILES")
+
+    out = StringIO()
+    call_command('profiles', 'list', stdout=out)
+    assert '3 profile(s)' in out.getvalue()
+
+    out = StringIO()
+    call_command('profiles', 'top', '--route', 'service-list', '--limit', '5', stdout=out)
+    assert 'Aggregated 2 profile(s)' in out.getvalue()
+    assert 'function calls' in out.getvalue()
+    print("  PASS: Top functions aggregated across profiles of a route")
+
+    out = StringIO()
+    call_command('profiles', 'clear', stdout=out)
+    assert ProfileSpool().entries() == []
+    print("  PASS: Spool cleared")
+    return True
+
+
+if __name__ == '__main__':
+    print("Testing SafeHome request profiling...")
+
+    success = True
+    success &= test_header_trigger()
+    success &= test_admin_sampling()
+    success &= test_spool_bound_and_command()
+
+    if success:
+        print("\n🎉 All profiling tests passed!")
+    else:
+        print("\n❌ Some tests failed!")
+        sys.exit(1)
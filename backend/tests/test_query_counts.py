@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Test script for N+1 detection and per-endpoint query budgets
+"""
+import os
+import sys
+import django
+from pathlib import Path
+from datetime import timedelta
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+# Set FERNET_KEY environment variable
+os.environ['FERNET_KEY'] = 'test-fernet-key-32-characters-long-for-encryption'
+
+# Set up Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'safehome.settings')
+django.setup()
+
+from django.test import Client, override_settings
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+from accounts.models import User
+from bookings.models import Booking
+from payments.models import Payment
+from core.nplusone import NPlusOneError, normalize_sql
+from core.testing import assert_max_queries
+
+BOOKINGS = 8
+
+
+def _user(email, role):
+    user = User.objects.filter(email=email).first()
+    if user is None:
+        user = User.objects.create_user(username=email.split('@')[0], email=email,
+                                        password='testpass123', role=role)
+    return user
+
+
+def _client(user):
+    client = Client()
+    client.cookies['access_token'] = str(RefreshToken.for_user(user).access_token)
+    return client
+
+
+def _setup():
+    customer = _user('queries-customer@test.com', 'customer')
+    provider = _user('queries-provider@test.com', 'provider')
+    Booking.objects.filter(user=customer).delete()
+    for i in range(BOOKINGS):
+        booking = Booking(
+            user=customer, provider=provider if i % 2 else None, service_type='cleaning',
+            start_time=timezone.now() + timedelta(days=i + 1), duration_hours=2,
+            city='Query City', status='confirmed' if i % 2 else 'pending', budget=100,
+        )
+        booking.set_address(f'{i} Query Street')
+        booking.set_phone(f'+6140000000{i}')
+        booking.save()
+        if i % 4 == 0:
+            Payment.objects.create(booking=booking, amount=100, status='paid')
+    return customer, provider
+
+
+def test_normalize_sql():
+    """Test that statements differing only in parameters share a shape"""
+    print("Testing SQL shapes...")
+    a = normalize_sql('SELECT * FROM "payments_payment" WHERE "booking_id" = %s LIMIT 21')
+    b = normalize_sql('SELECT  *  FROM "payments_payment"\nWHERE "booking_id" = 42 LIMIT 21')
+    assert a == b, (a, b)
+    assert normalize_sql("SELECT 1 WHERE x IN (%s, %s, %s)") == normalize_sql("SELECT 1 WHERE x IN (%s)")
+    assert normalize_sql("SELECT 'it''s'") == 'SELECT ?'
+    print("  PASS: Parameters, literals and IN lists normalized")
+    return True
+
+
+def test_detector_flags_repeated_queries():
+    """Test that a view issuing one query per row is reported"""
+    print("\nTesting N+1 detector...")
+    customer, _ = _setup()
+    client = _client(customer)
+
+    # Drop the select_related of the list view to reintroduce the N+1
+    from bookings import views
+    original = views.BookingListView.get_queryset
+    views.BookingListView.get_queryset = lambda self: Booking.objects.with_pii().filter(user=self.request.user)
+    try:
+        with override_settings(N_PLUS_ONE_DETECTION='raise', N_PLUS_ONE_THRESHOLD=5):
+            try:
+                client.get('/api/bookings/my-bookings/')
+                raise AssertionError('N+1 not detected')
+            except NPlusOneError as e:
+                assert 'payments_payment' in str(e)
+                assert 'bookings/serializers.py' in str(e)
+        print("  PASS: Repeated query shape raises with its origin")
+    finally:
+        views.BookingListView.get_queryset = original
+
+    with override_settings(N_PLUS_ONE_DETECTION='raise', N_PLUS_ONE_THRESHOLD=5):
+        assert client.get('/api/bookings/my-bookings/').status_code == 200
+    print("  PASS: Booking list passes with select_related")
+    return True
+
+
+def test_endpoint_query_budgets():
+    """Test that list endpoints and dashboards run a fixed number of queries"""
+    print("\nTesting endpoint query budgets...")
+    customer, provider = _setup()
+    customer_client = _client(customer)
+    provider_client = _client(provider)
+
+    with assert_max_queries(3):
+        response = customer_client.get('/api/bookings/my-bookings/')
+    assert response.status_code == 200
+    assert len(response.json()['data']) == BOOKINGS
+    payment_statuses = {booking['payment_status'] for booking in response.json()['data']}
+    assert payment_statuses == {'paid', None}
+    print("  PASS: Booking list (user, deferred fields, bookings)")
+
+    booking = Booking.objects.filter(user=customer, payment__isnull=False).first()
+    with assert_max_queries(2):
+        response = customer_client.get(f'/api/bookings/{booking.id}/')
+    assert response.json()['data']['payment_status'] == 'paid'
+    print("  PASS: Booking detail loads its relations with the booking")
+
+    with assert_max_queries(3):
+        assert provider_client.get('/api/bookings/provider/received/').status_code == 200
+    with assert_max_queries(2):
+        response = provider_client.get('/api/bookings/provider/available/')
+    assert response.status_code == 200
+    tasks = response.json()['data']
+    assert tasks and all('address' not in task and 'phone' not in task for task in tasks)
+    assert all('notes' in task for task in tasks)
+    print("  PASS: Provider lists; the available tasks feed leaves the encrypted columns unread")
+
+    with assert_max_queries(2):
+        response = customer_client.get('/api/auth/customer/dashboard/')
+    assert response.status_code == 200
+    assert response.json()['data']['stats']['total_bookings'] == BOOKINGS
+    print("  PASS: Customer dashboard counts in one query")
+
+    with assert_max_queries(2):
+        assert customer_client.get('/api/bookings/stats/').status_code == 200
+    print("  PASS: Booking stats")
+
+    task = Booking.objects.filter(user=customer, provider__isnull=True, payment__isnull=False).first()
+    address = task.get_address()
+    with assert_max_queries(3):
+        response = provider_client.put(f'/api/bookings/{task.id}/accept/', {}, content_type='application/json')
+    assert response.status_code == 200, response.content
+    assert response.json()['data']['payment_status'] == 'paid'
+    assert 'address' not in response.json()['data']
+    task.refresh_from_db()
+    assert task.provider == provider and task.get_address() == address
+    print("  PASS: Accepting a task keeps the encrypted columns deferred")
+
+    with assert_max_queries(3):
+        response = customer_client.put(f'/api/bookings/{task.id}/cancel/', {}, content_type='application/json')
+    assert response.status_code == 200, response.content
+    assert response.json()['data']['status'] == 'cancelled'
+    print("  PASS: Cancelling a booking keeps the encrypted columns deferred")
+
+    try:
+        # The user may come from the auth cache, but the list query always runs
+        with assert_max_queries(0):
+            customer_client.get('/api/bookings/my-bookings/')
+        raise RuntimeError('budget not enforced')
+    except AssertionError as e:
+        assert 'expected at most 0' in str(e)
+    print("  PASS: Exceeding the budget fails with the query shapes")
+    return True
+
+
+if __name__ == '__main__':
+    print("Testing SafeHome query counts...")
+
+    success = True
+    success &= test_normalize_sql()
+    success &= test_detector_flags_repeated_queries()
+    success &= test_endpoint_query_budgets()
+
+    if success:
+        print("\n🎉 All query count tests passed!")
+    else:
+        print("\n❌ Some tests failed!")
+        sys.exit(1)
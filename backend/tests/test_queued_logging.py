@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Test script for the queued, non-blocking log file handler
+"""
+import os
+import sys
+import time
+import logging
+import tempfile
+import threading
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from core.log_handlers import QueuedRotatingFileHandler
+
+
+def _logger(handler, name):
+    logger = logging.getLogger(f'test.queued.{name}')
+    logger.handlers = [handler]
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    return logger
+
+
+class _SlowStream:
+    """File-like object that blocks until released, like a stalled disk"""
+
+    def __init__(self, stream, release):
+        self.stream = stream
+        self.release = release
+        self.flushes = 0
+
+    def write(self, data):
+        self.release.wait()
+        return self.stream.write(data)
+
+    def flush(self):
+        self.flushes += 1
+        self.stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+def test_slow_disk_does_not_block():
+    """Test that logging returns immediately and drops when the queue is full"""
+    print("Testing slow log disk...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        handler = QueuedRotatingFileHandler(os.path.join(tmp, 'access.log'), queue_size=50)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        release = threading.Event()
+        handler.target.stream = _SlowStream(handler.target._open(), release)
+        logger = _logger(handler, 'slow')
+
+        try:
+            start = time.perf_counter()
+            for i in range(500):
+                logger.info("request %d", i)
+            elapsed = time.perf_counter() - start
+            assert elapsed < 0.5, f"Logging blocked for {elapsed:.2f}s"
+            print(f"  PASS: 500 records logged in {elapsed * 1e3:.1f} ms with the disk stalled")
+
+            assert handler.dropped > 0
+            print(f"  PASS: {handler.dropped} records dropped and counted")
+        finally:
+            release.set()
+        handler.flush()
+        handler.close()
+
+        lines = Path(tmp, 'access.log').read_text().splitlines()
+        assert lines[0] == 'request 0'
+        requests = [line for line in lines if line.startswith('request ')]
+        assert len(requests) + handler.dropped == 500
+        assert any(f'dropped {handler.dropped} records' in line for line in lines)
+        print("  PASS: Queued records written and drops reported in the log")
+    return True
+
+
+def test_batching_and_rotation():
+    """Test that records are flushed in batches and the file rotates by size"""
+    print("\nTesting batched flushes and rotation...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'access.log')
+        handler = QueuedRotatingFileHandler(path, max_bytes=2000, backup_count=2, batch_size=100)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        release = threading.Event()
+        stream = _SlowStream(handler.target._open(), release)
+        handler.target.stream = stream
+        logger = _logger(handler, 'batch')
+
+        try:
+            for i in range(40):
+                logger.info("booking %d confirmed", i)
+        finally:
+            release.set()
+        handler.flush()
+        assert stream.flushes < 40, f"Expected batched flushes, got {stream.flushes}"
+        print(f"  PASS: 40 records written with {stream.flushes} flushes")
+
+        for i in range(200):
+            logger.info("booking %d confirmed %s", i, 'x' * 40)
+        handler.close()
+        assert os.path.exists(path + '.1') and os.path.exists(path + '.2')
+        assert not os.path.exists(path + '.3')
+        print("  PASS: File rotated by size with the configured backups")
+    return True
+
+
+if __name__ == '__main__':
+    print("Testing SafeHome queued logging...")
+
+    success = True
+    success &= test_slow_disk_does_not_block()
+    success &= test_batching_and_rotation()
+
+    if success:
+        print("\n🎉 All queued logging tests passed!")
+    else:
+        print("\n❌ Some tests failed!")
+        sys.exit(1)
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Test script for token-bucket rate limiting
+"""
+import os
+import sys
+import django
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+# Set FERNET_KEY environment variable
+os.environ['FERNET_KEY'] = 'test-fernet-key-32-characters-long-for-encryption'
+
+# Set up Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'safehome.settings')
+django.setup()
+
+import threading
+from django.core.cache import cache
+from django.test import Client, override_settings
+from core.ratelimit import CacheBackend, LocalBackend, get_backend, parse_rate
+
+LIMITS = {'login': '3/min', 'covid_lookup': '2/min'}
+
+
+def test_parse_rate():
+    """Test rate strings"""
+    print("Testing rate parsing...")
+    assert parse_rate('10/min') == (10, 6.0)
+    assert parse_rate('5/30s') == (5, 6.0)
+    assert parse_rate('24/day') == (24, 3600.0)
+    for bad in ('0/min', '10/fortnight', 'ten/min'):
+        try:
+            parse_rate(bad)
+            raise AssertionError(f'{bad} accepted')
+        except ValueError:
+            pass
+    print("  PASS: Rates parsed, invalid rates rejected")
+    return True
+
+
+def test_bucket_semantics():
+    """Test burst, refusal, refill and retry-after on both backends"""
+    print("\nTesting bucket semantics...")
+    for backend in (LocalBackend(), CacheBackend()):
+        backend.reset()
+        now = 1000.0
+        results = [backend.hit('k', 3, 10.0, now=now) for _ in range(4)]
+        assert [allowed for allowed, _, _ in results] == [True, True, True, False]
+        assert [remaining for _, remaining, _ in results[:3]] == [2, 1, 0]
+        assert abs(results[3][2] - 10.0) < 0.01
+
+        # One token back after one interval, the full burst after three
+        assert backend.hit('k', 3, 10.0, now=now + 10)[0]
+        assert not backend.hit('k', 3, 10.0, now=now + 10)[0]
+        assert [backend.hit('k', 3, 10.0, now=now + 60)[0] for _ in range(4)] == [True, True, True, False]
+        assert backend.hit('other', 3, 10.0, now=now)[0]
+        print(f"  PASS: {type(backend).__name__} bursts, refuses and refills")
+    return True
+
+
+def test_cache_backend_is_atomic():
+    """Test that concurrent hits never overdraw a shared bucket"""
+    print("\nTesting concurrent hits...")
+    backend = CacheBackend()
+    backend.reset()
+    allowed = []
+    barrier = threading.Barrier(8)
+
+    def worker():
+        barrier.wait()
+        for _ in range(25):
+            allowed.append(backend.hit('shared', 50, 3600.0)[0])
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sum(allowed) == 50, sum(allowed)
+    print("  PASS: 200 concurrent hits admitted exactly 50")
+    return True
+
+
+def test_local_backend_prunes_keys():
+    """Test that the local backend stays bounded without forgetting busy clients"""
+    print("\nTesting key pruning...")
+    backend = LocalBackend(max_keys=100)
+    # A client that has used up its bucket keeps hitting it during a flood
+    for _ in range(5):
+        backend.hit('ip:busy', 5, 60.0, now=0.0)
+    for i in range(1000):
+        backend.hit(f'ip:{i}', 5, 60.0, now=i / 1000)
+        assert not backend.hit('ip:busy', 5, 60.0, now=i / 1000)[0]
+    assert len(backend._tats) <= 100
+    print("  PASS: Local buckets bounded by max_keys, busy bucket kept")
+
+    # Buckets that have refilled are dropped before live ones
+    backend = LocalBackend(max_keys=3)
+    backend.hit('expired', 5, 1.0, now=0.0)
+    backend.hit('live-1', 5, 60.0, now=0.0)
+    backend.hit('live-2', 5, 60.0, now=0.0)
+    backend.hit('new', 5, 60.0, now=10.0)
+    assert list(backend._tats) == ['live-1', 'live-2', 'new'], list(backend._tats)
+    print("  PASS: Refilled buckets evicted first")
+    return True
+
+
+def test_cache_reset_keeps_default_cache():
+    """Test that resetting cache buckets leaves the default cache alone"""
+    print("\nTesting cache reset...")
+    cache.set('ratelimit-test-unrelated', 'kept', 60)
+    backend = CacheBackend()
+    backend.hit('k', 1, 60.0)
+    backend.reset()
+    assert backend.hit('k', 1, 60.0)[0]
+    assert cache.get('ratelimit-test-unrelated') == 'kept'
+    print("  PASS: Reset clears buckets only")
+    return True
+
+
+@override_settings(RATE_LIMIT_ENABLED=True, RATE_LIMITS=LIMITS)
+def test_endpoints_throttled():
+    """Test 429 responses per IP on login and the COVID lookup"""
+    print("\nTesting endpoint throttling...")
+    for name in ('local', 'cache'):
+        with override_settings(RATE_LIMIT_BACKEND=name):
+            get_backend().reset()
+            client = Client(REMOTE_ADDR='203.0.113.5')
+            body = {'email': 'nobody@test.com', 'password': 'wrong-pass'}
+            codes = [client.post('/api/auth/login/', body, content_type='application/json').status_code
+                     for _ in range(4)]
+            assert codes[:3] == [401] * 3 and codes[3] == 429, codes
+            response = client.post('/api/auth/login/', body, content_type='application/json')
+            assert int(response['Retry-After']) >= 1
+
+            # Spoofed X-Forwarded-For does not escape the bucket
+            response = client.post('/api/auth/login/', body, content_type='application/json',
+                                   HTTP_X_FORWARDED_FOR='198.51.100.7')
+            assert response.status_code == 429
+
+            other = Client(REMOTE_ADDR='203.0.113.6')
+            assert other.post('/api/auth/login/', body, content_type='application/json').status_code == 401
+
+            codes = [client.get('/api/covid/restriction/', {'country': 'AU'}).status_code for _ in range(3)]
+            assert codes[2] == 429 and 429 not in codes[:2], codes
+            print(f"  PASS: {name} backend returns 429 with Retry-After per IP and route")
+    return True
+
+
+if __name__ == '__main__':
+    print("Testing SafeHome rate limiting...")
+
+    success = True
+    success &= test_parse_rate()
+    success &= test_bucket_semantics()
+    success &= test_cache_backend_is_atomic()
+    success &= test_local_backend_prunes_keys()
+    success &= test_cache_reset_keeps_default_cache()
+    success &= test_endpoints_throttled()
+
+    if success:
+        print("\n🎉 All rate limiting tests passed!")
+    else:
+        print("\n❌ Some tests failed!")
+        sys.exit(1)
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Test script for request IDs, the JSON access log and Server-Timing
+"""
+import os
+import sys
+import json
+import logging
+import django
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+# Set FERNET_KEY environment variable
+os.environ['FERNET_KEY'] = 'test-fernet-key-32-characters-long-for-encryption'
+
+# Set up Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'safehome.settings')
+django.setup()
+
+from django.test import Client
+from core import timing
+from core.crypto import enc_bytes, dec_bytes_many
+
+
+class _Capture(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(json.loads(record.getMessage()))
+
+
+def test_access_log_and_server_timing():
+    """Test the per-request record and headers"""
+    print("Testing access log record and Server-Timing...")
+
+    capture = _Capture()
+    access_logger = logging.getLogger('safehome.access')
+    access_logger.addHandler(capture)
+    try:
+        client = Client()
+        first = client.get('/api/services/')
+        second = client.get('/api/services/', HTTP_X_REQUEST_ID='frontend-req-0001')
+    finally:
+        access_logger.removeHandler(capture)
+
+    assert first['X-Request-ID'] != second['X-Request-ID']
+    assert len(first['X-Request-ID']) == 32
+    assert second['X-Request-ID'] == 'frontend-req-0001'
+    print("  PASS: Unique request IDs, incoming X-Request-ID reused")
+
+    metrics = [part.split(';')[0] for part in first['Server-Timing'].split(', ')]
+    assert metrics == ['db', 'crypto', 'stripe', 'total'], metrics
+    print(f"  PASS: Server-Timing: {first['Server-Timing']}")
+
+    record = capture.records[0]
+    assert record['request_id'] == first['X-Request-ID']
+    assert record['route'] == 'service-list'
+    assert record['status'] == 200
+    assert record['db_queries'] >= 1 and record['db_ms'] >= 0
+    assert record['response_bytes'] == len(first.content)
+    print(f"  PASS: Access record for {record['route']}: {record['db_queries']} queries, "
+          f"{record['response_bytes']} bytes")
+    return True
+
+
+def test_timed_buckets():
+    """Test that timed() adds to the current request and counts nesting once"""
+    print("\nTesting timed() buckets...")
+
+    blobs = [enc_bytes(f'value {i}') for i in range(3)]
+    assert timing.current() is None
+
+    timings, token = timing.start_request()
+    try:
+        dec_bytes_many(blobs)
+        with timing.timed('stripe'):
+            with timing.timed('stripe'):
+                pass
+    finally:
+        timing.end_request(token)
+
+    assert timings.count('crypto') == 1 and timings.duration('crypto') > 0
+    assert timings.count('stripe') == 1
+    assert timing.current() is None
+    print("  PASS: Crypto and Stripe time recorded once per outer call")
+    return True
+
+
+if __name__ == '__main__':
+    print("Testing SafeHome request timing...")
+
+    success = True
+    success &= test_access_log_and_server_timing()
+    success &= test_timed_buckets()
+
+    if success:
+        print("\n🎉 All request timing tests passed!")
+    else:
+        print("\n❌ Some tests failed!")
+        sys.exit(1)
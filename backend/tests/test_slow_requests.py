@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Test script for slow-request capture with EXPLAIN
+"""
+import os
+import sys
+import django
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+# Set FERNET_KEY environment variable
+os.environ['FERNET_KEY'] = 'test-fernet-key-32-characters-long-for-encryption'
+
+# Set up Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'safehome.settings')
+django.setup()
+
+from django.test import Client, override_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from accounts.models import User
+from core.models import SlowRequest
+from core.slow_requests import recorder
+
+
+def _stats_client():
+    user = User.objects.filter(email='slow-customer@test.com').first()
+    if user is None:
+        user = User.objects.create_user(
+            username='slow-customer', email='slow-customer@test.com',
+            password='testpass123', role='customer',
+        )
+    client = Client()
+    client.cookies['access_token'] = str(RefreshToken.for_user(user).access_token)
+    return client
+
+
+def test_fast_requests_ignored():
+    """Test that requests under the threshold are not stored"""
+    print("Testing threshold...")
+    SlowRequest.objects.all().delete()
+
+    with override_settings(SLOW_REQUEST_THRESHOLD_MS=60000):
+        Client().get('/api/services/')
+    recorder.flush()
+    assert SlowRequest.objects.count() == 0
+    print("  PASS: Fast requests not recorded")
+    return True
+
+
+def test_slow_request_recorded():
+    """Test that a slow request is stored with its queries and EXPLAIN output"""
+    print("\nTesting slow request capture...")
+    SlowRequest.objects.all().delete()
+    client = _stats_client()
+
+    with override_settings(SLOW_REQUEST_THRESHOLD_MS=0.001):
+        response = client.get('/api/bookings/stats/')
+    assert response.status_code == 200
+    recorder.flush()
+
+    slow = SlowRequest.objects.get()
+    assert slow.request_id == response['X-Request-ID']
+    assert slow.route == 'booking-stats' and slow.status == 200
+    assert slow.query_count == len(slow.queries) > 0
+    print("  PASS: Slow request stored with route and request ID")
+
+    stats_queries = [q for q in slow.queries if any('bookings/views.py' in frame for frame in q['origin'])]
+    assert stats_queries, slow.queries
+    assert all('%s' in q['sql'] or 'bookings_booking' in q['sql'] for q in stats_queries)
+    print("  PASS: Statements carry durations and their origin in project code")
+
+    explained = [q for q in slow.queries if 'explain' in q]
+    assert 0 < len(explained) <= 3
+    assert all(q['sql'].lstrip().upper().startswith('SELECT') and q['explain'] for q in explained)
+    print("  PASS: EXPLAIN captured for the slowest SELECT statements")
+    return True
+
+
+def test_ring_buffer():
+    """Test that only the newest SLOW_REQUEST_KEEP rows are kept"""
+    print("\nTesting ring buffer...")
+    SlowRequest.objects.all().delete()
+    client = Client()
+
+    with override_settings(SLOW_REQUEST_THRESHOLD_MS=0.001, SLOW_REQUEST_KEEP=3):
+        request_ids = [client.get('/api/services/')['X-Request-ID'] for _ in range(5)]
+        recorder.flush()
+
+    kept = list(SlowRequest.objects.order_by('id').values_list('request_id', flat=True))
+    assert kept == request_ids[-3:], kept
+    print("  PASS: Oldest slow requests removed")
+    return True
+
+
+if __name__ == '__main__':
+    print("Testing SafeHome slow-request capture...")
+
+    success = True
+    success &= test_fast_requests_ignored()
+    success &= test_slow_request_recorded()
+    success &= test_ring_buffer()
+
+    if success:
+        print("\n🎉 All slow-request tests passed!")
+    else:
+        print("\n❌ Some tests failed!")
+        sys.exit(1)
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Test script for role claims in JWT tokens and query-free permission checks
+"""
+import os
+import sys
+import django
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+# Set FERNET_KEY environment variable
+os.environ['FERNET_KEY'] = 'test-fernet-key-32-characters-long-for-encryption'
+
+# Set up Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'safehome.settings')
+django.setup()
+
+import time
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from accounts.models import User
+from accounts.authentication import user_cache
+from accounts.revocation import store as revocation_store
+
+
+def _user(email, role):
+    user = User.objects.filter(email=email).first()
+    if user is None:
+        user = User.objects.create_user(username=email.split('@')[0], email=email,
+                                        password='testpass123', role=role)
+    elif user.role != role:
+        user.role = role
+        user.save()
+    return user
+
+
+def _login(email):
+    client = Client()
+    response = client.post('/api/auth/login/', {'email': email, 'password': 'testpass123'},
+                           content_type='application/json')
+    assert response.status_code == 200, response.content
+    return client
+
+
+def _user_queries(context):
+    return [q for q in context.captured_queries if 'FROM "accounts_user"' in q['sql']]
+
+
+def test_login_embeds_role_claims():
+    """Test that login issues tokens carrying the role"""
+    print("Testing role claims...")
+    _user('claims-provider@test.com', 'provider')
+    client = _login('claims-provider@test.com')
+
+    access = AccessToken(client.cookies['access_token'].value)
+    assert access['role'] == 'provider'
+    assert access['has_provider_id'] is False
+    print("  PASS: Access token carries role and provider ID presence")
+    return True
+
+
+def test_provider_endpoints_use_token_only():
+    """Test that provider polling endpoints never load the user"""
+    print("\nTesting query-free authorization...")
+    _user('claims-provider@test.com', 'provider')
+    _user('claims-customer@test.com', 'customer')
+    provider = _login('claims-provider@test.com')
+    customer = _login('claims-customer@test.com')
+    user_cache.clear()
+    revocation_store.ensure_loaded()  # Loaded once per process, outside the measured requests
+
+    for path in ('/api/bookings/provider/available/', '/api/bookings/provider/received/'):
+        with CaptureQueriesContext(connection) as context:
+            assert provider.get(path).status_code == 200
+        assert _user_queries(context) == [], context.captured_queries
+        assert len(context.captured_queries) == 1
+    print("  PASS: Provider lists authenticate and authorize from the token")
+
+    with CaptureQueriesContext(connection) as context:
+        assert customer.get('/api/bookings/provider/available/').status_code == 403
+    assert context.captured_queries == []
+    print("  PASS: Wrong role refused without a query")
+
+    response = customer.get('/api/auth/me/')
+    assert response.status_code == 200
+    assert response.json()['data']['email'] == 'claims-customer@test.com'
+    print("  PASS: Views needing the full user load it transparently")
+    return True
+
+
+def test_role_change_forces_reissue():
+    """Test that tokens issued before a role change are rejected and refreshed"""
+    print("\nTesting role change...")
+    cache.clear()
+    user = _user('claims-switch@test.com', 'customer')
+    client = _login('claims-switch@test.com')
+    assert client.get('/api/auth/customer/dashboard/').status_code == 200
+
+    time.sleep(1)  # iat has one-second resolution
+    user.role = 'provider'
+    user.save()
+
+    assert client.get('/api/auth/customer/dashboard/').status_code == 401
+    print("  PASS: Tokens predating the role change rejected")
+
+    assert client.post('/api/auth/refresh/').status_code == 200
+    assert AccessToken(client.cookies['access_token'].value)['role'] == 'provider'
+    assert client.get('/api/bookings/provider/available/').status_code == 200
+    assert client.get('/api/auth/customer/dashboard/').status_code == 403
+    print("  PASS: Refresh reissues the access token with the new role")
+
+    user.first_name = 'Renamed'
+    user.save()
+    assert client.get('/api/bookings/provider/available/').status_code == 200
+    print("  PASS: Unrelated profile changes keep tokens valid")
+    return True
+
+
+def test_tokens_without_claims():
+    """Test that tokens issued before role claims still authenticate"""
+    print("\nTesting legacy tokens...")
+    user = _user('claims-legacy@test.com', 'provider')
+    client = Client()
+    client.cookies['access_token'] = str(RefreshToken.for_user(user).access_token)
+    assert client.get('/api/bookings/provider/available/').status_code == 200
+    print("  PASS: Legacy tokens fall back to loading the user")
+    return True
+
+
+if __name__ == '__main__':
+    print("Testing SafeHome token claims...")
+
+    success = True
+    success &= test_login_embeds_role_claims()
+    success &= test_provider_endpoints_use_token_only()
+    success &= test_role_change_forces_reissue()
+    success &= test_tokens_without_claims()
+
+    if success:
+        print("\n🎉 All token claims tests passed!")
+    else:
+        print("\n❌ Some tests failed!")
+        sys.exit(1)
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Test script for single-flight token refresh
+"""
+import os
+import sys
+import django
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+# Set FERNET_KEY environment variable
+os.environ['FERNET_KEY'] = 'test-fernet-key-32-characters-long-for-encryption'
+
+# Set up Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'safehome.settings')
+django.setup()
+
+import time
+import uuid
+import threading
+from django.conf import settings
+from django.db import connection
+from django.test import Client, override_settings
+from accounts.models import User
+from accounts.views import RefreshTokenView
+from core.singleflight import single_flight
+
+PARALLEL = 8
+
+
+def _parallel(func, count=PARALLEL):
+    """Run func() in `count` threads released together; returns results or exceptions"""
+    barrier = threading.Barrier(count)
+    results = [None] * count
+
+    def run(index):
+        barrier.wait()
+        try:
+            results[index] = func()
+        except Exception as e:
+            results[index] = e
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_single_flight():
+    """Test that concurrent callers share one computation"""
+    print("Testing single flight...")
+    key = uuid.uuid4().hex
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.1)
+        return ('result', len(calls))
+
+    results = _parallel(lambda: single_flight(key, compute, ttl=5))
+    assert len(calls) == 1, len(calls)
+    assert results == [('result', 1)] * PARALLEL
+    assert single_flight(key, compute, ttl=5) == ('result', 1)
+    print("  PASS: One computation shared by concurrent and later callers")
+
+    def fail():
+        calls.append(1)
+        time.sleep(0.05)
+        raise ValueError('boom')
+
+    calls.clear()
+    results = _parallel(lambda: single_flight(uuid.uuid4().hex + 'x', fail, ttl=5), count=2)
+    assert all(isinstance(result, ValueError) for result in results)
+    print("  PASS: Failures are not shared")
+    return True
+
+
+def test_parallel_refreshes_issue_once():
+    """Test that parallel refreshes of one token mint one token pair"""
+    print("\nTesting parallel refreshes...")
+    email = 'single-flight@test.com'
+    if not User.objects.filter(email=email).exists():
+        User.objects.create_user(username='single-flight', email=email, password='testpass123')
+    login = Client()
+    response = login.post('/api/auth/login/', {'email': email, 'password': 'testpass123'},
+                          content_type='application/json')
+    assert response.status_code == 200
+    refresh_token = login.cookies['refresh_token'].value
+
+    issued = []
+    original = RefreshTokenView.issue
+
+    def counting_issue(self, refresh):
+        issued.append(1)
+        time.sleep(0.1)  # Keep the leader busy while the others arrive
+        return original(self, refresh)
+
+    def refresh():
+        client = Client()
+        client.cookies['refresh_token'] = refresh_token
+        response = client.post('/api/auth/refresh/')
+        return response.status_code, client.cookies['refresh_token'].value
+
+    RefreshTokenView.issue = counting_issue
+    try:
+        results = _parallel(refresh)
+    finally:
+        RefreshTokenView.issue = original
+
+    assert len(issued) == 1, len(issued)
+    assert {status for status, _ in results} == {200}, results
+    new_tokens = {token for _, token in results}
+    assert len(new_tokens) == 1 and refresh_token not in new_tokens
+    print(f"  PASS: {PARALLEL} parallel refreshes, 1 issuance, all given the same tokens")
+    return True
+
+
+def test_shared_result_not_served_after_logout():
+    """Test that a refresh replayed after logout does not get the shared tokens"""
+    print("\nTesting shared refresh result after logout...")
+    email = 'single-flight-logout@test.com'
+    if not User.objects.filter(email=email).exists():
+        User.objects.create_user(username='single-flight-logout', email=email, password='testpass123')
+    client = Client()
+    response = client.post('/api/auth/login/', {'email': email, 'password': 'testpass123'},
+                           content_type='application/json')
+    assert response.status_code == 200
+    old_refresh_token = client.cookies['refresh_token'].value
+
+    assert client.post('/api/auth/refresh/').status_code == 200
+    assert client.cookies['refresh_token'].value != old_refresh_token
+
+    # Within the sharing window the old refresh token gets the same tokens
+    replay = Client()
+    replay.cookies['refresh_token'] = old_refresh_token
+    assert replay.post('/api/auth/refresh/').status_code == 200
+    print("  PASS: Refresh result shared within the window")
+
+    # Logging out revokes the tokens issued by that refresh
+    assert client.post('/api/auth/logout/').status_code == 200
+    replay = Client()
+    replay.cookies['refresh_token'] = old_refresh_token
+    response = replay.post('/api/auth/refresh/')
+    assert response.status_code == 401, response.content
+    print("  PASS: Shared tokens revoked by logout are not handed out")
+
+    # Without rotation the logout clears the shared result of the token itself
+    with override_settings(SIMPLE_JWT={**settings.SIMPLE_JWT, 'ROTATE_REFRESH_TOKENS': False}):
+        client = Client()
+        client.post('/api/auth/login/', {'email': email, 'password': 'testpass123'},
+                    content_type='application/json')
+        refresh_token = client.cookies['refresh_token'].value
+        assert client.post('/api/auth/refresh/').status_code == 200
+        assert client.post('/api/auth/logout/').status_code == 200
+        replay = Client()
+        replay.cookies['refresh_token'] = refresh_token
+        assert replay.post('/api/auth/refresh/').status_code == 401
+    print("  PASS: Logout clears the shared result")
+    return True
+
+
+if __name__ == '__main__':
+    print("Testing SafeHome single-flight token refresh...")
+
+    success = True
+    success &= test_single_flight()
+    success &= test_parallel_refreshes_issue_once()
+    success &= test_shared_result_not_served_after_logout()
+
+    if success:
+        print("\n🎉 All token refresh tests passed!")
+    else:
+        print("\n❌ Some tests failed!")
+        sys.exit(1)
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Test script for token revocation (logout, refresh token rotation)
+"""
+import os
+import sys
+import django
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+# Set FERNET_KEY environment variable
+os.environ['FERNET_KEY'] = 'test-fernet-key-32-characters-long-for-encryption'
+
+# Set up Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'safehome.settings')
+django.setup()
+
+import uuid
+from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+from accounts.models import RevokedToken, User
+from accounts.revocation import BloomFilter, store as revocation_store
+
+EMAIL = 'revocation@test.com'
+
+
+def _login():
+    if not User.objects.filter(email=EMAIL).exists():
+        User.objects.create_user(username='revocation', email=EMAIL, password='testpass123')
+    client = Client()
+    response = client.post('/api/auth/login/', {'email': EMAIL, 'password': 'testpass123'},
+                           content_type='application/json')
+    assert response.status_code == 200, response.content
+    return client
+
+
+def _with_cookies(**cookies):
+    client = Client()
+    for name, value in cookies.items():
+        client.cookies[name] = value
+    return client
+
+
+def test_bloom_filter():
+    """Test that the filter has no false negatives and few false positives"""
+    print("Testing Bloom filter...")
+    bloom = BloomFilter(capacity=5000, error_rate=0.001)
+    members = [uuid.uuid4().hex for _ in range(5000)]
+    for jti in members:
+        bloom.add(jti)
+    assert all(jti in bloom for jti in members)
+    false_positives = sum(uuid.uuid4().hex in bloom for _ in range(20000))
+    assert false_positives < 60, false_positives
+    print(f"  PASS: No false negatives, {false_positives}/20000 false positives")
+    return True
+
+
+def test_logout_revokes_tokens():
+    """Test that copies of the cookies stop working after logout"""
+    print("\nTesting logout...")
+    client = _login()
+    access = client.cookies['access_token'].value
+    refresh = client.cookies['refresh_token'].value
+    assert _with_cookies(access_token=access).get('/api/auth/me/').status_code == 200
+
+    assert client.post('/api/auth/logout/').status_code == 200
+    assert _with_cookies(access_token=access).get('/api/auth/me/').status_code == 401
+    assert _with_cookies(refresh_token=refresh).post('/api/auth/refresh/').status_code == 401
+    response = Client().post('/api/auth/token/refresh/', {'refresh': refresh}, content_type='application/json')
+    assert response.status_code == 401
+    print("  PASS: Access and refresh tokens refused after logout")
+
+    # The browser may still send the revoked cookie; public endpoints ignore it
+    stale = _with_cookies(access_token=access)
+    response = stale.post('/api/auth/login/', {'email': EMAIL, 'password': 'testpass123'},
+                          content_type='application/json')
+    assert response.status_code == 200, response.content
+    assert _with_cookies(access_token=access).post('/api/auth/logout/').status_code == 200
+    print("  PASS: Login and logout still work with a revoked access cookie")
+    return True
+
+
+@override_settings(TOKEN_REFRESH_SHARE_SECONDS=0)
+def test_refresh_rotation():
+    """Test that each refresh token can be used once"""
+    print("\nTesting refresh rotation...")
+    client = _login()
+    first = client.cookies['refresh_token'].value
+    response = client.post('/api/auth/refresh/')
+    assert response.status_code == 200
+    second = client.cookies['refresh_token'].value
+    assert second != first
+    assert AccessToken(client.cookies['access_token'].value)['role'] == 'customer'
+
+    assert _with_cookies(refresh_token=first).post('/api/auth/refresh/').status_code == 401
+    assert client.post('/api/auth/refresh/').status_code == 200
+    print("  PASS: Rotated refresh token replaced and refused on reuse")
+    return True
+
+
+def test_unrevoked_tokens_skip_database():
+    """Test that the common path answers from memory"""
+    print("\nTesting the not-revoked path...")
+    client = _login()
+    revocation_store.ensure_loaded()
+    with CaptureQueriesContext(connection) as context:
+        assert client.get('/api/auth/me/').status_code == 200
+    assert not [q for q in context.captured_queries if 'accounts_revokedtoken' in q['sql']]
+    print("  PASS: No revocation query for a valid token")
+
+    # A revocation written by another worker applies after the next refresh
+    access = AccessToken(client.cookies['access_token'].value)
+    RevokedToken.objects.create(jti=access['jti'], token_type='access',
+                                expires_at=timezone.now() + timedelta(minutes=30))
+    revocation_store.refresh()
+    assert client.get('/api/auth/me/').status_code == 401
+    print("  PASS: Revocations from other workers picked up on refresh")
+    return True
+
+
+def test_sweep_expired():
+    """Test batched deletion of expired entries"""
+    print("\nTesting sweep...")
+    now = timezone.now()
+    RevokedToken.objects.filter(jti__startswith='sweep-').delete()
+    RevokedToken.objects.bulk_create(
+        [RevokedToken(jti=f'sweep-expired-{i}', token_type='refresh', expires_at=now - timedelta(hours=1))
+         for i in range(25)]
+        + [RevokedToken(jti='sweep-active', token_type='refresh', expires_at=now + timedelta(hours=1))]
+    )
+    out = StringIO()
+    call_command('sweep_revoked_tokens', batch_size=10, stdout=out)
+    assert 'Deleted 25' in out.getvalue(), out.getvalue()
+    assert list(RevokedToken.objects.filter(jti__startswith='sweep-').values_list('jti', flat=True)) == ['sweep-active']
+    print("  PASS: Expired entries deleted in batches, active ones kept")
+    return True
+
+
+if __name__ == '__main__':
+    print("Testing SafeHome token revocation...")
+
+    success = True
+    success &= test_bloom_filter()
+    success &= test_logout_revokes_tokens()
+    success &= test_refresh_rotation()
+    success &= test_unrevoked_tokens_skip_database()
+    success &= test_sweep_expired()
+
+    if success:
+        print("\n🎉 All token revocation tests passed!")
+    else:
+        print("\n❌ Some tests failed!")
+        sys.exit(1)
@@ -43,6 +43,7 @@ export class BaseApiClient {
           success: true,
           data: response.data.data,
           message: response.data.message,
+          pagination: response.data.pagination,
         };
       } else {
         console.error('API response error:', response.data);
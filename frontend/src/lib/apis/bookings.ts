@@ -8,11 +8,31 @@ import type {
   BookingStats
 } from '../types/booking'
 
+// Largest page the booking list endpoints return (API_MAX_PAGE_SIZE)
+const MAX_PAGE_SIZE = 100
+
 export class BookingsApiClient extends BaseApiClient {
   constructor() {
     super('/bookings')
   }
 
+  /**
+   * Get every page of a booking list, following pagination.next_cursor
+   */
+  private async getAllPages(endpoint: string, params?: BookingListParams): Promise<ApiResponse<Booking[]>> {
+    const bookings: Booking[] = []
+    let cursor: string | null | undefined = params?.cursor
+    let response: ApiResponse<Booking[]>
+    do {
+      response = await this.get<Booking[]>(endpoint, {
+        params: { page_size: MAX_PAGE_SIZE, ...params, ...(cursor ? { cursor } : {}) },
+      })
+      bookings.push(...(response.data ?? []))
+      cursor = response.pagination?.next_cursor
+    } while (cursor)
+    return { ...response, data: bookings }
+  }
+
   /**
    * Create a new booking
    */
@@ -24,7 +44,7 @@ export class BookingsApiClient extends BaseApiClient {
    * Get user's bookings list
    */
   async getBookings(params?: BookingListParams): Promise<ApiResponse<Booking[]>> {
-    return this.get<Booking[]>('/my-bookings/', { params })
+    return this.getAllPages('/my-bookings/', params)
   }
 
   /**
@@ -52,14 +72,14 @@ export class BookingsApiClient extends BaseApiClient {
    * Get all bookings for providers (Received Orders - bookings accepted by provider)
    */
   async getProviderBookings(): Promise<ApiResponse<Booking[]>> {
-    return this.get<Booking[]>('/provider/received/')
+    return this.getAllPages('/provider/received/')
   }
 
   /**
    * Get available tasks for providers (bookings without provider assigned)
    */
   async getAvailableTasks(): Promise<ApiResponse<Booking[]>> {
-    return this.get<Booking[]>('/provider/available/')
+    return this.getAllPages('/provider/available/')
   }
 
   /**
@@ -89,6 +89,72 @@ export async function enc(data: string): Promise<string> {
   return `${ivHex}:${ciphertextHex}:${tagHex}`;
 }
 
+/**
+ * Content type of request bodies sent in the binary transport format.
+ */
+export const BINARY_MEDIA_TYPE = 'application/vnd.safehome.enc+octet-stream';
+
+/**
+ * Encrypts data using AES-GCM into the binary transport format.
+ * The result is "nonce || ciphertext || tag" with a 12-byte nonce, and is
+ * sent as the raw request body with Content-Type BINARY_MEDIA_TYPE.
+ *
+ * @param data The string data to encrypt.
+ * @returns The encrypted bytes.
+ * @throws {Error} If the FERNET_KEY is not set.
+ */
+export async function encBinary(data: string): Promise<Uint8Array> {
+  if (!FERNET_KEY) {
+    throw new Error('NEXT_PUBLIC_FERNET_KEY environment variable is not set.');
+  }
+
+  const key = await deriveKey(FERNET_KEY, SALT);
+  const nonce = crypto.getRandomValues(new Uint8Array(12));
+  const encoder = new TextEncoder();
+
+  const encrypted = await crypto.subtle.encrypt(
+    {
+      name: 'AES-GCM',
+      iv: nonce,
+    },
+    key,
+    encoder.encode(data)
+  );
+
+  const body = new Uint8Array(nonce.length + encrypted.byteLength);
+  body.set(nonce);
+  body.set(new Uint8Array(encrypted), nonce.length);
+  return body;
+}
+
+/**
+ * Decrypts a response body in the binary transport format.
+ * Request it with "Accept: BINARY_MEDIA_TYPE" and an arraybuffer response.
+ *
+ * @param body The raw "nonce || ciphertext || tag" bytes.
+ * @returns The decrypted string (JSON for API responses).
+ */
+export async function decBinary(body: ArrayBuffer | Uint8Array): Promise<string> {
+  if (!FERNET_KEY) {
+    throw new Error('NEXT_PUBLIC_FERNET_KEY environment variable is not set.');
+  }
+
+  const bytes = body instanceof Uint8Array ? body : new Uint8Array(body);
+  const key = await deriveKey(FERNET_KEY, SALT);
+
+  const decrypted = await crypto.subtle.decrypt(
+    {
+      name: 'AES-GCM',
+      iv: bytes.subarray(0, 12),
+    },
+    key,
+    bytes.subarray(12)
+  );
+
+  const decoder = new TextDecoder();
+  return decoder.decode(decrypted);
+}
+
 /**
  * Decrypts data encrypted with AES-GCM.
  * Uses the Web Crypto API for native browser support.
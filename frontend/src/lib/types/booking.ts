@@ -85,6 +85,7 @@ export interface UpdateBookingRequest {
 export interface BookingListParams {
   page?: number
   page_size?: number
+  cursor?: string
   status?: BookingStatus
   service_type?: ServiceType
 }
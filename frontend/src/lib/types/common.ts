@@ -6,6 +6,16 @@ export interface ApiResponse<T = any> {
   message: string
   data?: T
   status_code: number
+  pagination?: CursorPagination
+}
+
+/**
+ * Pagination of cursor-paginated list endpoints
+ */
+export interface CursorPagination {
+  next_cursor: string | null
+  has_more: boolean
+  page_size: number
 }
 
 /**